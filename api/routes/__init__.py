@@ -2,9 +2,13 @@ from fastapi import APIRouter
 from .songs import router as songs_router
 from .all_data import router as all_data_router
 from .dashboard import router as dashboard_router
+from .status import router as status_router
+from .jobs import router as jobs_router
 
 router = APIRouter()
 
 router.include_router(songs_router)
 router.include_router(all_data_router)
-router.include_router(dashboard_router)
\ No newline at end of file
+router.include_router(dashboard_router)
+router.include_router(status_router)
+router.include_router(jobs_router)
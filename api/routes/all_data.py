@@ -1,27 +1,55 @@
+from functools import partial
+from typing import Literal
+
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+
+import outbound
+from models import UserDataResponse
+from response_encoding import json_response
 from scraper import fetch_all_user_data
-from api.services.limiter import rate_limiter
+from api.services.limiter import check_rate_limit
+from api.services.response_cache import get_or_fetch
+from api.services.session_store import credential_key
 
 router = APIRouter(tags=["PIU - Checker"])
 
 class UserCredentials(BaseModel):
     username: str
     password: str
+    force_refresh: bool = False
+    # legacy: 기존 형식 (숫자가 문자열), compact: 숫자 필드를 숫자로, 플레이트는 PLATE_TYPES 순서의 배열로
+    format: Literal["legacy", "compact"] = "legacy"
 
 
-@router.post("/fetch-all-user-data")
-def fetch_all_user_data_endpoint(request: Request, credentials: UserCredentials):
-    client_id = request.client.host
-    limit_reset = rate_limiter(client_id, bucket="global")
-    if limit_reset:
-        raise HTTPException(
-            status_code=429,
-            detail={"message": "요청 제한 초과", "reset_time": str(limit_reset)}
-        )
+async def fetch_all_user_data_bulk(username: str, password: str):
+    """
+    전체 유저 데이터 스크래핑 (페이지가 많으므로 outbound 스케줄러에서 대량 요청으로 배정)
+    """
+    with outbound.request_context(priority=outbound.BULK):
+        return await fetch_all_user_data(username, password)
 
+
+@router.post("/fetch-all-user-data", responses={200: {"model": UserDataResponse}})
+async def fetch_all_user_data_endpoint(request: Request, credentials: UserCredentials):
+    # 캐시를 사용할 수 없어 새로 스크래핑할 때만 요청 제한 적용
     try:
-        data = fetch_all_user_data(credentials.username, credentials.password)
-        return {"status": "success", "data": data}
+        key = credential_key(credentials.username, credentials.password)
+        data = await get_or_fetch(
+            key,
+            "all_user_data",
+            lambda: fetch_all_user_data_bulk(credentials.username, credentials.password),
+            policy="recently_played",
+            force_refresh=credentials.force_refresh,
+            on_miss=partial(check_rate_limit, request),
+        )
+        # 캐시에는 UserRecords 객체를 저장하고 응답 형식은 요청마다 선택
+        # compact 는 jsonable_encoder 를 거치면 dataclasses.asdict 로 _text 등 내부 필드까지 펼쳐지므로 직접 직렬화
+        return json_response(
+            {"status": "success", "data": data if credentials.format == "compact" else data.to_dict()},
+            etag_scope=f"{key}:all_user_data:{credentials.format}",
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from login import login_to_piugame
+from api.services.session_store import get_requests_session
 
 router = APIRouter()
 
@@ -13,7 +13,7 @@ class UserCredentials(BaseModel):
 
 @router.post("/login")
 def login(credentials: UserCredentials):
-    session = login_to_piugame(credentials.username, credentials.password)
+    session = get_requests_session(credentials.username, credentials.password)
     if not session:
         raise HTTPException(status_code=401, detail="로그인 실패")
     return {"status": "success", "message": "로그인 성공"}
@@ -0,0 +1,109 @@
+from functools import partial
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel
+
+from scraper import LEVELS, SCRAPE_PROGRESS
+from api.routes.all_data import fetch_all_user_data_bulk
+from api.routes.songs import song_details_events
+from api.services import jobs
+from api.services.limiter import check_rate_limit
+from api.services.response_cache import get_or_fetch
+from api.services.score_sync import SCORE_LEVELS
+from api.services.session_store import credential_key
+
+router = APIRouter(tags=["Jobs"])
+
+
+class JobRequest(BaseModel):
+    username: str
+    password: str
+    kind: Literal["all_user_data", "song_details"]
+    force_refresh: bool = False
+
+
+async def collect_song_details(username: str, password: str, progress: dict):
+    """
+    스트리밍 이벤트를 모아 /fetch-song-details 와 같은 형태의 결과 생성 (레벨 진행 상황 기록)
+    """
+    song_data = {}
+    errors = []
+    async for event in song_details_events(username, password):
+        if event["type"] == "level":
+            song_data[f"level_{event['level']}"] = event["data"]
+        elif event["type"] == "progress":
+            progress["levels_completed"] = event["completed"]
+        elif event["type"] == "summary":
+            errors = event["errors"]
+        elif event["type"] == "error":
+            raise HTTPException(status_code=event["status_code"], detail=event["detail"])
+    return {"data": {f"level_{level}": song_data[f"level_{level}"] for level in SCORE_LEVELS}, "errors": errors}
+
+
+def job_operation(request: Request, credentials: JobRequest):
+    """
+    작업 종류별 실행 함수. 결과는 일반 엔드포인트와 같은 응답 캐시에 저장되어 이후 요청에서도 사용
+    결과 형식은 일반 엔드포인트 응답에서 status 를 뺀 것 ({"data": ..., "errors": ...})
+    요청 제한은 일반 엔드포인트와 같이 캐시를 사용할 수 없어 실제로 스크래핑할 때만 사용
+    """
+    username, password = credentials.username, credentials.password
+    user_key = credential_key(username, password)
+    on_miss = partial(check_rate_limit, request)
+
+    async def run(progress: dict):
+        SCRAPE_PROGRESS.set(progress)
+        if credentials.kind == "all_user_data":
+            progress["pages_total"] = len(LEVELS) + 3  # play_data + 레벨별 + pumbility + recently_played
+            records = await get_or_fetch(
+                user_key, "all_user_data",
+                lambda: fetch_all_user_data_bulk(username, password),
+                policy="recently_played",
+                force_refresh=credentials.force_refresh,
+                on_miss=on_miss,
+            )
+            return {"data": records.to_dict()}
+
+        progress["levels_total"] = len(SCORE_LEVELS)
+        return await get_or_fetch(
+            user_key, "song_details",
+            lambda: collect_song_details(username, password, progress),
+            policy="level_checklist",
+            force_refresh=credentials.force_refresh,
+            on_miss=on_miss,
+        )
+
+    return run
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: Request, credentials: JobRequest):
+    """
+    백그라운드 스크래핑 작업 등록 후 작업 ID 반환 (같은 작업이 진행 중이면 기존 작업 반환)
+    """
+    job = jobs.submit(
+        credential_key(credentials.username, credentials.password),
+        credentials.kind,
+        job_operation(request, credentials),
+    )
+    return {"status": "accepted", "data": job}
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """
+    작업 상태 / 진행 상황 (pages_completed, levels_completed 등)
+    """
+    return {"status": "success", "data": jobs.get_status(job_id)}
+
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(job_id: str, response: Response):
+    """
+    완료된 작업의 결과. 아직 진행 중이면 202와 작업 상태, 실패한 작업은 작업의 오류 코드로 응답
+    """
+    job, result = jobs.get_result(job_id)
+    if job["status"] != "succeeded":
+        response.status_code = 202
+        return {"status": job["status"], "data": job}
+    return {"status": "success", **result}
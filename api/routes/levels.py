@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from pydantic import BaseModel
+from config import PIUGAME_BASE_URL
 from scraper import fetch_all_levels_data
-from login import login_to_piugame
+from api.services.session_store import run_with_session_sync
 
 router = APIRouter()
 
@@ -14,11 +15,10 @@ class UserCredentials(BaseModel):
 
 @router.post("/fetch-all-levels-data")
 def fetch_all_levels_data_endpoint(credentials: UserCredentials):
-    session = login_to_piugame(credentials.username, credentials.password)
-    if not session:
-        raise HTTPException(status_code=401, detail="로그인 실패")
-
-    base_url = "https://www.piugame.com/my_page/play_data.php"
-    data = fetch_all_levels_data(session, base_url)
+    base_url = f"{PIUGAME_BASE_URL}/my_page/play_data.php"
+    data = run_with_session_sync(
+        credentials.username, credentials.password,
+        lambda session: fetch_all_levels_data(session, base_url)
+    )
 
     return {"status": "success", "data": data}
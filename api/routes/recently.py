@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from pydantic import BaseModel
-from scraper import fetch_recently_played_data
-from login import login_to_piugame
+from config import PIUGAME_BASE_URL
+from scraper import fetch_page_content, fetch_recently_played_data
+from api.services.session_store import run_with_session_sync
 
 router = APIRouter()
 
@@ -14,12 +15,11 @@ class UserCredentials(BaseModel):
 
 @router.post("/fetch-recently-played")
 def fetch_recently_played_endpoint(credentials: UserCredentials):
-    session = login_to_piugame(credentials.username, credentials.password)
-    if not session:
-        raise HTTPException(status_code=401, detail="로그인 실패")
+    url = f"{PIUGAME_BASE_URL}/my_page/recently_played.php"
+    html = run_with_session_sync(
+        credentials.username, credentials.password,
+        lambda session: fetch_page_content(url, cookies=session.cookies)
+    )
 
-    url = "https://www.piugame.com/my_page/recently_played.php"
-    response = session.get(url, verify=False, timeout=30)
-
-    data = fetch_recently_played_data(response.text)
+    data = fetch_recently_played_data(html)
     return {"status": "success", "data": data}
@@ -1,11 +1,27 @@
+import json
+import logging
+import time
+from functools import partial
+from typing import Optional
+
 import aiohttp
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from login import login_to_piugame
-from scraper import fetch_song_details_for_all_levels, fetch_song_details_for_level
-from api.services.db import get_image_url, get_full_song_list  # ← get_full_song_list 추가
-from api.services.limiter import rate_limiter
+import outbound
+from models import SongDetailsResponse
+from response_encoding import json_response
+from scraper import fetch_song_details_for_level
+from api.services.catalog import MODES, build_checklist, ensure_catalog
+from api.services.db import get_image_urls, run_db
+from api.services.limiter import check_rate_limit
+from api.services.response_cache import get_or_fetch
+from api.services.score_store import account_key, load_changes_since
+from api.services.score_sync import SCORE_LEVELS, stream_song_details, sync_song_details
+from api.services.session_store import credential_key, run_with_session
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["PIU - Checker"])
 
@@ -13,105 +29,294 @@ router = APIRouter(tags=["PIU - Checker"])
 class UserCredentials(BaseModel):
     username: str
     password: str
+    force_refresh: bool = False
 
 
-@router.post("/fetch-song-details")
-async def fetch_song_details(request: Request, credentials: UserCredentials):
-    client_id = request.client.host
-    limit_reset = rate_limiter(client_id, bucket="global")
-    if limit_reset:
-        raise HTTPException(
-            status_code=429,
-            detail={"message": "요청 제한 초과", "reset_time": str(limit_reset)}
-        )
+class DeltaRequest(UserCredentials):
+    since_version: Optional[int] = None  # 클라이언트가 마지막으로 받은 버전 (없으면 전체 데이터)
+
+
+async def scrape_song_details(username: str, password: str):
+    """
+    전체 레벨 곡 데이터를 스크래핑하고 이미지 URL을 보강
+    반환값: {"data": {"level_10": {...}, ...}, "errors": [가져오지 못한 페이지]} (오류가 있으면 응답 캐시에 저장하지 않음)
+    """
+    # 바뀐 레벨만 스크래핑 후 저장된 베스트 스코어와 병합 (페이지가 많으므로 대화형 요청보다 뒤에 배정)
+    with outbound.request_context(priority=outbound.BULK):
+        song_data, errors = await sync_song_details(username, password)
+
+    return {"data": await attach_image_urls(song_data), "errors": errors}
+
+
+async def attach_image_urls(song_data: dict) -> dict:
+    """
+    {"level_10": {"single": [...], "double": [...]}, ...} 의 곡마다 image_url 추가
+    (응답 전체의 곡 이름을 모아 한 번에 조회, DB 스레드 풀에서 실행)
+    """
+    song_names = {song["name"] for data in song_data.values() for mode in ("single", "double") for song in data[mode]}
+    image_urls = await run_db(get_image_urls, song_names)
+    return {
+        level: {
+            mode: [{**song, "image_url": image_urls[song["name"]]} for song in data[mode]]
+            for mode in ["single", "double"]
+        }
+        for level, data in song_data.items()
+    }
+
 
+@router.post("/fetch-song-details", responses={200: {"model": SongDetailsResponse}})
+async def fetch_song_details(request: Request, credentials: UserCredentials):
+    # 캐시를 사용할 수 없어 새로 스크래핑할 때만 요청 제한 적용
     try:
-        # 전체 레벨 스크래핑
-        song_data = await fetch_song_details_for_all_levels(
-            credentials.username, credentials.password
+        key = credential_key(credentials.username, credentials.password)
+        song_details = await get_or_fetch(
+            key,
+            "song_details",
+            lambda: scrape_song_details(credentials.username, credentials.password),
+            policy="level_checklist",
+            force_refresh=credentials.force_refresh,
+            on_miss=partial(check_rate_limit, request),
         )
+        # errors: 가져오지 못한 페이지 (해당 페이지의 곡만 빠지고 나머지는 그대로 반환)
+        return json_response({"status": "success", **song_details}, etag_scope=f"{key}:song_details")
 
-        # 이미지 URL 보강
-        for level, data in song_data.items():
-            for mode in ["single", "double"]:
-                for song in data[mode]:
-                    song_name = song["name"]
-                    song["image_url"] = get_image_url(song_name)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return {"status": "success", "data": song_data}
 
+async def build_song_details_delta(username: str, song_details: dict, since_version: Optional[int]):
+    """
+    since_version 이후 바뀐 곡만 레벨 / 모드별로 반환 (차이를 계산할 수 없으면 전체 데이터)
+    version 과 data 는 모두 저장소의 같은 시점 기준 (song_details 캐시는 /levels, /stream, /jobs 의 저장보다 오래되었을 수 있음)
+    저장소를 사용할 수 없으면 song_details 의 데이터를 version 없이 반환
+    """
+    try:
+        version, changes, levels = await run_db(load_changes_since, account_key(username), since_version or 0)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.warning("변경 내역 조회 실패, 전체 데이터 반환", extra={"error": str(getattr(e, "detail", e))})
+        version, changes, levels = None, None, None
 
+    errors = song_details["errors"]
+    if changes is None:
+        if version is None:
+            data = song_details["data"]
+        else:
+            empty = {mode: [] for mode in MODES}
+            data = await attach_image_urls({
+                f"level_{level}": levels.get(level, {}).get("songs", empty) for level in SCORE_LEVELS
+            })
+        return {"status": "success", "version": version, "full": True, "data": data, "errors": errors}
 
-@router.post("/fetch-song-details/level/{level}")
-async def fetch_song_details_by_level(
-        level: int,
-        request: Request,
-        credentials: UserCredentials
-):
+    image_urls = await run_db(get_image_urls, {change["name"] for change in changes if change["change"] != "removed"})
+    data = {}
+    for change in changes:
+        entry = {"name": change["name"], "change": change["change"], "score": change["score"]}
+        if change["change"] in ("improved", "decreased"):
+            entry["previous_score"] = change["previous_score"]
+        if change["change"] != "removed":
+            entry["image_url"] = image_urls[change["name"]]
+        level = data.setdefault(f"level_{change['level']}", {mode: [] for mode in MODES})
+        level[change["mode"]].append(entry)
+    return {"status": "success", "version": version, "full": False, "data": data, "errors": errors}
+
+
+@router.post("/fetch-song-details/delta")
+async def fetch_song_details_delta(request: Request, credentials: DeltaRequest):
     """
-    지정된 레벨 단일 스크래핑 + 미클리어 포함 + 모드별 clear/total 카운트
+    /fetch-song-details 의 변경분 버전. since_version 이후 추가 / 점수 변경 / 삭제된 곡과 새 버전을 반환
+    (full=true 이면 data 는 /fetch-song-details 와 같은 전체 데이터)
     """
-    # 1) Rate limiting
-    client_id = request.client.host
-    limit_reset = rate_limiter(client_id, bucket="level")
-    if limit_reset:
-        raise HTTPException(
-            status_code=429,
-            detail={"message": "요청 제한 초과", "reset_time": str(limit_reset)}
+    try:
+        # 스크래핑 / 저장(버전 기록)은 /fetch-song-details 와 같은 캐시를 사용
+        key = credential_key(credentials.username, credentials.password)
+        song_details = await get_or_fetch(
+            key,
+            "song_details",
+            lambda: scrape_song_details(credentials.username, credentials.password),
+            policy="level_checklist",
+            force_refresh=credentials.force_refresh,
+            on_miss=partial(check_rate_limit, request),
         )
+        delta = await build_song_details_delta(credentials.username, song_details, credentials.since_version)
+        return json_response(delta, etag_scope=f"{key}:song_details_delta")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    # 2) 로그인 세션 생성
-    session = login_to_piugame(credentials.username, credentials.password)
 
-    # 3) 단일 레벨 스크래핑 (cleared_data: {"single":[], "double":[]})
+async def song_details_events(username: str, password: str):
+    """
+    /fetch-song-details 의 스트리밍 버전 이벤트 (레벨이 준비될 때마다 이미지 URL을 붙여 바로 전달)
+      - level: {"type": "level", "level", "source", "data": {"single": [...], "double": [...]}}
+      - progress: {"type": "progress", "completed", "total"}
+      - summary: {"type": "summary", "levels", "scraped_levels", "errors", "elapsed_ms"}
+      - error: {"type": "error", "status_code", "detail"}
+    """
+    started = time.monotonic()
+    completed = 0
     try:
-        async with aiohttp.ClientSession(cookies=session.cookies.get_dict()) as async_sess:
-            progress_tracker = {"completed": 0, "total": 1}
-            cleared_data = await fetch_song_details_for_level(
+        with outbound.request_context(priority=outbound.BULK):
+            async for event in stream_song_details(username, password):
+                if event["type"] == "level":
+                    songs = event["data"]
+                    image_urls = await run_db(get_image_urls, {song["name"] for mode in MODES for song in songs[mode]})
+                    yield {**event, "data": {
+                        mode: [{**song, "image_url": image_urls[song["name"]]} for song in songs[mode]]
+                        for mode in MODES
+                    }}
+                    completed += 1
+                    yield {"type": "progress", "completed": completed, "total": len(SCORE_LEVELS)}
+                elif event["type"] == "summary":
+                    yield {**event, "levels": completed, "elapsed_ms": round((time.monotonic() - started) * 1000)}
+                else:
+                    yield event
+    except Exception as e:
+        yield {"type": "error", "status_code": getattr(e, "status_code", 500), "detail": getattr(e, "detail", str(e))}
+
+
+def _format_ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@router.post("/fetch-song-details/stream")
+async def fetch_song_details_stream(request: Request, credentials: UserCredentials, format: str = None):
+    """
+    전체 레벨 곡 데이터를 레벨이 준비되는 순서대로 스트리밍
+    NDJSON(기본) 또는 SSE (format=sse 또는 Accept: text/event-stream)
+    """
+    check_rate_limit(request)
+
+    use_sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    formatter = _format_sse if use_sse else _format_ndjson
+
+    async def body():
+        async for event in song_details_events(credentials.username, credentials.password):
+            yield formatter(event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream; charset=utf-8" if use_sse else "application/x-ndjson; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # 프록시 버퍼링 없이 바로 전달
+    )
+
+
+async def build_level_checklist(username: str, password: str, level: int):
+    """
+    지정된 레벨 단일 스크래핑 + 미클리어 포함 + 모드별 clear/total 카운트
+    """
+    # 1) 로그인 세션 (캐시 사용, 만료 시 재로그인)
+    progress_tracker = {"completed": 0, "total": 1}
+
+    async def scrape(cookie_jar):
+        async with aiohttp.ClientSession(cookie_jar=cookie_jar) as async_sess:
+            progress_tracker.pop("errors", None)  # 세션 만료로 다시 시도하면 이전 시도의 오류는 제외
+            return await fetch_song_details_for_level(
                 async_sess, level, progress_tracker
             )
+
+    # 2) 단일 레벨 스크래핑 (cleared_data: {"single":[], "double":[]}, 실패한 페이지는 progress_tracker["errors"])
+    try:
+        cleared_data = await run_with_session(username, password, scrape)
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    # 4) 전체 곡 리스트 조회 (DB)
-    #    {"single":[(name,img_url),...], "double":[...]}
-    full_list = get_full_song_list(level)
-
-    # 5) 모드별 clear/total 카운트 계산
-    single_clear = len(cleared_data.get("single", []))
-    single_total = len(full_list.get("single", []))
-    double_clear = len(cleared_data.get("double", []))
-    double_total = len(full_list.get("double", []))
-
-    # 6) cleared_data 리스트에 미클리어 항목 추가
-    for mode in ("single", "double"):
-        cleared_names = {s["name"] for s in cleared_data.get(mode, [])}
-        for name, img_url in full_list.get(mode, []):
-            if name not in cleared_names:
-                cleared_data[mode].append({
-                    "name": name,
-                    "score": None,  # 미클리어는 score None
-                    "img_url": img_url
-                })
-
-    # 7) 클리어된 곡에도 image_url 보강 (이미지 매핑)
-    for mode in ("single", "double"):
-        for song in cleared_data.get(mode, []):
-            # 이미 img_url 필드가 있으므로, DB 매핑은 클리어된 곡만
-            if song.get("score") is not None:
-                song["image_url"] = get_image_url(song["name"])
-
-    # 8) 최종 응답 반환
+    # 3) 전체 곡 목록 (메모리 인덱스, 없거나 오래되었으면 DB에서 다시 읽음)
+    await ensure_catalog()
+
+    # 4) 클리어한 곡 이미지 URL 조회 (한 번에 조회)
+    song_names = {song["name"] for mode in MODES for song in cleared_data.get(mode, [])}
+    image_urls = await run_db(get_image_urls, song_names)
+
+    # 5) 모드별 clear/total 카운트 + 미클리어 항목 추가
+    # errors 가 있으면 해당 페이지의 곡은 미클리어로 보일 수 있으므로 함께 반환 (응답 캐시에는 저장하지 않음)
+    return {
+        "status": "success",
+        **build_checklist(level, cleared_data, image_urls),
+        "errors": progress_tracker.get("errors", []),
+    }
+
+
+async def build_all_levels_checklist(username: str, password: str):
+    """
+    전체 레벨 체크리스트를 한 번에 생성 (로그인 / 스크래핑 세션 1회, 곡 목록은 메모리 인덱스 사용)
+    """
+    # 1) 바뀐 레벨만 스크래핑 후 저장된 베스트 스코어와 병합 ({"level_10": {"single":[], "double":[]}, ...})
+    with outbound.request_context(priority=outbound.BULK):
+        song_data, errors = await sync_song_details(username, password)
+    await ensure_catalog()
+
+    # 2) 전체 레벨의 클리어한 곡 이미지 URL을 한 번에 조회
+    song_names = {song["name"] for data in song_data.values() for mode in MODES for song in data[mode]}
+    image_urls = await run_db(get_image_urls, song_names)
+
+    # 3) 레벨별 체크리스트 생성
+    levels = [
+        build_checklist(level, song_data[f"level_{level}"], image_urls)
+        for level in SCORE_LEVELS
+    ]
     return {
         "status": "success",
-        "level": level,
-        "single_clear": single_clear,
-        "single_total": single_total,
-        "double_clear": double_clear,
-        "double_total": double_total,
-        "data": cleared_data
+        "single_clear": sum(level["single_clear"] for level in levels),
+        "single_total": sum(level["single_total"] for level in levels),
+        "double_clear": sum(level["double_clear"] for level in levels),
+        "double_total": sum(level["double_total"] for level in levels),
+        "levels": levels,
+        "errors": errors,  # 가져오지 못한 페이지 (있으면 응답 캐시에 저장하지 않음)
     }
+
+
+@router.post("/fetch-song-details/levels")
+async def fetch_song_details_all_levels(request: Request, credentials: UserCredentials):
+    """
+    전체 레벨 체크리스트 조회 (레벨별 요청 18번을 한 번으로 대체, 사용자별 응답 캐시 사용)
+    """
+    try:
+        key = credential_key(credentials.username, credentials.password)
+        checklist = await get_or_fetch(
+            key,
+            "song_details_levels",
+            lambda: build_all_levels_checklist(credentials.username, credentials.password),
+            policy="level_checklist",
+            force_refresh=credentials.force_refresh,
+            on_miss=partial(check_rate_limit, request),
+        )
+        return json_response(checklist, etag_scope=f"{key}:song_details_levels")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/fetch-song-details/level/{level}")
+async def fetch_song_details_by_level(
+        level: int,
+        request: Request,
+        credentials: UserCredentials
+):
+    """
+    레벨 체크리스트 조회 (사용자별 응답 캐시 사용, force_refresh로 새로 스크래핑)
+    """
+    # Rate limiting: 캐시를 사용할 수 없어 새로 스크래핑할 때만 적용
+    key = credential_key(credentials.username, credentials.password)
+    checklist = await get_or_fetch(
+        key,
+        ("song_details_level", level),
+        lambda: build_level_checklist(credentials.username, credentials.password, level),
+        policy="level_checklist",
+        force_refresh=credentials.force_refresh,
+        on_miss=partial(check_rate_limit, request, "level"),
+    )
+    return json_response(checklist, etag_scope=f"{key}:song_details_level:{level}")
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import metrics
+import outbound
+from api.services import jobs
+
+router = APIRouter(tags=["Status"])
+
+
+@router.get("/status/outbound")
+async def outbound_status():
+    """
+    piugame 호스트별 진행 중 / 대기 중 요청 수와 평균 / 최대 대기 시간
+    """
+    return {"status": "success", "data": outbound.stats()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus 텍스트 형식 메트릭 (단계별 지연 시간, piugame 요청 / 재시도 수, 캐시 적중, 요청 제한 거부 등)
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/status/jobs")
+async def jobs_status():
+    """
+    백그라운드 작업 상태별 개수와 동시 실행 / 대기 한도
+    """
+    return {"status": "success", "data": jobs.stats()}
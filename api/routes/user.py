@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from pydantic import BaseModel
-from scraper import parse_user_data
-from login import login_to_piugame
+from config import PIUGAME_BASE_URL
+from scraper import fetch_page_content, parse_user_data
+from api.services.session_store import run_with_session_sync
 
 router = APIRouter()
 
@@ -14,12 +15,11 @@ class UserCredentials(BaseModel):
 
 @router.post("/fetch-user-data")
 def fetch_user_data(credentials: UserCredentials):
-    session = login_to_piugame(credentials.username, credentials.password)
-    if not session:
-        raise HTTPException(status_code=401, detail="로그인 실패")
+    target_url = f"{PIUGAME_BASE_URL}/my_page/play_data.php"
+    html = run_with_session_sync(
+        credentials.username, credentials.password,
+        lambda session: fetch_page_content(target_url, cookies=session.cookies)
+    )
 
-    target_url = "https://www.piugame.com/my_page/play_data.php"
-    response = session.get(target_url, verify=False, timeout=30)
-
-    parsed_data = parse_user_data(response.text)
+    parsed_data = parse_user_data(html)
     return {"status": "success", "data": parsed_data}
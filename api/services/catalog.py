@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+
+import config
+from api.services.db import db_connection, run_db
+
+logger = logging.getLogger(__name__)
+
+MODES = ("single", "double")
+CATALOG_RETRY_INTERVAL = 60  # 갱신 실패 시 이전 목록을 쓰다가 다시 시도하기까지의 시간 (초)
+
+# 전체 곡 목록 메모리 인덱스 { (level, mode): [(name, img_url), ...] }
+_index: Dict[Tuple[int, str], List[Tuple[str, str]]] = {}
+_loaded_at = None  # 마지막으로 DB에서 읽어온 시각 (None이면 다시 읽어야 함)
+_load_lock = None
+
+
+def load_catalog() -> Dict[Tuple[int, str], List[Tuple[str, str]]]:
+    """
+    full_song_list 전체를 한 번의 쿼리로 읽어 (level, mode) 인덱스를 새로 만듦
+    """
+    global _index, _loaded_at
+    with db_connection() as conn, conn.cursor() as cursor:
+        query = """
+        SELECT level, mode, name, img_url
+          FROM full_song_list
+      ORDER BY level, mode, name;
+        """
+        cursor.execute(query)
+        rows = cursor.fetchall()
+
+    index: Dict[Tuple[int, str], List[Tuple[str, str]]] = {}
+    for level, mode, name, img_url in rows:
+        if mode in MODES:
+            index.setdefault((level, mode), []).append((name, img_url))
+
+    # 읽는 쪽이 중간 상태를 보지 않도록 완성된 인덱스로 한 번에 교체
+    _index = index
+    _loaded_at = time.monotonic()
+    logger.info("전체 곡 목록 캐싱 완료", extra={"count": len(rows)})
+    return index
+
+
+def invalidate_catalog():
+    """
+    전체 곡 목록 인덱스 무효화 (다음 조회 때 DB에서 다시 읽음)
+    """
+    global _loaded_at
+    _loaded_at = None
+
+
+def _is_fresh() -> bool:
+    return _loaded_at is not None and time.monotonic() - _loaded_at < config.CATALOG_TTL
+
+
+async def ensure_catalog():
+    """
+    인덱스가 없거나 오래되었으면 다시 읽음 (동시에 여러 요청이 와도 DB 조회는 한 번)
+    DB 조회에 실패해도 이전 인덱스가 있으면 그대로 사용
+    """
+    global _load_lock, _loaded_at
+    if _is_fresh():
+        return
+    if _load_lock is None:
+        _load_lock = asyncio.Lock()
+    async with _load_lock:
+        if _is_fresh():
+            return
+        try:
+            await run_db(load_catalog)
+        except Exception as e:
+            if not _index:
+                raise HTTPException(status_code=500, detail=str(e))
+            logger.warning("전체 곡 목록 갱신 실패, 이전 목록 사용", extra={"error": str(e)})
+            _loaded_at = time.monotonic() - config.CATALOG_TTL + CATALOG_RETRY_INTERVAL
+
+
+def get_level_songs(level: int) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    level의 전체 곡 목록을 {'single': [(name, img_url), ...], 'double': [...]} 형태로 반환
+    """
+    return {mode: _index.get((level, mode), []) for mode in MODES}
+
+
+def build_checklist(level: int, cleared_data: dict, image_urls: Dict[str, str]) -> dict:
+    """
+    클리어한 곡(cleared_data: {"single":[], "double":[]})과 전체 곡 목록을 비교해
+    모드별 clear/total 카운트와 미클리어 항목을 포함한 체크리스트 생성
+    """
+    full_list = get_level_songs(level)
+    result = {"level": level}
+    data = {}
+    for mode in MODES:
+        cleared = [
+            {**song, "image_url": image_urls.get(song["name"])}
+            for song in cleared_data.get(mode, [])
+        ]
+        cleared_names = {song["name"] for song in cleared}
+        uncleared = [
+            {"name": name, "score": None, "img_url": img_url}  # 미클리어는 score None
+            for name, img_url in full_list[mode]
+            if name not in cleared_names
+        ]
+        result[f"{mode}_clear"] = len(cleared)
+        result[f"{mode}_total"] = len(full_list[mode])
+        data[mode] = cleared + uncleared
+    result["data"] = data
+    return result
@@ -0,0 +1,227 @@
+"""
+곡 카탈로그(full_song_list / song_images) 일괄 적재
+
+    python -m api.services.catalog_ingest catalog.csv
+    python -m api.services.catalog_ingest catalog.json --prune
+
+입력 파일은 level, mode, name, img_url 항목을 가진 CSV 또는 JSON 배열
+행마다 checksum을 저장해 두고 바뀐 행만 쓰며, 전체 작업은 하나의 트랜잭션으로 처리
+(같은 파일로 다시 실행하면 아무것도 쓰지 않음)
+"""
+import argparse
+import csv
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from psycopg2.extras import execute_values
+
+from api.services.catalog import MODES, invalidate_catalog
+from api.services.db import clear_image_cache, get_db_connection
+
+PAGE_SIZE = 1000  # execute_values 한 번에 보내는 행 수
+
+SCHEMA_SQL = """
+-- 새 DB 에서도 바로 적재할 수 있도록 테이블 생성 (song_images 의 ON CONFLICT (song) 에 UNIQUE 키 필요)
+CREATE TABLE IF NOT EXISTS full_song_list (
+    level INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    img_url TEXT NOT NULL DEFAULT '',
+    checksum TEXT,
+    UNIQUE (level, mode, name)
+);
+
+CREATE TABLE IF NOT EXISTS song_images (
+    song TEXT NOT NULL UNIQUE,
+    image_url TEXT NOT NULL,
+    checksum TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- checksum 컬럼이 없던 기존 테이블
+ALTER TABLE full_song_list ADD COLUMN IF NOT EXISTS checksum TEXT;
+ALTER TABLE song_images ADD COLUMN IF NOT EXISTS checksum TEXT;
+"""
+
+CatalogKey = Tuple[int, str, str]  # (level, mode, name)
+
+
+def row_checksum(*values) -> str:
+    return hashlib.md5("\x1f".join(str(value) for value in values).encode("utf-8")).hexdigest()
+
+
+def read_catalog_file(path: str) -> List[dict]:
+    """
+    CSV(헤더 포함) 또는 JSON(배열 또는 {"songs": [...]}) 파일에서 곡 목록을 읽음
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            return data["songs"] if isinstance(data, dict) else data
+        return list(csv.DictReader(f))
+
+
+def normalize_catalog(songs: Iterable[dict]) -> Dict[CatalogKey, str]:
+    """
+    {(level, mode, name): img_url} 로 정리 (중복 행은 마지막 값 사용, 잘못된 행은 오류)
+    """
+    catalog = {}
+    for line, song in enumerate(songs, start=1):
+        try:
+            level = int(song["level"])
+            mode = song["mode"].strip().lower()
+            name = song["name"].strip()
+            img_url = (song.get("img_url") or "").strip()
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"{line}번째 항목 형식 오류: {song!r} ({e})")
+        if mode not in MODES or not name:
+            raise ValueError(f"{line}번째 항목 형식 오류: {song!r}")
+        catalog[(level, mode, name)] = img_url
+    return catalog
+
+
+def _sync_full_song_list(cursor, catalog: Dict[CatalogKey, str], prune: bool) -> dict:
+    cursor.execute("SELECT level, mode, name, checksum FROM full_song_list")
+    stored = {(level, mode, name): checksum for level, mode, name, checksum in cursor.fetchall()}
+
+    inserts, updates = [], []
+    for (level, mode, name), img_url in catalog.items():
+        checksum = row_checksum(level, mode, name, img_url)
+        if (level, mode, name) not in stored:
+            inserts.append((level, mode, name, img_url, checksum))
+        elif stored[(level, mode, name)] != checksum:
+            updates.append((level, mode, name, img_url, checksum))
+    deletes = [key for key in stored if key not in catalog] if prune else []
+
+    if inserts:
+        execute_values(
+            cursor,
+            "INSERT INTO full_song_list (level, mode, name, img_url, checksum) VALUES %s",
+            inserts,
+            page_size=PAGE_SIZE,
+        )
+    if updates:
+        execute_values(
+            cursor,
+            """
+            UPDATE full_song_list AS t
+               SET img_url = v.img_url, checksum = v.checksum
+              FROM (VALUES %s) AS v (level, mode, name, img_url, checksum)
+             WHERE t.level = v.level AND t.mode = v.mode AND t.name = v.name
+            """,
+            updates,
+            page_size=PAGE_SIZE,
+        )
+    if deletes:
+        execute_values(
+            cursor,
+            """
+            DELETE FROM full_song_list AS t
+             USING (VALUES %s) AS v (level, mode, name)
+             WHERE t.level = v.level AND t.mode = v.mode AND t.name = v.name
+            """,
+            deletes,
+            page_size=PAGE_SIZE,
+        )
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "unchanged": len(catalog) - len(inserts) - len(updates),
+    }
+
+
+def _sync_song_images(cursor, catalog: Dict[CatalogKey, str]) -> dict:
+    # 곡 이름별 이미지 (이미지가 비어 있는 항목은 제외)
+    images = {name: img_url for (_, _, name), img_url in catalog.items() if img_url}
+
+    cursor.execute("SELECT song, checksum FROM song_images")
+    stored = dict(cursor.fetchall())
+
+    rows = [
+        (name, img_url, row_checksum(name, img_url))
+        for name, img_url in images.items()
+        if stored.get(name, "") != row_checksum(name, img_url)
+    ]
+    if rows:
+        execute_values(
+            cursor,
+            """
+            INSERT INTO song_images (song, image_url, checksum)
+            VALUES %s
+            ON CONFLICT (song) DO UPDATE
+            SET image_url = EXCLUDED.image_url, checksum = EXCLUDED.checksum, created_at = NOW();
+            """,
+            rows,
+            page_size=PAGE_SIZE,
+        )
+    return {"upserted": len(rows), "unchanged": len(images) - len(rows)}
+
+
+def ingest_catalog(songs: Iterable[dict], prune: bool = False) -> dict:
+    """
+    곡 목록을 full_song_list / song_images 에 하나의 트랜잭션으로 반영하고 단계별 소요 시간을 반환
+    prune=True 이면 입력에 없는 full_song_list 행은 삭제 (song_images 는 삭제하지 않음)
+    """
+    timings = {}
+    started = time.perf_counter()
+    catalog = normalize_catalog(songs)
+    timings["parse"] = time.perf_counter() - started
+
+    # 오래 걸릴 수 있는 일괄 작업이므로 풀을 거치지 않는 단독 연결 사용
+    conn = get_db_connection()
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            cursor.execute(SCHEMA_SQL)
+
+            step = time.perf_counter()
+            full_song_list = _sync_full_song_list(cursor, catalog, prune)
+            timings["full_song_list"] = time.perf_counter() - step
+
+            step = time.perf_counter()
+            song_images = _sync_song_images(cursor, catalog)
+            timings["song_images"] = time.perf_counter() - step
+    finally:
+        conn.close()
+
+    # 같은 프로세스의 캐시는 바로 갱신 (서버 프로세스는 PIU_CATALOG_TTL 이후 다시 읽음)
+    invalidate_catalog()
+    clear_image_cache()
+
+    timings["total"] = time.perf_counter() - started
+    return {
+        "songs": len(catalog),
+        "full_song_list": full_song_list,
+        "song_images": song_images,
+        "timings": timings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="곡 카탈로그 일괄 적재 (full_song_list / song_images)")
+    parser.add_argument("path", help="CSV 또는 JSON 파일 (level, mode, name, img_url)")
+    parser.add_argument("--prune", action="store_true", help="파일에 없는 full_song_list 행 삭제")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    songs = read_catalog_file(args.path)
+    read_time = time.perf_counter() - started
+
+    stats = ingest_catalog(songs, prune=args.prune)
+
+    full, images = stats["full_song_list"], stats["song_images"]
+    print(f"곡 {stats['songs']}개 처리")
+    print(
+        f"  full_song_list: 추가 {full['inserted']}, 변경 {full['updated']}, "
+        f"삭제 {full['deleted']}, 변경 없음 {full['unchanged']}"
+    )
+    print(f"  song_images: upsert {images['upserted']}, 변경 없음 {images['unchanged']}")
+    timings = {"read": read_time, **stats["timings"]}
+    print("  소요 시간: " + ", ".join(f"{step} {seconds * 1000:.1f}ms" for step, seconds in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,230 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import psycopg2
-from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
 from cachetools import TTLCache
 from fastapi import HTTPException
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
+
+import config
+import metrics
+import profiling
+
+logger = logging.getLogger(__name__)
+
+# 캐시 설정 (24시간 TTL, 최대 5000개 - 전체 곡 이미지를 담을 수 있는 크기)
+# TTLCache 는 스레드 안전하지 않으므로 DB 스레드 풀에서 접근할 때는 항상 _image_cache_lock 을 잡는다
+image_cache = TTLCache(maxsize=5000, ttl=86400)
+_image_cache_lock = threading.Lock()
 
-# 캐시 설정 (30분 TTL, 최대 1000개)
-image_cache = TTLCache(maxsize=1000, ttl=86400)
+# DB에 이미지가 없는 곡에 사용하는 기본 이미지
+DEFAULT_IMAGE_URL = "https://www.piugame.com/data/song_img/44b05993485fdf84f9503d7635461185.png"
+
+
+# 데이터베이스 연결 설정 (환경 변수 PIU_DB_* 로 변경)
+def _connect_kwargs() -> dict:
+    return {
+        "dbname": config.DB_NAME,
+        "user": config.DB_USER,
+        "password": config.DB_PASSWORD,
+        "host": config.DB_HOST,
+        "port": config.DB_PORT,
+        "connect_timeout": config.DB_CONNECT_TIMEOUT,
+        # 느린 쿼리가 커넥션을 오래 점유하지 않도록 statement_timeout 적용
+        "options": f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}",
+    }
 
 
-# 데이터베이스 연결 설정
 def get_db_connection():
-    return psycopg2.connect(
-        dbname="piu_checker",   # your database name
-        user="postgres",        # username
-        password="1234",        # pw
-        host="localhost",       # 또는 서버 IP
-        port="5432"
-    )
+    """
+    풀을 거치지 않는 단독 연결 (일괄 작업 등 오래 걸리는 작업용, 호출 측에서 close)
+    """
+    return psycopg2.connect(**_connect_kwargs())
+
+
+# 커넥션 풀과 DB 전용 스레드 풀 (풀 크기만큼만 동시에 실행해 커넥션을 기다리지 않도록 함)
+_pool = None
+_pool_lock = threading.Lock()
+_executor = None
+_last_checked = {}  # { id(conn): 마지막 사용 / 확인 시각 }
+
+
+def init_db_pool():
+    """
+    커넥션 풀 생성 (앱 시작 시 호출, 실패하면 다음 사용 시 다시 시도)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(config.DB_POOL_MIN, config.DB_POOL_MAX, **_connect_kwargs())
+            logger.info("DB 커넥션 풀 생성", extra={"min": config.DB_POOL_MIN, "max": config.DB_POOL_MAX})
+    return _pool
+
+
+def close_db_pool():
+    """
+    커넥션 풀과 DB 스레드 풀 종료 (앱 종료 시 호출)
+    """
+    global _pool, _executor
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        _last_checked.clear()
+
+
+def _is_healthy(conn) -> bool:
+    """
+    닫힌 연결이거나, 한동안 쓰지 않은 연결이 SELECT 1에 응답하지 않으면 비정상
+    """
+    if conn.closed:
+        return False
+    if time.monotonic() - _last_checked.get(id(conn), 0) < config.DB_HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+@contextmanager
+def db_connection():
+    """
+    풀에서 연결을 빌려 사용 후 반환. 정상 종료 시 commit, 예외 시 rollback
+    """
+    pool = init_db_pool()
+    conn = pool.getconn()
+    if not _is_healthy(conn):
+        pool.putconn(conn, close=True)
+        conn = pool.getconn()
+
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        _last_checked[id(conn)] = time.monotonic()
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+async def run_db(func, *args):
+    """
+    동기 DB 함수를 DB 전용 스레드 풀에서 실행 (async 라우트에서 await)
+    """
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.DB_POOL_MAX, thread_name_prefix="db")
+    loop = asyncio.get_running_loop()
+    with metrics.stage("db"):
+        return await loop.run_in_executor(_executor, profiling.bind(functools.partial(func, *args), "db"))
+
 
 # 이미지 URL 조회
 # DB에서 모든 곡 이미지 로드 (초기 캐싱)
 def load_all_image_urls():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        query = "SELECT song, image_url FROM song_images"
-        cursor.execute(query)
+        with db_connection() as conn, conn.cursor() as cursor:
+            query = "SELECT song, image_url FROM song_images"
+            cursor.execute(query)
 
-        # 결과를 캐싱
-        for song_id, image_url in cursor.fetchall():
-            image_cache[song_id] = image_url
-        print(f"캐싱 완료: {len(image_cache)} 개 항목 로드됨.")
+            rows = cursor.fetchall()
 
-        cursor.close()
-        conn.close()
+        # 결과를 캐싱
+        with _image_cache_lock:
+            image_cache.update(rows)
+            count = len(image_cache)
+        logger.info("이미지 URL 캐싱 완료", extra={"count": count})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# 이미지 URL 캐시 비우기 (곡 목록 갱신 후 호출)
+def clear_image_cache():
+    with _image_cache_lock:
+        image_cache.clear()
+
+
 # 곡 이미지 URL 조회 (캐시 우선)
 def get_image_url(song_id: str) -> str:
-    if song_id in image_cache:
-        return image_cache[song_id]
+    with _image_cache_lock:
+        image_url = image_cache.get(song_id)
+    if image_url is not None:
+        metrics.CACHE_REQUESTS.inc(cache="song_images", result="hit")
+        return image_url
+    metrics.CACHE_REQUESTS.inc(cache="song_images", result="miss")
     try:
         # 2. 캐시에 없으면 DB 조회
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        query = "SELECT image_url FROM song_images WHERE song_id = %s"
-        cursor.execute(query, (song_id,))
-        result = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
+        with db_connection() as conn, conn.cursor() as cursor:
+            query = "SELECT image_url FROM song_images WHERE song = %s"
+            cursor.execute(query, (song_id,))
+            result = cursor.fetchone()
 
         # 3. 조회 성공 시 캐시에 추가
         if result:
             image_url = result[0]
-            image_cache[song_id] = image_url  # 캐시 업데이트
+            with _image_cache_lock:
+                image_cache[song_id] = image_url  # 캐시 업데이트
             return image_url
         else:
             # 캐시에 없으면 기본 이미지 반환
-            return "https://www.piugame.com/data/song_img/44b05993485fdf84f9503d7635461185.png"
+            return DEFAULT_IMAGE_URL
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# 곡 이미지 URL 일괄 조회 (캐시 우선, 나머지는 한 번의 쿼리로 조회)
+def get_image_urls(song_names: Iterable[str]) -> Dict[str, str]:
+    """
+    곡 이름 목록의 이미지 URL을 {곡 이름: image_url} 형태로 반환
+    캐시에 없는 곡만 모아 `song = ANY(%s)` 쿼리 한 번으로 조회하고, DB에도 없으면 기본 이미지 사용
+    """
+    result = {}
+    missing = []
+    with _image_cache_lock:
+        for song_name in set(song_names):
+            image_url = image_cache.get(song_name)
+            if image_url is not None:
+                result[song_name] = image_url
+            else:
+                missing.append(song_name)
+    metrics.CACHE_REQUESTS.inc(len(result), cache="song_images", result="hit")
+    metrics.CACHE_REQUESTS.inc(len(missing), cache="song_images", result="miss")
+
+    if not missing:
+        return result
+
+    try:
+        with db_connection() as conn, conn.cursor() as cursor:
+            query = "SELECT song, image_url FROM song_images WHERE song = ANY(%s)"
+            cursor.execute(query, (missing,))
+            rows = cursor.fetchall()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    with _image_cache_lock:
+        image_cache.update(rows)  # 캐시 업데이트
+    result.update(rows)
+
+    for song_name in missing:
+        result.setdefault(song_name, DEFAULT_IMAGE_URL)
+    return result
+
 
 # 이미지 URL 추가 또는 업데이트
 def upsert_image_url(song_name: str, image_url: str):
@@ -71,20 +232,14 @@ def upsert_image_url(song_name: str, image_url: str):
     곡 이미지 URL 삽입 또는 업데이트
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        query = """
-        INSERT INTO song_images (song, image_url)
-        VALUES (%s, %s)
-        ON CONFLICT (song) DO UPDATE
-        SET image_url = EXCLUDED.image_url, created_at = NOW();
-        """
-        cursor.execute(query, (song_name, image_url))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_connection() as conn, conn.cursor() as cursor:
+            query = """
+            INSERT INTO song_images (song, image_url)
+            VALUES (%s, %s)
+            ON CONFLICT (song) DO UPDATE
+            SET image_url = EXCLUDED.image_url, created_at = NOW();
+            """
+            cursor.execute(query, (song_name, image_url))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -97,25 +252,20 @@ def get_full_song_list(level: int) -> Dict[str, List[Tuple[str, str]]]:
     형태로 반환
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        query = """
-        SELECT mode, name, img_url
-          FROM full_song_list
-         WHERE level = %s
-      ORDER BY mode, name;
-        """
-        cursor.execute(query, (level,))
-        rows = cursor.fetchall()
+        with db_connection() as conn, conn.cursor() as cursor:
+            query = """
+            SELECT mode, name, img_url
+              FROM full_song_list
+             WHERE level = %s
+          ORDER BY mode, name;
+            """
+            cursor.execute(query, (level,))
+            rows = cursor.fetchall()
 
         result: Dict[str, List[Tuple[str, str]]] = {"single": [], "double": []}
         for mode, name, img_url in rows:
             if mode in result:
                 result[mode].append((name, img_url))
-
-        cursor.close()
-        conn.close()
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
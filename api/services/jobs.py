@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import secrets
+import time
+
+from fastapi import HTTPException
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# { job_id: job } 작업 상태 (완료 후 JOB_RETENTION 초 동안 보관)
+_jobs = {}
+# { (owner, kind): job_id } 진행 중인 작업 (같은 사용자가 같은 작업을 다시 요청하면 기존 작업 반환)
+_active = {}
+# 동시에 실행하는 작업 수 제한 (나머지는 대기)
+_slots = None
+# 실행 중인 태스크 (GC 되지 않도록 참조 유지)
+_tasks = set()
+
+
+def _purge_expired():
+    now = time.monotonic()
+    for job_id in [job_id for job_id, job in _jobs.items() if job["expires_at"] and job["expires_at"] <= now]:
+        del _jobs[job_id]
+
+
+def _pending_count() -> int:
+    return sum(1 for job in _jobs.values() if job["status"] in ("queued", "running"))
+
+
+def _snapshot(job: dict) -> dict:
+    now = time.monotonic()
+    started_at = job["started_at"]
+    finished_at = job["finished_at"]
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": dict(job["progress"]),
+        "queued_ms": round(((started_at or now) - job["created_at"]) * 1000),
+        "running_ms": round(((finished_at or now) - started_at) * 1000) if started_at else 0,
+        "error": job["error"],
+    }
+
+
+async def _run(job: dict, operation):
+    try:
+        async with _slots:
+            job["status"] = "running"
+            job["started_at"] = time.monotonic()
+            job["result"] = await operation(job["progress"])
+            job["status"] = "succeeded"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = {"status_code": getattr(e, "status_code", 500), "detail": getattr(e, "detail", str(e))}
+        job["error_headers"] = getattr(e, "headers", None)  # 요청 제한의 Retry-After 등
+        logger.warning("작업 실패", extra={"kind": job["kind"], "job_id": job["id"], **job["error"]})
+    finally:
+        job["finished_at"] = time.monotonic()
+        job["expires_at"] = job["finished_at"] + config.JOB_RETENTION
+        if _active.get((job["owner"], job["kind"])) == job["id"]:
+            del _active[(job["owner"], job["kind"])]
+
+
+def submit(owner: str, kind: str, operation) -> dict:
+    """
+    작업 등록. operation(progress)는 progress dict를 갱신하며 결과를 반환하는 코루틴 함수
+    같은 owner의 같은 kind 작업이 대기 / 실행 중이면 새로 만들지 않고 기존 작업 반환
+    """
+    global _slots
+    _purge_expired()
+
+    job_id = _active.get((owner, kind))
+    if job_id in _jobs:
+        return _snapshot(_jobs[job_id])
+
+    if _pending_count() >= config.JOB_MAX_PENDING:
+        raise HTTPException(status_code=503, detail="대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도해 주세요.")
+
+    if _slots is None:
+        _slots = asyncio.Semaphore(config.JOB_WORKERS)
+
+    job = {
+        "id": secrets.token_urlsafe(16),  # 추측할 수 없는 ID (결과 조회 권한 역할)
+        "owner": owner,
+        "kind": kind,
+        "status": "queued",
+        "progress": {},
+        "result": None,
+        "error": None,
+        "error_headers": None,
+        "created_at": time.monotonic(),
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": None,
+    }
+    _jobs[job["id"]] = job
+    _active[(owner, kind)] = job["id"]
+
+    task = asyncio.create_task(_run(job, operation))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return _snapshot(job)
+
+
+def _get(job_id: str) -> dict:
+    _purge_expired()
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다 (만료되었거나 잘못된 ID)")
+    return job
+
+
+def get_status(job_id: str) -> dict:
+    """
+    작업 상태 / 진행 상황 (결과 제외)
+    """
+    return _snapshot(_get(job_id))
+
+
+def get_result(job_id: str):
+    """
+    (상태, 결과) 반환. 실패한 작업은 작업의 오류로 HTTPException
+    """
+    job = _get(job_id)
+    if job["status"] == "failed":
+        raise HTTPException(
+            status_code=job["error"]["status_code"], detail=job["error"]["detail"], headers=job["error_headers"],
+        )
+    return _snapshot(job), job["result"]
+
+
+def stats() -> dict:
+    _purge_expired()
+    counts = {}
+    for job in _jobs.values():
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    return {"workers": config.JOB_WORKERS, "max_pending": config.JOB_MAX_PENDING, "jobs": counts}
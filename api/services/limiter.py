@@ -1,4 +1,17 @@
-from datetime import datetime, timedelta
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+
+from fastapi import HTTPException, Request
+
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
 
 # 1시간당 호출 허용 한도
 LIMITS = {
@@ -6,8 +19,139 @@ LIMITS = {
     "level": 72,   # 레벨별 단일 스크래핑(18레벨 * 4회 여유)
 }
 
-# { client_id: { bucket_name: {"count": int, "reset_time": datetime} } }
-user_request_log = {}
+# 한도가 모두 다시 채워지는 시간 (초)
+WINDOW = 3600
+
+
+# 토큰 버킷: 버킷마다 한도만큼 토큰을 가지고 WINDOW 동안 한도만큼 다시 채워짐
+# 요청마다 토큰 1개를 사용하고, 토큰이 없으면 다음 토큰까지 남은 시간 반환
+def _refill(tokens: float, updated_at: float, capacity: int, now: float) -> float:
+    return min(capacity, tokens + (now - updated_at) * capacity / WINDOW)
+
+
+def _take(tokens: float, capacity: int):
+    """
+    (남은 토큰, 기다려야 하는 시간(초)) 반환. 기다릴 필요가 없으면 0
+    """
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) * WINDOW / capacity
+
+
+class MemoryBackend:
+    """
+    프로세스 메모리에 버킷 저장 (워커가 하나일 때)
+    WINDOW 동안 요청이 없던 클라이언트는 버킷이 가득 찬 상태와 같으므로 주기적으로 제거
+
+    사용 중인 버킷을 밀어내면 그 클라이언트의 토큰이 다시 가득 차므로 (한도 우회) 크기 제한에 걸려도 밀어내지 않는다.
+    WINDOW 안에 max_clients 개의 버킷이 모두 사용 중이면 새 클라이언트를 FULL_RETRY_AFTER 초 동안 제한
+    """
+
+    PURGE_INTERVAL = 300  # 오래된 버킷 정리 주기 (초)
+    FULL_PURGE_INTERVAL = 1  # 버킷이 가득 찼을 때 정리 주기 (초)
+    FULL_RETRY_AFTER = 60  # 버킷이 가득 찼을 때 새 클라이언트가 기다리는 시간 (초)
+
+    def __init__(self, max_clients: int = 100_000):
+        # { (client_id, bucket): (tokens, updated_at) }
+        self.buckets = {}
+        self.max_clients = max_clients
+        self.lock = threading.Lock()
+        self.last_purge = 0.0
+
+    def _purge(self, now: float):
+        self.buckets = {key: state for key, state in self.buckets.items() if state[1] >= now - WINDOW}
+        self.last_purge = now
+
+    def take(self, key: str, capacity: int, now: float) -> float:
+        with self.lock:
+            full = key not in self.buckets and len(self.buckets) >= self.max_clients
+            if now - self.last_purge > (self.FULL_PURGE_INTERVAL if full else self.PURGE_INTERVAL):
+                self._purge(now)
+                full = key not in self.buckets and len(self.buckets) >= self.max_clients
+            if full:
+                return self.FULL_RETRY_AFTER
+            tokens, updated_at = self.buckets.get(key, (capacity, now))
+            tokens, wait = _take(_refill(tokens, updated_at, capacity, now), capacity)
+            self.buckets[key] = (tokens, now)
+        return wait
+
+
+class SQLiteBackend:
+    """
+    SQLite 파일에 버킷 저장 (uvicorn 워커 여러 개가 같은 한도를 공유)
+    읽기 / 갱신을 BEGIN IMMEDIATE 트랜잭션으로 묶어 워커 간에도 원자적으로 처리
+
+    요청 처리 중(이벤트 루프)에 동기로 호출되므로 잠금은 BUSY_TIMEOUT 까지만 기다리고,
+    그래도 다른 워커가 잠금을 잡고 있으면 LOCKED_RETRY_AFTER 초 동안 제한된 요청으로 처리
+    """
+
+    PURGE_INTERVAL = 300  # 오래된 버킷 정리 주기 (초)
+    BUSY_TIMEOUT = 0.05  # 잠금 대기 시간 (초)
+    LOCKED_RETRY_AFTER = 1  # 잠금을 얻지 못했을 때 다시 요청할 수 있는 시간 (초)
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.last_purge = 0.0
+        # 테이블 생성은 시작 시 한 번이므로 워커가 동시에 시작해도 충분히 기다림
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다 연결 하나 (sqlite3 연결은 스레드 간 공유 불가)
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            self.local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: int, now: float) -> float:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            return self.LOCKED_RETRY_AFTER
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens, wait = _take(_refill(tokens, updated_at, capacity, now), capacity)
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now)
+            )
+            if now - self.last_purge > self.PURGE_INTERVAL:
+                # WINDOW 동안 요청이 없던 클라이언트 정리 (버킷이 가득 찬 상태와 같음)
+                conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - WINDOW,))
+                self.last_purge = now
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        os.makedirs(os.path.dirname(os.path.abspath(config.RATE_LIMIT_DB_PATH)), exist_ok=True)
+        return SQLiteBackend(config.RATE_LIMIT_DB_PATH)
+    raise ValueError(f"알 수 없는 rate limit 백엔드: {name}")
+
+
+backend = create_backend(config.RATE_LIMIT_BACKEND)
 
 
 def rate_limiter(client_id: str, bucket: str = "global"):
@@ -15,32 +159,42 @@ def rate_limiter(client_id: str, bucket: str = "global"):
     client_id: 클라이언트 식별자(IP 등)
     bucket: 'global' 또는 'level'
     반환값: None      => 허용
-          timedelta => 초과 시 남은 시간
+          timedelta => 초과 시 다음 요청이 가능할 때까지 남은 시간
     """
-    now = datetime.now()
     # bucket 한도 가져오기
     limit = LIMITS.get(bucket, LIMITS["global"])
+    try:
+        wait = backend.take(f"{client_id}:{bucket}", limit, time.time())
+    except sqlite3.Error as e:
+        # 저장소 오류로 서비스 전체가 막히지 않도록 허용
+        logger.warning("rate limit 저장소 오류", extra={"error": str(e)})
+        return None
+    if wait <= 0:
+        return None
+    metrics.RATE_LIMIT_REJECTIONS.inc(bucket=bucket)
+    return timedelta(seconds=wait)
 
-    # 클라이언트 로그 초기화
-    if client_id not in user_request_log:
-        user_request_log[client_id] = {}
-    client_log = user_request_log[client_id]
-
-    # 이 버킷의 기존 기록 가져오기
-    entry = client_log.get(bucket)
 
-    # 처음 요청이거나, 이전 윈도우가 만료되었을 경우
-    if not entry or entry["reset_time"] <= now:
-        client_log[bucket] = {
-            "count": 1,
-            "reset_time": now + timedelta(hours=1)
-        }
-        return None
+def retry_after_headers(reset: timedelta) -> dict:
+    """
+    429 응답에 붙이는 표준 Retry-After 헤더 (초 단위, 올림)
+    """
+    return {"Retry-After": str(max(1, math.ceil(reset.total_seconds())))}
 
-    # 이미 한도를 초과했으면 남은 시간 반환
-    if entry["count"] >= limit:
-        return entry["reset_time"] - now
 
-    # 아직 남아 있으면 카운트만 증가
-    entry["count"] += 1
-    return None
+def check_rate_limit(request: Request, bucket: str = "global"):
+    """
+    요청 클라이언트(IP)의 bucket 한도를 사용하고, 초과했으면 Retry-After 헤더를 붙인 429 응답
+    (get_or_fetch 의 on_miss 등에 functools.partial(check_rate_limit, request) 형태로 전달)
+    """
+    reset = rate_limiter(request.client.host, bucket=bucket)
+    if reset:
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "요청 제한 초과",
+                "reset_time": str(reset),
+                "retry_after_seconds": int(reset.total_seconds()),
+            },
+            headers=retry_after_headers(reset),
+        )
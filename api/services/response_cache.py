@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import metrics
+from api.services import singleflight
+from response_encoding import dumps_json
+
+logger = logging.getLogger(__name__)
+
+# 캐시 정책: { 정책 이름: (fresh TTL, stale TTL) } 초 단위
+#  - fresh TTL 이내: 캐시 데이터를 그대로 반환
+#  - stale TTL 이내: 캐시 데이터를 즉시 반환하고 백그라운드에서 갱신
+#  - stale TTL 이후: 새로 스크래핑
+CACHE_POLICIES = {
+    "recently_played": (60, 600),       # 최근 플레이가 포함된 응답 (자주 바뀜)
+    "pumbility": (300, 3600),           # 펌빌리티 / 랭킹
+    "level_checklist": (1800, 86400),   # 레벨별 곡 체크리스트 (천천히 바뀜)
+}
+
+# 전체 캐시 메모리 한도 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# { (user_key, endpoint): {"value", "size", "fresh_until", "stale_until"} }
+_entries = OrderedDict()
+_total_bytes = 0
+
+# 백그라운드 갱신 태스크 (태스크가 GC 되지 않도록 참조 유지)
+_background_tasks = set()
+
+
+def _estimate_size(value) -> int:
+    return len(dumps_json(value))
+
+
+def _remove(key):
+    global _total_bytes
+    entry = _entries.pop(key, None)
+    if entry:
+        _total_bytes -= entry["size"]
+
+
+def store(key, value, policy: str):
+    """
+    응답 데이터를 캐시에 저장하고 메모리 한도를 넘으면 LRU 순서로 제거
+    """
+    global _total_bytes
+    fresh_ttl, stale_ttl = CACHE_POLICIES[policy]
+    size = _estimate_size(value)
+    if size > MAX_CACHE_BYTES:
+        return
+
+    now = time.monotonic()
+    _remove(key)
+    _entries[key] = {
+        "value": value,
+        "size": size,
+        "fresh_until": now + fresh_ttl,
+        "stale_until": now + stale_ttl,
+    }
+    _total_bytes += size
+
+    while _total_bytes > MAX_CACHE_BYTES:
+        oldest_key = next(iter(_entries))
+        _remove(oldest_key)
+
+
+def lookup(key):
+    """
+    캐시 항목 조회 (stale TTL이 지난 항목은 삭제 후 None)
+    """
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() >= entry["stale_until"]:
+        _remove(key)
+        return None
+    _entries.move_to_end(key)
+    return entry
+
+
+def invalidate_user(user_key: str):
+    """
+    특정 사용자의 캐시 항목 전체 삭제
+    """
+    for key in [key for key in _entries if key[0] == user_key]:
+        _remove(key)
+
+
+def without_errors(value) -> bool:
+    """
+    cacheable 기본 조건: 일부 페이지를 가져오지 못한 결과는 캐시하지 않음
+    ({"errors": [...]} dict 또는 errors 속성이 있는 객체 - UserRecords 등)
+    """
+    errors = value.get("errors") if isinstance(value, dict) else getattr(value, "errors", None)
+    return not errors
+
+
+async def _fetch_and_store(key, fetcher, policy: str, cacheable=without_errors):
+    # 같은 키의 스크래핑은 동시에 하나만 실행하고, 기다리던 요청은 같은 결과를 받음
+    async def fetch():
+        value = await fetcher()
+        if cacheable(value):
+            store(key, value, policy)
+        return value
+
+    return await singleflight.do(key, fetch)
+
+
+def _cache_name(endpoint) -> str:
+    # ("song_details_level", 19) 처럼 튜플인 키는 레벨별로 라벨이 늘어나지 않도록 이름만 사용
+    return endpoint[0] if isinstance(endpoint, tuple) else endpoint
+
+
+def _schedule_refresh(key, fetcher, policy: str, cacheable):
+    if singleflight.in_flight(key):
+        return
+
+    async def refresh():
+        try:
+            await _fetch_and_store(key, fetcher, policy, cacheable)
+        except Exception as e:
+            logger.warning("캐시 백그라운드 갱신 실패", extra={"cache": _cache_name(key[1]), "error": str(e)})
+
+    task = asyncio.create_task(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def get_or_fetch(
+    user_key: str, endpoint, fetcher, policy: str, force_refresh: bool = False, on_miss=None, cacheable=without_errors,
+):
+    """
+    사용자 + 엔드포인트 단위 응답 캐시
+    fetcher: 데이터를 새로 스크래핑하는 코루틴 함수
+    on_miss: 캐시를 사용할 수 없어 스크래핑하기 직전에 호출 (요청 제한 검사 등)
+             같은 키의 스크래핑이 이미 진행 중이면 그 결과를 기다리므로 호출하지 않음
+    force_refresh: True면 캐시를 무시하고 새로 스크래핑 (진행 중인 스크래핑이 있으면 그 결과 사용)
+    cacheable: 결과를 캐시에 저장할지 판단하는 함수 (기본: "errors" 가 비어 있는 결과만 저장)
+    """
+    key = (user_key, endpoint)
+    entry = None if force_refresh else lookup(key)
+
+    if entry is not None:
+        stale = time.monotonic() >= entry["fresh_until"]
+        metrics.CACHE_REQUESTS.inc(cache=_cache_name(endpoint), result="stale" if stale else "hit")
+        if stale:
+            _schedule_refresh(key, fetcher, policy, cacheable)
+        return entry["value"]
+
+    metrics.CACHE_REQUESTS.inc(cache=_cache_name(endpoint), result="bypass" if force_refresh else "miss")
+    if on_miss and not singleflight.in_flight(key):
+        on_miss()
+
+    return await _fetch_and_store(key, fetcher, policy, cacheable)
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from api.services.db import db_connection
+
+# 계정 식별용 키 생성에 사용하는 secret (서버 재시작 후에도 동일해야 하므로 환경 변수로 고정)
+ACCOUNT_KEY_SECRET = os.getenv("PIU_ACCOUNT_KEY_SECRET", "piu-checker")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS user_level_scores (
+    account_key TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    summary JSONB,
+    songs JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (account_key, level)
+);
+
+-- 계정별 베스트 스코어 버전 (곡이 추가 / 갱신 / 삭제될 때마다 1 증가)
+CREATE TABLE IF NOT EXISTS user_score_versions (
+    account_key TEXT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- 버전별 변경 내역 (최근 SCORE_CHANGE_RETENTION 개 버전만 보관)
+CREATE TABLE IF NOT EXISTS user_score_changes (
+    account_key TEXT NOT NULL,
+    version BIGINT NOT NULL,
+    level INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    change TEXT NOT NULL,
+    score DOUBLE PRECISION,
+    previous_score DOUBLE PRECISION
+);
+CREATE INDEX IF NOT EXISTS user_score_changes_account_version ON user_score_changes (account_key, version);
+"""
+
+# 변경 내역을 보관하는 버전 수 (이보다 오래된 버전에서 요청하면 전체 데이터 반환)
+SCORE_CHANGE_RETENTION = 100
+
+MODES = ("single", "double")
+
+_schema_ready = False
+
+
+def account_key(username: str) -> str:
+    """
+    계정별 저장 데이터의 키 (아이디를 그대로 저장하지 않도록 해시 사용)
+    """
+    return hashlib.sha256(f"{ACCOUNT_KEY_SECRET}:{username}".encode("utf-8")).hexdigest()
+
+
+def _ensure_schema(cursor):
+    global _schema_ready
+    if not _schema_ready:
+        cursor.execute(SCHEMA_SQL)
+        _schema_ready = True
+
+
+def load_user_levels(key: str) -> Dict[int, dict]:
+    """
+    저장된 레벨별 요약 / 베스트 스코어를
+    {level: {"summary": {...}, "songs": {"single": [...], "double": [...]}}} 형태로 반환
+    """
+    with db_connection() as conn, conn.cursor() as cursor:
+        _ensure_schema(cursor)
+        cursor.execute(
+            "SELECT level, summary, songs FROM user_level_scores WHERE account_key = %s",
+            (key,)
+        )
+        return {
+            level: {"summary": summary, "songs": songs}
+            for level, summary, songs in cursor.fetchall()
+        }
+
+
+def change_type(before: Optional[float], after: Optional[float]) -> str:
+    """
+    이전 / 새 점수로 변경 종류 결정 (added / improved / decreased / removed, 없던 / 삭제된 곡은 None)
+    """
+    if before is None:
+        return "added"
+    if after is None:
+        return "removed"
+    return "improved" if after > before else "decreased"
+
+
+def diff_songs(level: int, old_songs: Optional[dict], new_songs: dict) -> List[tuple]:
+    """
+    레벨 하나의 이전 / 새 베스트 스코어 비교
+    반환값: [(level, mode, name, change, score, previous_score)] (change: added / improved / decreased / removed)
+    """
+    changes = []
+    for mode in MODES:
+        old = {song["name"]: song["score"] for song in (old_songs or {}).get(mode, [])}
+        new = {song["name"]: song["score"] for song in new_songs.get(mode, [])}
+        for name, score in new.items():
+            if name not in old:
+                changes.append((level, mode, name, "added", score, None))
+            elif old[name] != score:
+                changes.append((level, mode, name, change_type(old[name], score), score, old[name]))
+        for name, score in old.items():
+            if name not in new:
+                changes.append((level, mode, name, "removed", None, score))
+    return changes
+
+
+def _record_changes(cursor, key: str, levels: Dict[int, dict]) -> int:
+    """
+    저장 전 데이터와 비교해 변경 내역을 새 버전으로 기록하고 현재 버전 반환
+    처음 저장하는 계정은 변경 내역 없이 버전 1 (이전 버전이 없으므로 클라이언트는 전체 데이터를 받음)
+    """
+    # 버전 행을 잠가 같은 계정의 동시 저장이 같은 버전을 쓰지 않도록 함
+    cursor.execute(
+        "INSERT INTO user_score_versions (account_key, version) VALUES (%s, 0) ON CONFLICT DO NOTHING",
+        (key,)
+    )
+    cursor.execute("SELECT version FROM user_score_versions WHERE account_key = %s FOR UPDATE", (key,))
+    version = cursor.fetchone()[0]
+    if version == 0:
+        cursor.execute("UPDATE user_score_versions SET version = 1, updated_at = NOW() WHERE account_key = %s", (key,))
+        return 1
+
+    cursor.execute(
+        "SELECT level, songs FROM user_level_scores WHERE account_key = %s AND level = ANY(%s)",
+        (key, list(levels))
+    )
+    previous = dict(cursor.fetchall())
+    changes = [
+        change
+        for level, data in levels.items()
+        for change in diff_songs(level, previous.get(level), data["songs"])
+    ]
+    if not changes:
+        return version
+
+    version += 1
+    execute_values(
+        cursor,
+        """
+        INSERT INTO user_score_changes (account_key, version, level, mode, name, change, score, previous_score)
+        VALUES %s
+        """,
+        [(key, version, *change) for change in changes]
+    )
+    cursor.execute("UPDATE user_score_versions SET version = %s, updated_at = NOW() WHERE account_key = %s", (version, key))
+    cursor.execute(
+        "DELETE FROM user_score_changes WHERE account_key = %s AND version <= %s",
+        (key, version - SCORE_CHANGE_RETENTION)
+    )
+    return version
+
+
+def save_user_levels(key: str, levels: Dict[int, dict]) -> Optional[int]:
+    """
+    레벨별 요약 / 베스트 스코어를 한 번에 upsert 하고 변경 내역을 기록. 저장 후 버전 반환
+    """
+    if not levels:
+        return None
+
+    rows = [
+        (key, level, json.dumps(data["summary"], ensure_ascii=False), json.dumps(data["songs"], ensure_ascii=False))
+        for level, data in levels.items()
+    ]
+    with db_connection() as conn, conn.cursor() as cursor:
+        _ensure_schema(cursor)
+        version = _record_changes(cursor, key, levels)
+        execute_values(
+            cursor,
+            """
+            INSERT INTO user_level_scores (account_key, level, summary, songs)
+            VALUES %s
+            ON CONFLICT (account_key, level) DO UPDATE
+            SET summary = EXCLUDED.summary, songs = EXCLUDED.songs, updated_at = NOW();
+            """,
+            rows,
+            template="(%s, %s, %s::jsonb, %s::jsonb)"
+        )
+    return version
+
+
+def load_changes_since(key: str, since_version: int) -> Tuple[Optional[int], Optional[List[dict]], Optional[dict]]:
+    """
+    since_version 이후의 변경 내역을 곡 단위로 합쳐 (현재 버전, 변경 목록, 저장된 레벨) 로 반환
+    변경 목록이 None 이면 차이를 계산할 수 없으므로 (버전 정보 없음 / 너무 오래된 버전) 전체 데이터를 보내야 하며,
+    이때 저장된 레벨({level: {"summary", "songs"}}, load_user_levels 와 같은 형태)을 같은 버전 기준으로 함께 반환
+    (버전 행을 FOR SHARE 로 잠가 조회 중에 다른 저장이 끼어들지 않음)
+    변경 항목: {"level", "mode", "name", "change", "score", "previous_score"}
+    """
+    with db_connection() as conn, conn.cursor() as cursor:
+        _ensure_schema(cursor)
+        cursor.execute("SELECT version FROM user_score_versions WHERE account_key = %s FOR SHARE", (key,))
+        row = cursor.fetchone()
+        version = row[0] if row else None
+        if not version or since_version < 1 or since_version > version \
+                or since_version < version - SCORE_CHANGE_RETENTION:
+            cursor.execute(
+                "SELECT level, summary, songs FROM user_level_scores WHERE account_key = %s",
+                (key,)
+            )
+            levels = {
+                level: {"summary": summary, "songs": songs}
+                for level, summary, songs in cursor.fetchall()
+            }
+            return version, None, levels
+
+        cursor.execute(
+            """
+            SELECT level, mode, name, change, score, previous_score
+              FROM user_score_changes
+             WHERE account_key = %s AND version > %s
+          ORDER BY version
+            """,
+            (key, since_version)
+        )
+        rows = cursor.fetchall()
+
+    # 같은 곡의 여러 버전 변경을 하나로 합침 (since_version 시점 점수 → 현재 점수, 없던 / 삭제된 곡은 None)
+    states = {}
+    for level, mode, name, change, score, previous_score in rows:
+        before, _ = states.get((level, mode, name), (previous_score, None))
+        states[(level, mode, name)] = (before, score)
+
+    changes = []
+    for (level, mode, name), (before, after) in states.items():
+        if before == after:
+            continue  # 추가 후 삭제, 같은 점수로 다시 추가 등 결과적으로 바뀌지 않은 곡
+        changes.append({
+            "level": level, "mode": mode, "name": name,
+            "change": change_type(before, after), "score": after, "previous_score": before,
+        })
+    return version, changes, None
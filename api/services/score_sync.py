@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import math
+
+import aiohttp
+
+from config import PIUGAME_BASE_URL
+from scraper import (
+    LEVELS,
+    fetch_all_levels_data_async,
+    fetch_page_with_retry,
+    fetch_song_details_for_level,
+    parse_recent_plays,
+)
+from models import LevelSummary, RecentPlay
+from api.services.db import run_db
+from api.services.score_store import account_key, load_user_levels, save_user_levels
+from api.services import singleflight
+from api.services.session_store import credential_key, run_with_session
+
+logger = logging.getLogger(__name__)
+
+PLAY_DATA_URL = f"{PIUGAME_BASE_URL}/my_page/play_data.php"
+RECENTLY_PLAYED_URL = f"{PIUGAME_BASE_URL}/my_page/recently_played.php"
+
+# 베스트 스코어를 수집하는 레벨 (10 ~ 27)
+SCORE_LEVELS = list(range(10, 28))
+
+
+def summary_level(level: int) -> str:
+    """
+    my_best_score 레벨에 대응하는 play_data 요약 레벨 (27은 '27over')
+    """
+    return "27over" if level >= 27 else str(level)
+
+
+def format_score(score: int) -> float:
+    """
+    987654 형식의 점수를 베스트 스코어와 같은 NN.N 형식으로 변환
+    """
+    return math.floor((score / 10000) * 10) / 10
+
+
+def parse_recent_play(play: RecentPlay):
+    """
+    최근 플레이 기록에서 (레벨, 싱글/더블, 곡 이름, 점수)를 추출. 레벨을 알 수 없으면 None
+    """
+    if play.chart_level is None:
+        return None
+    return play.chart_level, play.mode, play.song_name, format_score(play.score)
+
+
+def find_changed_levels(stored: dict, summaries: dict, summary_errors: set, recent_plays: list) -> list:
+    """
+    다시 스크래핑해야 하는 레벨 목록
+      - 저장된 데이터가 없는 레벨
+      - play_data 요약(레이팅 / 클리어 수 / 플레이트)이 바뀌었거나 확인하지 못한 레벨
+      - 최근 플레이 중 저장된 베스트 스코어보다 높은 점수가 있는 레벨
+    """
+    changed = set()
+
+    for level in SCORE_LEVELS:
+        saved = stored.get(level)
+        key = summary_level(level)
+        if saved is None or key in summary_errors or saved["summary"] != summaries.get(key):
+            changed.add(level)
+
+    for play in recent_plays:
+        parsed = parse_recent_play(play)
+        if parsed is None:
+            continue
+        level, mode, name, score = parsed
+        if level not in SCORE_LEVELS or level in changed:
+            continue
+        best = {song["name"]: song["score"] for song in stored[level]["songs"][mode]}
+        if name not in best or score > best[name]:
+            changed.add(level)
+
+    return sorted(changed)
+
+
+async def sync_song_details(username: str, password: str, full_sync: bool = False):
+    """
+    _sync_song_details를 계정별로 한 번만 실행 (/fetch-song-details 와 /fetch-song-details/levels 가
+    동시에 들어와도 스크래핑은 한 번, 결과는 함께 사용하므로 호출 측에서 수정하지 말 것)
+    반환값: (레벨별 곡 데이터, 가져오지 못한 페이지 오류 리스트)
+    """
+    return await singleflight.do(
+        (credential_key(username, password), ("sync_song_details", full_sync)),
+        lambda: _sync_song_details(username, password, full_sync),
+    )
+
+
+async def _sync_song_details(username: str, password: str, full_sync: bool = False, on_event=None):
+    """
+    바뀐 레벨만 다시 스크래핑하는 증분 동기화.
+    저장된 베스트 스코어와 병합한 전체 결과(fetch_song_details_for_all_levels와 같은 형태)와
+    가져오지 못한 페이지 오류({"level", "page", "error"}) 리스트를 반환한다. 실패한 페이지를 제외한 나머지 데이터는 그대로 사용.
+    저장소(DB)를 사용할 수 없으면 전체 레벨을 스크래핑한다.
+    on_event: 레벨이 준비될 때마다 호출되는 코루틴 함수 (stream_song_details 참고)
+    """
+    key = account_key(username)
+
+    async def emit(event):
+        if on_event is not None:
+            await on_event(event)
+
+    try:
+        stored = {} if full_sync else await run_db(load_user_levels, key)
+    except Exception as e:
+        logger.warning("저장된 베스트 스코어 조회 실패, 전체 동기화 진행", extra={"error": str(e)})
+        stored = {}
+
+    async def scrape(cookie_jar):
+        async with aiohttp.ClientSession(cookie_jar=cookie_jar) as async_session:
+            # 1) 레벨별 요약 + 최근 플레이 (변경 감지용)
+            (levels_data, level_errors), recently_played_html = await asyncio.gather(
+                fetch_all_levels_data_async(async_session, PLAY_DATA_URL, levels=LEVELS),
+                fetch_page_with_retry(async_session, RECENTLY_PLAYED_URL),
+            )
+            # 저장된 요약과 비교하도록 기존 형식(dict)으로 변환
+            summaries = {}
+            for data in map(LevelSummary.to_dict, levels_data):
+                summaries[data.pop("level")] = data
+            summary_errors = {error["level"] for error in level_errors}
+            recent_plays = parse_recent_plays(recently_played_html)
+
+            # 2) 바뀐 레벨만 베스트 스코어 스크래핑
+            changed_levels = find_changed_levels(stored, summaries, summary_errors, recent_plays)
+            logger.info("증분 동기화", extra={"changed_levels": changed_levels, "total": len(SCORE_LEVELS)})
+
+            await emit({"type": "plan", "scraped_levels": changed_levels})
+
+            # 바뀌지 않은 레벨은 저장된 데이터로 바로 전달
+            for level in SCORE_LEVELS:
+                if level not in changed_levels:
+                    songs = stored.get(level, {}).get("songs", {"single": [], "double": []})
+                    await emit({"type": "level", "level": level, "source": "stored", "data": songs})
+
+            progress_tracker = {"total": len(changed_levels), "completed": 0}
+
+            async def fetch_level(level):
+                songs = await fetch_song_details_for_level(async_session, level, progress_tracker)
+                await emit({"type": "level", "level": level, "source": "scraped", "data": songs})
+                return songs
+
+            results = await asyncio.gather(*(fetch_level(level) for level in changed_levels))
+            return summaries, summary_errors, changed_levels, results, progress_tracker
+
+    summaries, summary_errors, changed_levels, results, progress_tracker = await run_with_session(
+        username, password, scrape
+    )
+
+    # 3) 오류 없이 수집한 레벨만 저장 (실패한 레벨은 다음 동기화 때 다시 시도)
+    failed_levels = {error["level"] for error in progress_tracker.get("errors", [])}
+    updates = {
+        level: {"summary": summaries.get(summary_level(level)), "songs": songs}
+        for level, songs in zip(changed_levels, results)
+        if level not in failed_levels and summary_level(level) not in summary_errors
+    }
+    try:
+        await run_db(save_user_levels, key, updates)
+    except Exception as e:
+        logger.warning("베스트 스코어 저장 실패", extra={"error": str(e)})
+
+    await emit({
+        "type": "summary",
+        "scraped_levels": changed_levels,
+        "errors": progress_tracker.get("errors", []),
+    })
+
+    # 4) 저장된 데이터와 병합
+    merged = {level: data["songs"] for level, data in stored.items()}
+    merged.update(zip(changed_levels, results))
+    song_data = {f"level_{level}": merged.get(level, {"single": [], "double": []}) for level in SCORE_LEVELS}
+    return song_data, progress_tracker.get("errors", [])
+
+
+async def stream_song_details(username: str, password: str, full_sync: bool = False):
+    """
+    증분 동기화를 실행하면서 이벤트를 준비되는 순서대로 내보내는 async generator
+      - {"type": "plan", "scraped_levels": [...]}: 새로 스크래핑할 레벨
+      - {"type": "level", "level", "source": "stored" | "scraped", "data": {"single": [], "double": []}}
+      - {"type": "summary", "scraped_levels", "errors"}: 완료
+      - {"type": "error", "status_code", "detail"}: 실패 (이후 이벤트 없음)
+    세션 만료로 재시도하면 같은 레벨이 다시 올 수 있으므로 레벨은 처음 한 번만 전달
+    generator 를 닫으면(클라이언트 연결 종료 등) 스크래핑도 취소
+    """
+    queue = asyncio.Queue()
+
+    async def run():
+        try:
+            await _sync_song_details(username, password, full_sync, on_event=queue.put)
+        except Exception as e:
+            await queue.put({
+                "type": "error",
+                "status_code": getattr(e, "status_code", 500),
+                "detail": getattr(e, "detail", str(e)),
+            })
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run())
+    sent_levels = set()
+    try:
+        while (event := await queue.get()) is not None:
+            if event["type"] == "level":
+                if event["level"] in sent_levels:
+                    continue
+                sent_levels.add(event["level"])
+            yield event
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,136 @@
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+
+import aiohttp
+import requests
+from cachetools import TTLCache
+from fastapi import HTTPException
+from yarl import URL
+
+import outbound
+from config import PIUGAME_BASE_URL
+from login import login_to_piugame, login_to_piugame_async, SessionExpiredError
+from api.services import singleflight
+
+logger = logging.getLogger(__name__)
+
+# 로그인 세션 캐시 설정 (20분 TTL, 최대 500명, 가득 차면 LRU 제거)
+SESSION_TTL = 1200
+MAX_SESSIONS = 500
+
+COOKIE_URL = URL(f"{PIUGAME_BASE_URL}/")
+
+# { credential_key: {name: value} } 로그인 쿠키만 저장 (비밀번호는 저장하지 않음)
+# 이벤트 루프와 동기 라우트의 스레드 풀에서 함께 접근하므로 항상 _session_cache_lock 을 잡는다
+session_cache = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL)
+_session_cache_lock = threading.Lock()
+
+# 프로세스마다 새로 생성되는 salt (키에서 자격 증명을 역추적하지 못하도록)
+_KEY_SALT = secrets.token_bytes(16)
+
+
+def credential_key(username: str, password: str) -> str:
+    """
+    아이디/비밀번호의 salted hash. 세션 및 사용자별 캐시의 키로 사용
+    """
+    message = f"{username}\0{password}".encode("utf-8")
+    return hmac.new(_KEY_SALT, message, hashlib.sha256).hexdigest()
+
+
+def invalidate_session(username: str, password: str):
+    """
+    캐시된 로그인 세션 삭제 (세션 만료 감지 시 호출)
+    """
+    key = credential_key(username, password)
+    with _session_cache_lock:
+        session_cache.pop(key, None)
+
+
+def _get_cookies(key: str):
+    with _session_cache_lock:
+        return session_cache.get(key)
+
+
+def _store_cookies(key: str, cookies: dict):
+    with _session_cache_lock:
+        session_cache[key] = cookies
+
+
+def _build_cookie_jar(cookies: dict) -> aiohttp.CookieJar:
+    cookie_jar = aiohttp.CookieJar(unsafe=True)
+    cookie_jar.update_cookies(cookies, response_url=COOKIE_URL)
+    return cookie_jar
+
+
+def _build_requests_session(cookies: dict) -> requests.Session:
+    session = requests.Session()
+    session.cookies.update(cookies)
+    return session
+
+
+async def get_cookie_jar(username: str, password: str) -> aiohttp.CookieJar:
+    """
+    캐시된 로그인 쿠키로 CookieJar 생성. 캐시에 없으면 비동기 로그인 후 저장
+    (같은 계정의 로그인이 동시에 필요하면 한 번만 로그인)
+    """
+    key = credential_key(username, password)
+
+    async def login():
+        cookie_jar = await login_to_piugame_async(username, password)
+        cookies = {cookie.key: cookie.value for cookie in cookie_jar}
+        _store_cookies(key, cookies)
+        return cookies
+
+    cookies = _get_cookies(key)
+    if cookies is None:
+        cookies = await singleflight.do((key, "login"), login)
+    return _build_cookie_jar(cookies)
+
+
+def get_requests_session(username: str, password: str) -> requests.Session:
+    """
+    캐시된 로그인 쿠키로 requests.Session 생성. 캐시에 없으면 동기 로그인 후 저장
+    """
+    key = credential_key(username, password)
+    cookies = _get_cookies(key)
+    if cookies is None:
+        session = login_to_piugame(username, password)
+        cookies = session.cookies.get_dict()
+        _store_cookies(key, cookies)
+    return _build_requests_session(cookies)
+
+
+async def run_with_session(username: str, password: str, operation):
+    """
+    operation(cookie_jar)을 실행. 세션 만료가 감지되면 재로그인 후 한 번 더 시도
+    (안에서 나가는 요청은 outbound 스케줄러에서 이 사용자의 요청으로 배정)
+    """
+    with outbound.request_context(user=username):
+        for attempt in range(2):
+            cookie_jar = await get_cookie_jar(username, password)
+            try:
+                return await operation(cookie_jar)
+            except SessionExpiredError:
+                logger.info("세션 만료 감지, 재로그인 시도", extra={"attempt": attempt + 1, "retries": 2})
+                invalidate_session(username, password)
+
+    raise HTTPException(status_code=401, detail="로그인 실패")
+
+
+def run_with_session_sync(username: str, password: str, operation):
+    """
+    operation(requests.Session)을 실행. 세션 만료가 감지되면 재로그인 후 한 번 더 시도
+    """
+    with outbound.request_context(user=username):
+        for attempt in range(2):
+            session = get_requests_session(username, password)
+            try:
+                return operation(session)
+            except SessionExpiredError:
+                logger.info("세션 만료 감지, 재로그인 시도", extra={"attempt": attempt + 1, "retries": 2})
+                invalidate_session(username, password)
+
+    raise HTTPException(status_code=401, detail="로그인 실패")
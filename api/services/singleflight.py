@@ -0,0 +1,47 @@
+import asyncio
+
+# 진행 중인 작업 { key: {"task": asyncio.Task, "waiters": int} }
+_flights = {}
+
+
+def in_flight(key) -> bool:
+    """
+    같은 key의 작업이 이미 진행 중인지 여부
+    """
+    return key in _flights
+
+
+def _finish(key, task):
+    if _flights.get(key, {}).get("task") is task:
+        del _flights[key]
+    # 기다리는 쪽이 모두 취소된 경우에도 "exception was never retrieved" 경고가 나지 않도록 확인
+    if not task.cancelled():
+        task.exception()
+
+
+async def do(key, operation):
+    """
+    같은 key로 동시에 들어온 호출은 operation()을 한 번만 실행하고 결과(또는 예외)를 함께 받음
+    - key 예: (user_key, "song_details"), (user_key, ("song_details_level", 19))
+    - 기다리던 호출 하나가 취소되어도 공유 작업은 계속 진행 (asyncio.shield)
+    - 기다리는 호출이 모두 취소되면 공유 작업도 취소
+    """
+    flight = _flights.get(key)
+    if flight is None:
+        task = asyncio.create_task(operation())
+        flight = _flights[key] = {"task": task, "waiters": 0}
+        task.add_done_callback(lambda done: _finish(key, done))
+
+    task = flight["task"]
+    flight["waiters"] += 1
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if not task.done() and flight["waiters"] == 1:
+            # 이후 들어오는 호출은 취소 중인 작업 대신 새 작업을 시작하도록 먼저 제거
+            if _flights.get(key) is flight:
+                del _flights[key]
+            task.cancel()
+        raise
+    finally:
+        flight["waiters"] -= 1
@@ -0,0 +1,37 @@
+"""
+실제 piugame 페이지를 저장해 fixture로 쓸 때 개인 정보를 지우는 도구.
+닉네임 / 칭호 / 아바타 이미지 / CSRF 토큰 / 계정 ID를 가짜 값으로 바꾼다.
+
+    python -m bench.anonymize recorded.html bench/fixtures/pumbility.html
+"""
+import re
+import sys
+
+REPLACEMENTS = [
+    # 닉네임 / 칭호
+    (re.compile(r'(<p class="t2 en">)[^<]*(</p>)'), r"\g<1>PLAYER0001\g<2>"),
+    (re.compile(r'(<p class="t1 en">)[^<]*(</p>)'), r"\g<1>LV.42 PLAYER\g<2>"),
+    (re.compile(r'(class="profile_name en pl0">)[^<]*(<)'), r"\g<1>PLAYER0001\g<2>"),
+    (re.compile(r'(class="profile_name st1 en">)[^<]*(<)'), r"\g<1>#0001\g<2>"),
+    # 아바타 이미지 (곡 이미지는 그대로 유지)
+    (re.compile(r"(avatar_img/)[0-9A-Za-z_]+"), r"\g<1>00000000000000000000000000000000"),
+    # CSRF 토큰 / 계정 ID
+    (re.compile(r'(name="csrf_token" value=")[^"]*(")'), r"\g<1>0000000000000000000000000000000000000000\g<2>"),
+    (re.compile(r'(name="mb_id"[^>]*value=")[^"]*(")'), r"\g<1>\g<2>"),
+]
+
+
+def anonymize(html: str) -> str:
+    for pattern, replacement in REPLACEMENTS:
+        html = pattern.sub(replacement, html)
+    return html
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("사용법: python -m bench.anonymize <저장한 HTML> <fixture 경로>")
+        sys.exit(2)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        source = f.read()
+    with open(sys.argv[2], "w", encoding="utf-8") as f:
+        f.write(anonymize(source))
@@ -0,0 +1,125 @@
+"""
+로컬 piugame 대체 서버(bench.fake_piugame)를 띄우고 FastAPI 앱을 실제 HTTP로 호출해
+엔드포인트별 지연 시간과 upstream 요청 수를 측정하는 end-to-end 모드.
+
+    python -m bench.e2e --iterations 5 --concurrency 2 --latency 0.15 --pages 4
+    python -m bench.e2e --endpoints dashboard,fetch-all-user-data --cached
+
+DB를 사용하는 엔드포인트(fetch-song-details, level)는 PostgreSQL이 없으면 오류로 집계된다.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+
+import aiohttp
+
+from bench import fake_piugame
+
+ENDPOINTS = {
+    "fetch-all-user-data": "/fetch-all-user-data",
+    "dashboard": "/dashboard",
+    "fetch-song-details": "/fetch-song-details",
+    "level-20": "/fetch-song-details/level/20",
+}
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def start_app(port: int):
+    """
+    PIUGAME_BASE_URL 설정 후 앱을 불러와 uvicorn으로 실행 (요청 제한은 측정을 위해 해제)
+    """
+    import uvicorn
+    import main
+    from api.services import limiter
+
+    for bucket in limiter.LIMITS:
+        limiter.LIMITS[bucket] = 10 ** 9
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def run_endpoint(client, app_url, path, fake, args):
+    """
+    한 엔드포인트를 iterations번 호출 (동시에 concurrency개)하고 측정값 반환
+    """
+    fake.request_counts.clear()
+    latencies = []
+    statuses = Counter()
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def call(index):
+        payload = {
+            "username": f"e2e_user{index % args.users}",
+            "password": "password",
+            "force_refresh": not args.cached,
+        }
+        async with limit:
+            start = time.perf_counter()
+            async with client.post(app_url + path, json=payload) as response:
+                await response.read()
+                statuses[response.status] += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(call(index) for index in range(args.iterations)))
+
+    return {
+        "calls": len(latencies),
+        "statuses": dict(statuses),
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 0.95),
+        "max": max(latencies),
+        "upstream": sum(fake.request_counts.values()),
+    }
+
+
+async def run(args):
+    fake = fake_piugame.from_arguments(args)
+    fake_runner = await fake_piugame.start_server(fake, port=args.fake_port)
+    os.environ["PIUGAME_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}"
+    server, server_task = await start_app(args.app_port)
+
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    selected = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    print(f"{'endpoint':<22}{'calls':>6}{'p50 s':>9}{'p95 s':>9}{'max s':>9}{'upstream/call':>15}  status")
+    try:
+        timeout = aiohttp.ClientTimeout(total=600)
+        async with aiohttp.ClientSession(timeout=timeout) as client:
+            for name in selected:
+                result = await run_endpoint(client, app_url, ENDPOINTS[name], fake, args)
+                print(
+                    f"{name:<22}{result['calls']:>6}{result['p50']:>9.3f}{result['p95']:>9.3f}{result['max']:>9.3f}"
+                    f"{result['upstream'] / result['calls']:>15.1f}  {result['statuses']}"
+                )
+    finally:
+        server.should_exit = True
+        await server_task
+        await fake_runner.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 대체 서버 기반 end-to-end 지연 시간 측정")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="측정할 엔드포인트 (쉼표 구분)")
+    parser.add_argument("--iterations", type=int, default=5, help="엔드포인트별 호출 횟수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시 호출 수")
+    parser.add_argument("--users", type=int, default=1, help="번갈아 사용할 가상 계정 수")
+    parser.add_argument("--cached", action="store_true", help="응답 캐시 사용 (기본은 force_refresh)")
+    parser.add_argument("--app-port", type=int, default=8810)
+    parser.add_argument("--fake-port", type=int, default=8800)
+    fake_piugame.add_arguments(parser)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
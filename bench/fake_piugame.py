@@ -0,0 +1,184 @@
+"""
+로컬 piugame 대체 서버. bench/fixture_builder의 익명 페이지를 응답하며
+지연 시간 / 오류 비율 / 레벨별 페이지 수 / 세션 만료를 설정할 수 있다.
+
+    python -m bench.fake_piugame --port 8800 --latency 0.15 --error-rate 0.02
+    PIUGAME_BASE_URL=http://127.0.0.1:8800 uvicorn main:app
+
+비밀번호가 "wrong"이면 로그인 실패 페이지를 응답한다.
+GET /__stats 로 경로별 요청 수를, POST /__reset 으로 초기화할 수 있다.
+"""
+import argparse
+import asyncio
+import random
+import secrets
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from bench import fixture_builder
+
+
+class FakePiugame:
+    def __init__(self, latency=0.1, jitter=0.05, error_rate=0.0, pages=3, pages_by_level=None, session_ttl=1200, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.pages = pages
+        self.pages_by_level = pages_by_level or {}
+        self.session_ttl = session_ttl
+        self.random = random.Random(seed)
+        self.sessions = {}  # { PHPSESSID: 만료 시각 }
+        self.request_counts = Counter()
+        self.status_counts = Counter()
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.simulate_network])
+        app.router.add_get("/bbs/login.php", self.login_page)
+        app.router.add_post("/bbs/login_check.php", self.login_check)
+        app.router.add_get("/my_page/play_data.php", self.play_data)
+        app.router.add_get("/my_page/my_best_score.php", self.best_score)
+        app.router.add_get("/my_page/pumbility.php", self.pumbility)
+        app.router.add_get("/my_page/recently_played.php", self.recently_played)
+        app.router.add_get("/leaderboard/pumbility_ranking.php", self.ranking)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_post("/__reset", self.reset)
+        return app
+
+    @web.middleware
+    async def simulate_network(self, request, handler):
+        if request.path.startswith("/__"):
+            return await handler(request)
+
+        self.request_counts[request.path] += 1
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay)
+
+        if self.random.random() < self.error_rate:
+            self.status_counts[500] += 1
+            raise web.HTTPInternalServerError()
+
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            self.status_counts[e.status] += 1
+            raise
+        self.status_counts[response.status] += 1
+        return response
+
+    def page_count(self, level: str) -> int:
+        return self.pages_by_level.get(level, self.pages)
+
+    def require_session(self, request):
+        """
+        로그인 세션이 없거나 만료되었으면 로그인 페이지로 리다이렉트
+        """
+        session_id = request.cookies.get("PHPSESSID")
+        expires_at = self.sessions.get(session_id)
+        if expires_at is None or expires_at < time.monotonic():
+            self.sessions.pop(session_id, None)
+            raise web.HTTPFound("/bbs/login.php")
+
+    @staticmethod
+    def html(body: str) -> web.Response:
+        return web.Response(text=body, content_type="text/html", charset="utf-8")
+
+    async def login_page(self, request):
+        return self.html(fixture_builder.login_page())
+
+    async def login_check(self, request):
+        form = await request.post()
+        if not form.get("csrf_token") or form.get("mb_password") == "wrong":
+            return self.html("<script>alert('로그인 실패');</script>")
+
+        session_id = secrets.token_hex(16)
+        self.sessions[session_id] = time.monotonic() + self.session_ttl
+        response = web.HTTPFound(form.get("url") or "/my_page/play_data.php")
+        response.set_cookie("PHPSESSID", session_id, path="/")
+        raise response
+
+    async def play_data(self, request):
+        self.require_session(request)
+        level = request.query.get("lv", "ALL")
+        return self.html(fixture_builder.play_data_page(level))
+
+    async def best_score(self, request):
+        self.require_session(request)
+        level = request.query.get("lv", "10")
+        page = int(request.query.get("page", "1"))
+        max_page = self.page_count(level)
+        if page > max_page:
+            return self.html(fixture_builder.best_score_page(int(level), page, max_page, per_page=0))
+        return self.html(fixture_builder.best_score_page(int(level), page, max_page))
+
+    async def pumbility(self, request):
+        self.require_session(request)
+        return self.html(fixture_builder.pumbility_page())
+
+    async def recently_played(self, request):
+        self.require_session(request)
+        return self.html(fixture_builder.recently_played_page())
+
+    async def ranking(self, request):
+        self.require_session(request)
+        return self.html(fixture_builder.ranking_page())
+
+    async def stats(self, request):
+        return web.json_response({
+            "requests": dict(self.request_counts),
+            "total": sum(self.request_counts.values()),
+            "status": {str(code): count for code, count in self.status_counts.items()},
+        })
+
+    async def reset(self, request):
+        self.request_counts.clear()
+        self.status_counts.clear()
+        return web.json_response({"status": "reset"})
+
+
+def parse_pages_by_level(value: str) -> dict:
+    """
+    "20=6,21=8" -> {"20": 6, "21": 8}
+    """
+    result = {}
+    for item in filter(None, value.split(",")):
+        level, count = item.split("=")
+        result[level.strip()] = int(count)
+    return result
+
+
+async def start_server(fake: FakePiugame, host="127.0.0.1", port=8800) -> web.AppRunner:
+    runner = web.AppRunner(fake.build_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.1, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="지연 편차 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0 ~ 1)")
+    parser.add_argument("--pages", type=int, default=3, help="레벨별 베스트 스코어 기본 페이지 수")
+    parser.add_argument("--pages-by-level", type=parse_pages_by_level, default={}, help='예: "20=6,21=8"')
+    parser.add_argument("--session-ttl", type=float, default=1200, help="로그인 세션 유지 시간 (초)")
+
+
+def from_arguments(args) -> FakePiugame:
+    return FakePiugame(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        pages=args.pages,
+        pages_by_level=args.pages_by_level,
+        session_ttl=args.session_ttl,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 piugame 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    add_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(from_arguments(args).build_app(), host=args.host, port=args.port)
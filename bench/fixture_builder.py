@@ -0,0 +1,186 @@
+"""
+piugame 페이지 구조를 본뜬 익명 HTML 생성기.
+스크래퍼가 사용하는 셀렉터와 같은 마크업을 만들며, 닉네임 / 이미지 해시 / 곡 이름은 모두 가짜 값이다.
+
+    python -m bench.fixture_builder            # bench/fixtures 다시 생성
+"""
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PLATE_TYPES = ["pg", "ug", "eg", "sg", "mg", "tg", "fg", "rg"]
+SONG_NAMES = [f"Song {chr(65 + i % 26)}{i:03d}" for i in range(400)]
+SONG_IMG = "https://www.piugame.com/data/song_img/{}.png"
+AVATAR_IMG = "https://www.piugame.com/data/avatar_img/{}.png"
+
+HEAD = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>PUMP IT UP</title>
+<link rel="stylesheet" href="/css/common.css">
+<script src="/js/jquery.min.js"></script>
+</head>
+<body>
+<div id="wrap">
+<header class="header"><nav class="gnb"><ul><li><a href="/my_page/play_data.php">MY PAGE</a></li><li><a href="/leaderboard/pumbility_ranking.php">LEADERBOARD</a></li></ul></nav></header>
+"""
+
+FOOT = """<footer class="footer"><p class="copy">COPYRIGHT ANDAMIRO CO., LTD. ALL RIGHTS RESERVED.</p></footer>
+</div>
+</body>
+</html>
+"""
+
+
+def _rng(*seed):
+    return random.Random(":".join(str(part) for part in seed))
+
+
+def _hex(rng, length=32):
+    return "".join(rng.choice("0123456789abcdef") for _ in range(length))
+
+
+def _profile(rng):
+    return f"""<div class="subProfile_wrap">
+  <div class="profile_img"><div class="resize"><div class="re bgfix" style="background-image:url('{AVATAR_IMG.format(_hex(rng))}')"></div></div><div class="bgfix" style="background-image:url('{AVATAR_IMG.format(_hex(rng))}')"></div></div>
+  <div class="profile_txt"><p class="t1 en">LV.42 PLAYER</p><p class="t2 en">PLAYER0001</p></div>
+</div>
+"""
+
+
+def _stepball(double, level, quote="'"):
+    step = "d" if double else "s"
+    nums = "".join(
+        f'<div class="imG"><img src="https://www.piugame.com/l_img/stepball/full/{step}_num_{digit}.png" alt=""></div>'
+        for digit in f"{level:02d}"
+    )
+    return (
+        f'<div class="stepBall_img_wrap"><div class="stepBall_in flex vc col hc wrap bgfix cont" '
+        f'style="background-image:url({quote}https://www.piugame.com/l_img/stepball/full/{step}_bg.png{quote})">'
+        f'<div class="tw"><img src="https://www.piugame.com/l_img/stepball/full/{step}_text.png" alt=""></div>'
+        f'<div class="numw flex vc hc">{nums}</div></div></div>'
+    )
+
+
+def login_page(seed=0):
+    rng = _rng("login", seed)
+    return HEAD + f"""<form name="flogin" action="https://www.piugame.com/bbs/login_check.php" method="post">
+<input type="hidden" name="url" value="/my_page/play_data.php"><input type="hidden" name="csrf_token" value="{_hex(rng, 40)}">
+<input type="text" name="mb_id" id="login_id" required><input type="password" name="mb_password" id="login_pw" required>
+<button type="submit" class="btn_submit">LOGIN</button></form>
+""" + FOOT
+
+
+def play_data_page(level="ALL", seed=0):
+    rng = _rng("play_data", level, seed)
+    plates = "".join(
+        f'<li class="list_in"><div class="img"><img src="/l_img/grade/{plate}.png"></div>'
+        f'<button type="button" class="play_log_btn" data-type="{plate}"></button>'
+        f'<span class="t_num">{rng.randint(0, 300)}</span></li>'
+        for plate in PLATE_TYPES
+    )
+    percent = rng.randint(0, 100)
+    level_title = "" if level == "ALL" else f'<p class="lv_t">LEVEL {level}</p>'
+    return HEAD + _profile(rng) + f"""<div class="board_search"><div class="total"><span class="t1">TOTAL</span><span class="t2">{rng.randint(1000, 9999):,}</span></div></div>
+<div class="play_data_wrap">{level_title}
+  <div class="rating_w"><span class="tit">RATING</span><span class="num fontSt">{rng.randint(10000, 99999):,}</span></div>
+  <div class="clear_w"><p class="t1">{rng.randint(0, 500)}/{rng.randint(500, 900)}</p><div class="graph"><div class="bar" style="width:{percent}%"></div><span class="num">{percent}%</span></div></div>
+  <div class="plate_w"><ul>{plates}</ul></div>
+</div>
+""" + FOOT
+
+
+def _paging(level, page, max_page):
+    buttons = "".join(
+        f'<button type="button" onclick="location.href=\'?lv={level}&page={number}\'" class="{"on" if number == page else ""}">{number}</button>'
+        for number in range(max(1, page - 4), min(max_page, page + 5) + 1)
+    )
+    last = (
+        f'<button type="button" onclick="location.href=\'?lv={level}&page={max_page}\'"><span class="icon"><i class="xi last"></i></span></button>'
+        if max_page > 1 else ""
+    )
+    return f'<div class="board_paging">{buttons}{last}</div>'
+
+
+def best_score_page(level, page=1, max_page=1, per_page=12, seed=0):
+    rng = _rng("best_score", level, page, seed)
+    items = []
+    for _ in range(per_page):
+        items.append(f"""<li><div class="in flex vc wrap">
+  {_stepball(rng.random() < 0.45, level if isinstance(level, int) else 27)}
+  <div class="song_name flex"><p>{rng.choice(SONG_NAMES)}</p></div>
+  <div class="etc_con"><div class="img_w"><img src="/l_img/grade/x_{rng.choice(["sss", "ss", "s", "aaa"])}.png"></div><div class="txt_v"><span class="num">{rng.randint(700000, 1000000):,}</span></div></div>
+</div></li>""")
+    return HEAD + _profile(rng) + (
+        f'<div class="my_best_score_wrap"><ul class="my_best_scoreList flex wrap">{"".join(items)}</ul>'
+        f'{_paging(level, page, max_page)}</div>'
+    ) + FOOT
+
+
+def pumbility_page(seed=0):
+    rng = _rng("pumbility", seed)
+    items = []
+    for _ in range(50):
+        items.append(f"""<li><div class="in flex vc">
+  <div class="profile_img"><div class="resize"><div class="re bgfix" style="background-image:url('{SONG_IMG.format(_hex(rng))}')"></div></div></div>
+  {_stepball(rng.random() < 0.5, rng.randint(18, 26), quote="")}
+  <div class="name"><p class="t1">{rng.choice(SONG_NAMES)}</p><p class="t2">Artist {rng.randint(1, 99)}</p></div>
+  <div class="grade_wrap"><div class="img"><img src="https://www.piugame.com/l_img/grade/x_{rng.choice(["sss", "ss", "s"])}.png"></div></div>
+  <div class="score"><i class="tt en">{rng.randint(300, 900):,}</i></div>
+  <div class="date"><i class="tt">2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}</i></div>
+</div></li>""")
+    return HEAD + _profile(rng) + f"""<div class="pumbility_total_wrap"><p class="t1">PUMBILITY</p><p class="t2 en">{rng.randint(10000, 30000):,}</p></div>
+<div class="rating_rangking_list_w"><ul class="list">{"".join(items)}</ul></div>""" + FOOT
+
+
+def recently_played_page(seed=0):
+    rng = _rng("recently_played", seed)
+    items = []
+    for _ in range(50):
+        judgement = "".join(f'<td><div class="tx">{rng.randint(0, 2000)}</div></td>' for _ in range(5))
+        items.append(f"""<li><div class="wrap_in"><div class="in bgfix" style="background-image:url('{SONG_IMG.format(_hex(rng))}')"></div>
+  <div class="flex vc">{_stepball(rng.random() < 0.5, rng.randint(10, 27))}<div class="song_name"><p>{rng.choice(SONG_NAMES)}</p></div></div>
+  <div class="li_in ac"><img src="https://www.piugame.com/l_img/grade/x_{rng.choice(["sss", "ss", "s", "a"])}.png"><i class="tx">{rng.randint(600000, 1000000):,}</i></div>
+  <table class="board_st ac recently_play"><thead><tr><th>PERFECT</th><th>GREAT</th><th>GOOD</th><th>BAD</th><th>MISS</th></tr></thead><tbody><tr>{judgement}</tr></tbody></table>
+</div></li>""")
+    return HEAD + _profile(rng) + (
+        f'<div class="recently_playeList_wrap"><ul class="recently_playeList">{"".join(items)}</ul></div>'
+    ) + FOOT
+
+
+def ranking_page(seed=0):
+    rng = _rng("ranking", seed)
+    return HEAD + f"""<div class="rangking_list_w"><ul class="list pumbilitySt2"><li><div class="in flex vc">
+  <div class="num"><i class="tt">{rng.randint(1, 999)}</i></div>
+  <div class="profile_img"><div class="resize"><div class="re bgfix" style="background-image:url('{AVATAR_IMG.format(_hex(rng))}')"></div></div></div>
+  <div class="profile_name_w"><p class="profile_name en pl0">PLAYER0001</p><p class="profile_name st1 en">#0001</p></div>
+  <div class="score"><i class="tt en">{rng.randint(10000, 30000):,}</i></div>
+</div></li></ul></div>""" + FOOT
+
+
+def build_fixtures():
+    """
+    벤치마크용 고정 fixture {파일 이름: HTML}
+    """
+    fixtures = {
+        "login.html": login_page(),
+        "play_data_all.html": play_data_page("ALL"),
+        "play_data_lv20.html": play_data_page(20),
+        "my_best_score_single.html": best_score_page(14, per_page=9),
+        "pumbility.html": pumbility_page(),
+        "recently_played.html": recently_played_page(),
+        "pumbility_ranking.html": ranking_page(),
+    }
+    for page in range(1, 7):
+        fixtures[f"my_best_score_lv20_p{page}.html"] = best_score_page(20, page, 6)
+    return fixtures
+
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, html in build_fixtures().items():
+        with open(os.path.join(FIXTURE_DIR, name), "w", encoding="utf-8") as f:
+            f.write(html)
+    print(f"fixture 생성 완료: {FIXTURE_DIR}")
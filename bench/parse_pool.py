@@ -0,0 +1,114 @@
+"""
+HTML 파싱 실행 위치(PIU_PARSE_MODE) 벤치마크.
+my_best_score.php 페이지 여러 개를 동시에 파싱하면서 inline / thread / process 풀의 처리량(pages/s)과
+그동안 이벤트 루프가 멈춘 최대 시간(loop lag)을 비교한다.
+
+    python -m bench.parse_pool                       # 워커 수 1, 2, 4, ... cpu 수
+    python -m bench.parse_pool --workers 1,4,8 --pages 216
+
+inline 은 파싱하는 동안 이벤트 루프가 멈추므로 loop lag 가 파싱 전체 시간과 비슷하게 나오고,
+process 는 코어 수만큼 처리량이 늘어난다 (thread 는 GIL 때문에 처리량은 inline 과 비슷).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import parsing
+from bench.fixture_builder import FIXTURE_DIR
+from scraper import parse_best_score_html
+
+LAG_INTERVAL = 0.005  # 이벤트 루프 지연 측정 간격 (초)
+
+
+def load_pages():
+    pages = []
+    for page in range(1, 7):
+        with open(os.path.join(FIXTURE_DIR, f"my_best_score_lv20_p{page}.html"), encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+async def measure_lag(stop: asyncio.Event, lags: list):
+    """
+    LAG_INTERVAL 마다 깨어나 예정보다 늦은 시간을 기록 (다른 요청의 I/O가 얼마나 밀리는지)
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+async def run_case(mode: str, workers: int, pages: list, total: int):
+    parsing.shutdown_parse_pool()
+    parsing.PARSE_MODE = mode
+    parsing.PARSE_WORKERS = workers
+
+    # 워커 시작 비용(프로세스 spawn / 모듈 import)은 측정에서 제외
+    await asyncio.gather(*(parsing.run_parser(parse_best_score_html, pages[0]) for _ in range(workers)))
+
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(parsing.run_parser(parse_best_score_html, pages[index % len(pages)]) for index in range(total))
+    )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    parsing.shutdown_parse_pool()
+
+    songs = sum(len(songs) for _, songs in results)
+    return {
+        "pages_per_sec": total / elapsed,
+        "elapsed_ms": elapsed * 1000,
+        "max_lag_ms": max(lags, default=0) * 1000,
+        "songs": songs,
+    }
+
+
+async def run(worker_counts, total):
+    pages = load_pages()
+    cases = [("inline", 1)]
+    cases += [("thread", workers) for workers in worker_counts]
+    cases += [("process", workers) for workers in worker_counts]
+
+    print(f"cpu: {os.cpu_count()}, HTML parser backend: {parsing.HTML_PARSER}, pages: {total}")
+    print(f"{'mode':<10}{'workers':>8}{'pages/s':>10}{'speedup':>9}{'total ms':>10}{'max lag ms':>12}")
+    baseline = None
+    for mode, workers in cases:
+        result = await run_case(mode, workers, pages, total)
+        baseline = baseline or result["pages_per_sec"]
+        print(
+            f"{mode:<10}{workers:>8}{result['pages_per_sec']:>10.1f}"
+            f"{result['pages_per_sec'] / baseline:>8.2f}x{result['elapsed_ms']:>10.0f}{result['max_lag_ms']:>12.1f}"
+        )
+
+
+def default_workers():
+    counts, workers = [], 1
+    while workers < (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    counts.append(os.cpu_count() or 1)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML 파싱 풀 처리량 벤치마크")
+    parser.add_argument("--workers", help="비교할 워커 수 (쉼표 구분, 기본: 1, 2, 4, ... cpu 수)")
+    parser.add_argument("--pages", type=int, default=108, help="파싱할 페이지 수 (기본: 18레벨 x 6페이지)")
+    args = parser.parse_args(argv)
+
+    worker_counts = [int(count) for count in args.workers.split(",")] if args.workers else default_workers()
+    asyncio.run(run(worker_counts, args.pages))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+페이지 파서 벤치마크. bench/fixtures의 HTML로 파서별 페이지당 시간과 최대 메모리를 측정하고
+bench/baselines.json의 기준값과 비교한다.
+
+    python -m bench.parsers                      # 측정 + 기준값 비교 (회귀 시 종료 코드 1)
+    python -m bench.parsers --update-baseline    # 현재 결과를 기준값으로 저장
+    python -m bench.parsers --threshold 0.5      # 허용 오차 50%
+    PIU_HTML_PARSER=html.parser python -m bench.parsers
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from bench.fixture_builder import FIXTURE_DIR
+from login import build_login_payload
+from parsing import HTML_PARSER
+from scraper import (
+    extract_dashboard_data,
+    extract_pumbility_score_and_songs,
+    fetch_recently_played_data,
+    parse_best_score_html,
+    parse_level_data,
+    parse_user_data,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# 기준값 대비 허용 오차 (0.3 = 30% 느려지거나 메모리를 더 쓰면 회귀)
+DEFAULT_THRESHOLD = 0.3
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def parse_best_score_pages(pages):
+    """
+    fetch_song_details_for_level의 파싱 단계 (페이지 수 확인 + 곡 데이터 추출)
+    """
+    songs = []
+    for html in pages:
+        songs.extend(parse_best_score_html(html)[1])
+    return songs
+
+
+def build_cases():
+    """
+    {케이스 이름: (페이지 수, 실행 함수)}
+    """
+    play_data_all = load_fixture("play_data_all.html")
+    play_data_level = load_fixture("play_data_lv20.html")
+    best_score_single = load_fixture("my_best_score_single.html")
+    best_score_pages = [load_fixture(f"my_best_score_lv20_p{page}.html") for page in range(1, 7)]
+    pumbility = load_fixture("pumbility.html")
+    recently_played = load_fixture("recently_played.html")
+    ranking = load_fixture("pumbility_ranking.html")
+    login_page = load_fixture("login.html")
+
+    return {
+        "login_csrf": (1, lambda: build_login_payload("user", "password", login_page)),
+        "parse_user_data": (1, lambda: parse_user_data(play_data_all)),
+        "levels_data_all": (1, lambda: parse_level_data(play_data_all, "ALL")),
+        "levels_data_level": (1, lambda: parse_level_data(play_data_level, 20)),
+        "best_score_single_page": (1, lambda: parse_best_score_pages([best_score_single])),
+        "best_score_multi_page": (len(best_score_pages), lambda: parse_best_score_pages(best_score_pages)),
+        "pumbility": (1, lambda: extract_pumbility_score_and_songs(pumbility)),
+        "recently_played": (1, lambda: fetch_recently_played_data(recently_played)),
+        "dashboard": (2, lambda: extract_dashboard_data(ranking, pumbility)),
+    }
+
+
+def measure(pages, func, repeat):
+    """
+    (페이지당 최소 시간 ms, 최대 메모리 KiB). 최소값이 실행 환경의 잡음에 가장 덜 흔들린다
+    """
+    func()  # 워밍업
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000 / pages)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return round(min(timings), 3), round(peak / 1024, 1)
+
+
+def run(repeat):
+    results = {}
+    for name, (pages, func) in build_cases().items():
+        ms_per_page, peak_kib = measure(pages, func, repeat)
+        results[name] = {"ms_per_page": ms_per_page, "peak_kib": peak_kib}
+    return results
+
+
+def load_baselines():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold):
+    """
+    기준값 대비 결과 표를 출력하고 회귀한 케이스 목록을 반환
+    """
+    regressions = []
+    print(f"{'case':<24}{'ms/page':>10}{'base':>10}{'peak KiB':>12}{'base':>10}  status")
+    for name, result in results.items():
+        base = baseline.get(name)
+        status = "new"
+        if base:
+            slow = result["ms_per_page"] > base["ms_per_page"] * (1 + threshold)
+            heavy = result["peak_kib"] > base["peak_kib"] * (1 + threshold)
+            status = "REGRESSION" if slow or heavy else "ok"
+            if slow or heavy:
+                regressions.append(name)
+        print(
+            f"{name:<24}{result['ms_per_page']:>10.3f}{(base or {}).get('ms_per_page', 0):>10.3f}"
+            f"{result['peak_kib']:>12.1f}{(base or {}).get('peak_kib', 0):>10.1f}  {status}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="piugame 페이지 파서 벤치마크")
+    parser.add_argument("--repeat", type=int, default=30, help="케이스별 반복 횟수")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="허용 오차 비율")
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    args = parser.parse_args(argv)
+
+    print(f"HTML parser backend: {HTML_PARSER}")
+    results = run(args.repeat)
+    baselines = load_baselines()
+
+    if args.update_baseline:
+        baselines[HTML_PARSER] = results
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        compare(results, {}, args.threshold)
+        print(f"기준값 저장 완료: {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baselines.get(HTML_PARSER, {}), args.threshold)
+    if regressions:
+        print(f"성능 회귀 발생: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+# piugame 주소 (로컬 테스트 서버를 사용할 때 PIUGAME_BASE_URL 환경 변수로 변경)
+PIUGAME_BASE_URL = os.getenv("PIUGAME_BASE_URL", "https://www.piugame.com").rstrip("/")
+
+# PostgreSQL 접속 설정
+DB_NAME = os.getenv("PIU_DB_NAME", "piu_checker")
+DB_USER = os.getenv("PIU_DB_USER", "postgres")
+DB_PASSWORD = os.getenv("PIU_DB_PASSWORD", "1234")
+DB_HOST = os.getenv("PIU_DB_HOST", "localhost")
+DB_PORT = int(os.getenv("PIU_DB_PORT", "5432"))
+
+# 커넥션 풀 / 타임아웃 설정
+DB_POOL_MIN = int(os.getenv("PIU_DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("PIU_DB_POOL_MAX", "10"))
+DB_CONNECT_TIMEOUT = int(os.getenv("PIU_DB_CONNECT_TIMEOUT", "5"))  # 초
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("PIU_DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("PIU_DB_HEALTH_CHECK_INTERVAL", "30"))  # 초
+
+# 전체 곡 목록(full_song_list) 메모리 인덱스를 DB에서 다시 읽어오는 주기 (초)
+CATALOG_TTL = float(os.getenv("PIU_CATALOG_TTL", "3600"))
+
+# 요청 제한 저장소: memory (워커 1개) / sqlite (같은 서버의 uvicorn 워커끼리 한도 공유)
+RATE_LIMIT_BACKEND = os.getenv("PIU_RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB_PATH = os.getenv(
+    "PIU_RATE_LIMIT_DB", os.path.join(tempfile.gettempdir(), "piu_checker_rate_limit.sqlite3")
+)
+
+# piugame 호스트별 동시 요청 수 / 초당 요청 수 제한 (outbound 스케줄러)
+# OUTBOUND_RPS 기본값 0 = 초당 요청 수 제한 없음 (동시 요청 수만 제한, 기존 스크래핑 속도 유지)
+# 값을 주면 piugame 부하 / 차단 위험은 줄지만 곡 데이터 수집처럼 페이지가 많은 요청은 그만큼 느려짐
+# (예: 10 이면 18레벨 x 6페이지 수집에 최소 약 10초)
+OUTBOUND_MAX_CONCURRENCY = int(os.getenv("PIU_OUTBOUND_CONCURRENCY", "5"))
+OUTBOUND_RPS = float(os.getenv("PIU_OUTBOUND_RPS", "0"))
+
+# 백그라운드 스크래핑 작업 (/jobs): 동시 실행 수, 대기 + 실행 중 작업 최대 수, 완료 후 결과 보관 시간 (초)
+JOB_WORKERS = int(os.getenv("PIU_JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("PIU_JOB_MAX_PENDING", "100"))
+JOB_RETENTION = float(os.getenv("PIU_JOB_RETENTION", "600"))
+
+# 요청 단위 프로파일링 (profiling.py): X-Profile-Token 헤더로 요청할 때 사용하는 관리자 토큰, 결과 파일 저장 위치
+# 토큰이 비어 있으면 사용하지 않음
+PROFILE_TOKEN = os.getenv("PIU_PROFILE_TOKEN", "")
+PROFILE_DIR = os.getenv("PIU_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "piu_checker_profiles"))
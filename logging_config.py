@@ -0,0 +1,65 @@
+"""
+구조화 로그 설정
+
+logger.info("메시지", extra={"level": 20, "pages": 4}) 처럼 extra 로 넘긴 값은 JSON 의 "extra" 객체로 출력되고
+(ts / level / logger 등 기본 필드를 덮어쓰지 않도록 분리),
+요청 처리 중 남긴 로그에는 엔드포인트(metrics 라벨과 같은 값)가 함께 기록된다.
+PIU_LOG_FORMAT=text 로 실행하면 사람이 읽기 쉬운 한 줄 형식으로 출력.
+"""
+import logging
+import os
+import sys
+import time
+
+import metrics
+from response_encoding import dumps_json
+
+LOG_FORMAT = os.getenv("PIU_LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("PIU_LOG_LEVEL", "INFO").upper()
+
+# LogRecord 기본 속성 (이외의 속성은 extra 로 넘긴 필드)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "endpoint": metrics.current_endpoint(),
+        }
+        extra = _extra_fields(record)
+        if extra:
+            entry["extra"] = extra
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return dumps_json(entry).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def configure_logging():
+    """
+    루트 로거에 stdout 핸들러 설정 (앱 시작 시 한 번 호출)
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(LOG_LEVEL)
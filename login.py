@@ -1,47 +1,146 @@
+import asyncio
+import logging
+
+import aiohttp
 import requests
 import urllib3
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
 
+import metrics
+import outbound
+from config import PIUGAME_BASE_URL
+from parsing import make_soup
+
+logger = logging.getLogger(__name__)
+
 # HTTPS 경고 비활성화
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def login_to_piugame(username: str, password: str):
-    login_url = "https://www.piugame.com/bbs/login_check.php"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-        "Referer": "https://www.piugame.com/bbs/login.php",
-        "Origin": "https://www.piugame.com"
+LOGIN_PAGE_URL = f"{PIUGAME_BASE_URL}/bbs/login.php"
+LOGIN_CHECK_URL = f"{PIUGAME_BASE_URL}/bbs/login_check.php"
+
+LOGIN_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Referer": LOGIN_PAGE_URL,
+    "Origin": PIUGAME_BASE_URL
+}
+
+
+def build_login_payload(username: str, password: str, login_page_html: str) -> dict:
+    """
+    로그인 페이지 HTML에서 CSRF 토큰을 추출해 로그인 요청 데이터를 구성
+    """
+    soup = make_soup(login_page_html)
+    csrf_token = soup.find("input", {"name": "csrf_token"})
+    csrf_value = csrf_token["value"] if csrf_token else None
+
+    login_payload = {
+        "mb_id": username,
+        "mb_password": password,
+        "url": "/my_page/play_data.php"
     }
 
+    if csrf_value:
+        login_payload["csrf_token"] = csrf_value
+
+    return login_payload
+
+
+def is_login_failed(response_text: str, response_url: str) -> bool:
+    """
+    로그인 실패 또는 로그인 페이지로 되돌아온 응답인지 확인
+    """
+    return "로그인 실패" in response_text or "login" in response_url
+
+
+class SessionExpiredError(Exception):
+    """
+    로그인 세션이 만료되어 로그인 페이지로 되돌아온 경우 발생
+    """
+
+
+def ensure_logged_in(response_text: str, response_url: str):
+    """
+    응답이 로그인 페이지(세션 만료)라면 SessionExpiredError 발생
+    """
+    if is_login_failed(response_text, response_url):
+        raise SessionExpiredError(f"세션 만료: {response_url}")
+
+
+def _count_request(url: str, status):
+    metrics.UPSTREAM_REQUESTS.inc(page=url.removeprefix(PIUGAME_BASE_URL), status=status)
+
+
+def login_to_piugame(username: str, password: str):
     session = requests.Session()
+    current_url = LOGIN_PAGE_URL  # 오류 메트릭 라벨용
 
     try:
-        # CSRF 토큰 추출
-        login_page = session.get("https://www.piugame.com/bbs/login.php", headers=headers, verify=False)
-        soup = BeautifulSoup(login_page.text, 'html.parser')
-        csrf_token = soup.find("input", {"name": "csrf_token"})
-        csrf_value = csrf_token["value"] if csrf_token else None
-
-        # 로그인 요청 데이터 구성
-        login_payload = {
-            "mb_id": username,
-            "mb_password": password,
-            "url": "/my_page/play_data.php"
-        }
+        with metrics.stage("login"):
+            # CSRF 토큰 추출
+            with outbound.sync_slot(LOGIN_PAGE_URL):
+                login_page = session.get(LOGIN_PAGE_URL, headers=LOGIN_HEADERS, verify=False)
+            _count_request(LOGIN_PAGE_URL, login_page.status_code)
 
-        if csrf_value:
-            login_payload["csrf_token"] = csrf_value
+            # 로그인 요청 데이터 구성
+            login_payload = build_login_payload(username, password, login_page.text)
 
-        # 로그인 요청
-        response = session.post(login_url, data=login_payload, headers=headers, verify=False, timeout=30)
+            # 로그인 요청
+            current_url = LOGIN_CHECK_URL
+            with outbound.sync_slot(LOGIN_CHECK_URL):
+                response = session.post(LOGIN_CHECK_URL, data=login_payload, headers=LOGIN_HEADERS, verify=False, timeout=30)
+            _count_request(LOGIN_CHECK_URL, response.status_code)
 
         # 로그인 실패 처리
-        if "로그인 실패" in response.text or "login" in response.url:
+        if is_login_failed(response.text, response.url):
             raise HTTPException(status_code=401, detail="로그인 실패")
 
-        print("로그인 성공")
+        logger.info("로그인 성공")
         return session
 
     except requests.exceptions.RequestException as e:
+        _count_request(current_url, e.__class__.__name__)
         raise HTTPException(status_code=500, detail=f"로그인 실패: {str(e)}")
+
+
+async def login_to_piugame_async(username: str, password: str) -> aiohttp.CookieJar:
+    """
+    aiohttp 기반 비동기 로그인. 로그인 쿠키가 담긴 CookieJar를 반환하며,
+    aiohttp.ClientSession(cookie_jar=...)에 그대로 넘겨 사용할 수 있다.
+    """
+    # unsafe=True: PIUGAME_BASE_URL이 IP 주소(로컬 테스트 서버)여도 쿠키를 저장
+    cookie_jar = aiohttp.CookieJar(unsafe=True)
+    timeout = aiohttp.ClientTimeout(total=30)
+    current_url = LOGIN_PAGE_URL  # 오류 메트릭 라벨용
+
+    try:
+        with metrics.stage("login"):
+            async with aiohttp.ClientSession(
+                cookie_jar=cookie_jar,
+                headers=LOGIN_HEADERS,
+                timeout=timeout,
+                connector=aiohttp.TCPConnector(ssl=False),
+            ) as session:
+                # CSRF 토큰 추출
+                async with outbound.slot(LOGIN_PAGE_URL), session.get(LOGIN_PAGE_URL) as login_page:
+                    _count_request(LOGIN_PAGE_URL, login_page.status)
+                    login_page_html = await login_page.text()
+
+                # 로그인 요청
+                login_payload = build_login_payload(username, password, login_page_html)
+                current_url = LOGIN_CHECK_URL
+                async with outbound.slot(LOGIN_CHECK_URL), session.post(LOGIN_CHECK_URL, data=login_payload) as response:
+                    _count_request(LOGIN_CHECK_URL, response.status)
+                    response_text = await response.text()
+                    response_url = str(response.url)
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _count_request(current_url, e.__class__.__name__)
+        raise HTTPException(status_code=500, detail=f"로그인 실패: {str(e)}")
+
+    # 로그인 실패 처리
+    if is_login_failed(response_text, response_url):
+        raise HTTPException(status_code=401, detail="로그인 실패")
+
+    logger.info("로그인 성공")
+    return cookie_jar
@@ -1,18 +1,42 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+
+import metrics
+import profiling
+from logging_config import configure_logging
 from api.routes import router as api_router # 모듈화된 라우트 임포트
-from api.services.db import load_all_image_urls # 캐싱 초기화 위해
+from response_encoding import CustomJSONResponse, etag_compression_middleware
+from api.services.catalog import load_catalog
+from api.services.db import close_db_pool, init_db_pool, load_all_image_urls, run_db # 캐싱 초기화 위해
+from parsing import shutdown_parse_pool
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작 시 DB 커넥션 풀 생성 및 이미지 URL / 전체 곡 목록 캐싱 초기화, 종료 시 커넥션 풀 / 파싱 풀 정리
+    """
+    try:
+        await run_db(init_db_pool)
+        await run_db(load_all_image_urls)  # DB에서 이미지 데이터 로드 후 캐싱
+        await run_db(load_catalog)  # 전체 곡 목록 메모리 인덱스 생성
+    except Exception as e:
+        # DB에 연결할 수 없어도 서버는 시작 (풀 생성 / 이미지 조회는 요청 시 다시 시도)
+        logger.warning("DB 초기화 실패", extra={"error": str(getattr(e, "detail", e))})
 
-# JSON 응답 클래스 커스터마이징
-class CustomJSONResponse(JSONResponse):
-    def render(self, content: any) -> bytes:
-        import json
-        return json.dumps(content, ensure_ascii=False).encode("utf-8")
+    yield
+
+    close_db_pool()
+    shutdown_parse_pool()
 
 
 # FastAPI 앱 생성
-app = FastAPI(default_response_class=CustomJSONResponse)
+app = FastAPI(default_response_class=CustomJSONResponse, lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -24,14 +48,6 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    서버 시작 시 이미지 URL 캐싱 초기화
-    """
-    # load_all_image_urls()  # DB에서 이미지 데이터 로드 후 캐싱
-
-
 @app.middleware("http")
 async def utf8_middleware(request, call_next):
     """
@@ -43,5 +59,16 @@ async def utf8_middleware(request, call_next):
     return response
 
 
+# ETag / 304 / gzip·br 압축 (가장 바깥에서 최종 응답 본문에 적용)
+app.middleware("http")(etag_compression_middleware)
+
+# 요청 단위 프로파일링 (PIU_PROFILE_TOKEN 을 설정한 경우에만 등록)
+if profiling.enabled():
+    app.middleware("http")(profiling.profiling_middleware)
+
+# 요청별 엔드포인트 라벨 / 처리 시간 기록 (압축까지 포함하도록 가장 마지막에 등록)
+app.middleware("http")(metrics.metrics_middleware)
+
+
 # API 라우터 등록
 app.include_router(api_router)
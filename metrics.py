@@ -0,0 +1,172 @@
+"""
+Prometheus 텍스트 형식 메트릭 (GET /metrics)
+
+- 단계별(login / fetch / parse / db / serialize / compress) · 엔드포인트별 지연 시간 히스토그램
+- piugame 요청 수 / 상태 코드 / 재시도 수, outbound 슬롯 대기 시간
+- 응답 캐시 / 이미지 캐시 적중 여부, 요청 제한 거부 수
+
+단계 측정은 `with metrics.stage("parse"):` 로 감싸고, 엔드포인트 라벨은 metrics_middleware 가 설정한
+contextvar 에서 가져온다 (요청에서 만든 태스크 / 백그라운드 작업은 요청의 엔드포인트를 그대로 사용).
+값은 프로세스별로 집계되므로 uvicorn 워커가 여러 개면 워커별로 수집해야 한다.
+"""
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from starlette.routing import Match
+
+# 기본 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 현재 요청의 엔드포인트 (라우트 경로 템플릿, 예: /fetch-song-details/level/{level})
+_endpoint = contextvars.ContextVar("metrics_endpoint", default="background")
+
+_lock = threading.Lock()
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    # 정수는 그대로, 실수는 repr 로 출력 (:g 는 6자리에서 반올림되어 큰 값이 1.23457e+06 처럼 잘림)
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}  # { 라벨 값 튜플: 누적 값 }
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values = {}  # { 라벨 값 튜플: [구간별 개수..., 합계, 전체 개수] }
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with _lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, state in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {_format_value(state[-1])}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "piu_http_request_duration_seconds", "API 요청 처리 시간", ("endpoint", "method", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "piu_stage_duration_seconds", "요청 처리 단계별 소요 시간 (login / fetch / parse / db / serialize / compress)",
+    ("stage", "endpoint"),
+)
+UPSTREAM_REQUESTS = Counter(
+    "piu_upstream_requests_total", "piugame 요청 수 (status: HTTP 상태 코드 또는 오류 종류)", ("page", "status"),
+)
+UPSTREAM_RETRIES = Counter("piu_upstream_retries_total", "piugame 요청 재시도 수", ("page",))
+OUTBOUND_WAIT_SECONDS = Histogram(
+    "piu_outbound_wait_seconds", "outbound 스케줄러 슬롯 대기 시간", ("priority",),
+)
+CACHE_REQUESTS = Counter(
+    "piu_cache_requests_total", "캐시 조회 결과 (hit / stale / miss / bypass)", ("cache", "result"),
+)
+RATE_LIMIT_REJECTIONS = Counter("piu_rate_limit_rejections_total", "요청 제한으로 거부된 요청 수", ("bucket",))
+
+
+def current_endpoint() -> str:
+    return _endpoint.get()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    블록 실행 시간을 현재 엔드포인트의 단계 히스토그램에 기록 (async 함수 안에서 await 를 감싸도 됨)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name, endpoint=_endpoint.get())
+
+
+def render() -> str:
+    with _lock:
+        lines = [line for metric in _registry for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def _route_path(request) -> str:
+    # 경로 파라미터별로 라벨이 늘어나지 않도록 실제 경로 대신 라우트 템플릿 사용
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+async def metrics_middleware(request, call_next):
+    """
+    요청별 엔드포인트 라벨 설정 + 처리 시간 / 상태 코드 기록 (스트리밍 응답은 헤더를 보낼 때까지의 시간)
+    """
+    endpoint = _route_path(request)
+    token = _endpoint.set(endpoint)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, endpoint=endpoint, method=request.method, status=status,
+        )
+        _endpoint.reset(token)
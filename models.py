@@ -0,0 +1,286 @@
+"""
+스크래핑 결과 데이터 모델
+
+숫자 필드는 스크래핑할 때 한 번만 변환해 저장하고 (__slots__ 사용으로 항목당 메모리 절약),
+기존 API 응답 형식(숫자가 문자열인 dict)은 to_dict()로 만든다.
+to_dict()는 페이지에 표시된 원래 문자열("60,426", "-", "30%" 등)을 그대로 사용해야 하므로 _text 필드에 함께 보관
+(_text 가 없으면 숫자 필드로 만든 문자열 사용)
+compact 형식은 dataclass를 그대로 직렬화한 것 (orjson은 dataclass를 직접 직렬화, 밑줄로 시작하는 필드는 제외)
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# play_data.php 플레이트 종류 (LevelSummary.plates 순서)
+PLATE_TYPES = ("pg", "ug", "eg", "sg", "mg", "tg", "fg", "rg")
+
+
+def parse_int(text: Optional[str], default: Optional[int] = 0) -> Optional[int]:
+    """
+    '1,234' 형식의 숫자 문자열을 정수로 변환 (숫자가 아니면 default)
+    """
+    digits = (text or "").replace(",", "").strip()
+    return int(digits) if digits.isdigit() else default
+
+
+def _format_number(value: float) -> str:
+    return f"{value:g}"
+
+
+@dataclass(slots=True)
+class LevelSummary:
+    """
+    play_data.php 레벨별 요약 (레이팅 / 클리어 수 / 진행률 / 플레이트 개수)
+    """
+    level: str
+    rating: int
+    cleared: int
+    total: int
+    progress: float  # 퍼센트 (예: 30.0)
+    plates: Tuple[int, ...]  # PLATE_TYPES 순서
+    # 원래 문자열 (rating, clear_data, progress, PLATE_TYPES 순서의 플레이트 개수)
+    _text: Optional[Tuple[str, str, str, Tuple[str, ...]]] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def empty(cls, level) -> "LevelSummary":
+        return cls(str(level), 0, 0, 0, 0.0, (0,) * len(PLATE_TYPES))
+
+    @property
+    def progress_value(self) -> float:
+        return round(self.progress / 100, 2)
+
+    def to_dict(self) -> dict:
+        if self._text is None:
+            rating, clear_data, progress = f"{self.rating:,}", f"{self.cleared}/{self.total}", f"{_format_number(self.progress)}%"
+            plates = tuple(str(count) for count in self.plates)
+            progress_value = self.progress_value
+        else:
+            rating, clear_data, progress, plates = self._text
+            # 기존 형식은 "30%" 처럼 정수인 진행률만 progress_value 로 변환
+            percentage = progress.strip("%")
+            progress_value = round(float(percentage) / 100, 2) if percentage.isdigit() else 0.0
+        return {
+            "level": self.level,
+            "play_data": {
+                "rating": rating,
+                "clear_data": clear_data,
+                "progress": progress,
+                "progress_value": progress_value,
+            },
+            "plate_data": dict(zip(PLATE_TYPES, plates)),
+        }
+
+
+@dataclass(slots=True)
+class Judgement:
+    perfect: int
+    great: int
+    good: int
+    bad: int
+    miss: int
+    _text: Optional[Tuple[str, ...]] = field(default=None, repr=False, compare=False)  # 원래 문자열 (perfect ~ miss 순서)
+
+    def to_dict(self) -> dict:
+        if self._text is None:
+            return {
+                "perfect": str(self.perfect),
+                "great": str(self.great),
+                "good": str(self.good),
+                "bad": str(self.bad),
+                "miss": str(self.miss),
+            }
+        return dict(zip(("perfect", "great", "good", "bad", "miss"), self._text))
+
+
+@dataclass(slots=True)
+class RecentPlay:
+    """
+    recently_played.php 플레이 기록 하나
+    """
+    song_name: str
+    score: int
+    stepball_url: str
+    stepball_text: str
+    stepball_num1: Optional[str]
+    stepball_num2: Optional[str]
+    judgement: Judgement
+    plate_url: str
+    background_url: str
+    _score_text: Optional[str] = field(default=None, repr=False, compare=False)  # 원래 점수 문자열
+
+    @property
+    def mode(self) -> str:
+        return "double" if "d_bg" in (self.stepball_url or "") else "single"
+
+    @property
+    def chart_level(self) -> Optional[int]:
+        """
+        스텝볼 숫자 이미지에서 읽은 채보 레벨 (알 수 없으면 None)
+        """
+        digits = "".join(
+            src[-5] for src in (self.stepball_num1, self.stepball_num2)
+            if src and src[-5].isdigit()
+        )
+        return int(digits) if digits else None
+
+    def to_dict(self) -> dict:
+        return {
+            "song_name": self.song_name,
+            "score": f"{self.score:,}" if self._score_text is None else self._score_text,
+            "stepball_url": self.stepball_url,
+            "stepball_text": self.stepball_text,
+            "stepball_num1": self.stepball_num1,
+            "stepball_num2": self.stepball_num2,
+            "judgement": self.judgement.to_dict(),
+            "plate_url": self.plate_url,
+            "background_url": self.background_url,
+        }
+
+
+@dataclass(slots=True)
+class PumbilityEntry:
+    """
+    pumbility.php 곡 하나 (score가 None이면 점수를 읽지 못한 곡)
+    """
+    name: str
+    artist: str
+    score: Optional[int]
+    date: str
+    plate_img: str
+    step_type: str
+    stepball_tw_img: str
+    stepball_inner_img: Tuple[str, ...]
+    bg_img: Optional[str]
+    _score_text: Optional[str] = field(default=None, repr=False, compare=False)  # 원래 점수 문자열
+
+    def to_dict(self) -> dict:
+        if self._score_text is not None:
+            score = self._score_text
+        else:
+            score = "Unknown" if self.score is None else str(self.score)
+        return {
+            "name": self.name,
+            "artist": self.artist,
+            "score": score,
+            "date": self.date,
+            "plate_img": self.plate_img,
+            "step_type": self.step_type,
+            "stepball_tw_img": self.stepball_tw_img,
+            "stepball_inner_img": list(self.stepball_inner_img),
+            "bg_img": self.bg_img,
+        }
+
+
+@dataclass(slots=True)
+class Pumbility:
+    pumbility_score: int
+    song_list: List[PumbilityEntry]
+
+    def to_dict(self) -> dict:
+        return {
+            "pumbility_score": self.pumbility_score,
+            "song_list": [song.to_dict() for song in self.song_list],
+        }
+
+
+@dataclass(slots=True)
+class UserRecords:
+    """
+    fetch_all_user_data 결과 (응답 캐시에는 이 객체를 그대로 저장)
+    """
+    user_data: dict
+    all_levels_data: List[LevelSummary]
+    pumbility_data: Pumbility
+    recently_played_data: List[RecentPlay]
+    errors: List[dict]
+
+    def to_dict(self) -> dict:
+        return {
+            "user_data": self.user_data,
+            "all_levels_data": [level.to_dict() for level in self.all_levels_data],
+            "pumbility_data": self.pumbility_data.to_dict(),
+            "recently_played_data": [play.to_dict() for play in self.recently_played_data],
+            "errors": self.errors,
+        }
+
+
+# OpenAPI 문서용 응답 모델 (응답 검증 / 변환에는 사용하지 않음: responses={200: {"model": ...}})
+class PlayDataModel(BaseModel):
+    rating: str
+    clear_data: str
+    progress: str
+    progress_value: float
+
+
+class LevelSummaryModel(BaseModel):
+    level: str
+    play_data: PlayDataModel
+    plate_data: Dict[str, str]
+
+
+class JudgementModel(BaseModel):
+    perfect: str
+    great: str
+    good: str
+    bad: str
+    miss: str
+
+
+class RecentPlayModel(BaseModel):
+    song_name: str
+    score: str
+    stepball_url: str
+    stepball_text: str
+    stepball_num1: Optional[str]
+    stepball_num2: Optional[str]
+    judgement: JudgementModel
+    plate_url: str
+    background_url: str
+
+
+class PumbilityEntryModel(BaseModel):
+    name: str
+    artist: str
+    score: str
+    date: str
+    plate_img: str
+    step_type: str
+    stepball_tw_img: str
+    stepball_inner_img: List[str]
+    bg_img: Optional[str]
+
+
+class PumbilityModel(BaseModel):
+    pumbility_score: int
+    song_list: List[PumbilityEntryModel]
+
+
+class UserRecordsModel(BaseModel):
+    user_data: Dict[str, str]
+    all_levels_data: List[LevelSummaryModel]
+    pumbility_data: PumbilityModel
+    recently_played_data: List[RecentPlayModel]
+    errors: List[dict]
+
+
+class UserDataResponse(BaseModel):
+    status: str
+    data: UserRecordsModel
+
+
+class SongScoreModel(BaseModel):
+    name: str
+    score: float
+    image_url: str
+
+
+class LevelSongsModel(BaseModel):
+    single: List[SongScoreModel]
+    double: List[SongScoreModel]
+
+
+class SongDetailsResponse(BaseModel):
+    status: str
+    data: Dict[str, LevelSongsModel]  # "level_10" ~ "level_27"
+    errors: List[dict]  # 가져오지 못한 페이지 {"level", "page", "error"} (해당 페이지의 곡은 data 에서 빠짐)
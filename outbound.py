@@ -0,0 +1,227 @@
+"""
+piugame으로 나가는 모든 요청의 스케줄러
+
+- 호스트별 동시 요청 수(OUTBOUND_MAX_CONCURRENCY)와 초당 요청 수(OUTBOUND_RPS, 0이면 제한 없음) 제한
+- 같은 우선순위 안에서는 사용자별로 번갈아 슬롯을 배정 (한 사용자의 대량 스크래핑이 다른 사용자를 막지 않도록)
+- 대화형 요청(INTERACTIVE)이 대량 스크래핑(BULK)보다 먼저 배정됨
+
+async 코드는 `async with outbound.slot(url):`, 동기(requests) 코드는 `with outbound.sync_slot(url):` 로 감싸고,
+사용자 / 우선순위는 `with outbound.request_context(user=..., priority=...):` 로 지정 (contextvars 로 하위 태스크에 전달)
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+import config
+import metrics
+
+INTERACTIVE = 0  # 대시보드, 단일 레벨 체크리스트 등 사용자가 바로 기다리는 요청
+BULK = 1         # 전체 레벨 스크래핑 등 페이지가 많은 요청
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+_user = contextvars.ContextVar("outbound_user", default=None)
+_priority = contextvars.ContextVar("outbound_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_context(user=None, priority=None):
+    """
+    이 블록(과 안에서 만든 태스크)에서 나가는 요청의 사용자 / 우선순위 지정. None이면 기존 값 유지
+    """
+    tokens = []
+    if user is not None:
+        tokens.append((_user, _user.set(user)))
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("user", "enqueued_at", "notify", "granted", "delay")
+
+    def __init__(self, user, notify):
+        self.user = user
+        self.enqueued_at = time.monotonic()
+        self.notify = notify
+        self.granted = False
+        self.delay = 0.0
+
+
+class HostScheduler:
+    """
+    호스트 하나의 대기열. 상태는 threading.Lock 으로 보호 (이벤트 루프와 동기 스레드에서 함께 사용)
+    """
+
+    def __init__(self, host: str, max_concurrency: int, rps: float):
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.interval = 1 / rps if rps > 0 else 0.0
+        self.burst = max(1, int(rps))
+        self.lock = threading.Lock()
+        # { priority: OrderedDict{ user: deque[_Waiter] } }
+        self.queues = {INTERACTIVE: OrderedDict(), BULK: OrderedDict()}
+        self.in_flight = 0
+        self.next_time = 0.0  # 다음 요청을 보낼 수 있는 시각 (초당 요청 수 제한)
+        self.stats = {"requests": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for queue in self.queues.values() for waiters in queue.values())
+
+    def _pace(self, now: float) -> float:
+        # 초당 요청 수 제한: burst 개까지는 바로, 이후는 interval 간격으로 배정
+        self.next_time = max(self.next_time, now - (self.burst - 1) * self.interval)
+        delay = max(0.0, self.next_time - now)
+        self.next_time += self.interval
+        return delay
+
+    def _dispatch(self):
+        # lock 을 잡은 상태에서 호출
+        while self.in_flight < self.max_concurrency:
+            queue = next((q for q in self.queues.values() if q), None)
+            if queue is None:
+                return
+            # 맨 앞 사용자의 요청 하나를 배정하고, 남은 요청이 있으면 사용자를 맨 뒤로 보냄
+            user, waiters = next(iter(queue.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                queue.move_to_end(user)
+            else:
+                del queue[user]
+            self.in_flight += 1
+            waiter.granted = True
+            waiter.delay = self._pace(time.monotonic())
+            waiter.notify()
+
+    def enqueue(self, priority: int, waiter: _Waiter):
+        with self.lock:
+            queue = self.queues.get(priority, self.queues[BULK])
+            queue.setdefault(waiter.user, deque()).append(waiter)
+            self._dispatch()
+
+    def cancel(self, priority: int, waiter: _Waiter):
+        """
+        대기 중 취소: 아직 배정 전이면 대기열에서 제거, 이미 배정되었으면 슬롯 반환
+        """
+        with self.lock:
+            if waiter.granted:
+                self._release_locked()
+                return
+            queue = self.queues.get(priority, self.queues[BULK])
+            waiters = queue.get(waiter.user)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del queue[waiter.user]
+
+    def started(self, priority: int, waiter: _Waiter):
+        waited = time.monotonic() - waiter.enqueued_at
+        metrics.OUTBOUND_WAIT_SECONDS.observe(waited, priority=PRIORITY_NAMES[priority])
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["wait_total"] += waited
+            self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+
+    def _release_locked(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def release(self):
+        with self.lock:
+            self._release_locked()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            requests = self.stats["requests"]
+            return {
+                "host": self.host,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth(),
+                "queued_by_priority": {
+                    "interactive": sum(len(w) for w in self.queues[INTERACTIVE].values()),
+                    "bulk": sum(len(w) for w in self.queues[BULK].values()),
+                },
+                "waiting_users": len(set(self.queues[INTERACTIVE]) | set(self.queues[BULK])),
+                "requests": requests,
+                "avg_wait_ms": round(self.stats["wait_total"] / requests * 1000, 1) if requests else 0.0,
+                "max_wait_ms": round(self.stats["wait_max"] * 1000, 1),
+            }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(url: str) -> HostScheduler:
+    host = urlparse(url).netloc
+    with _schedulers_lock:
+        if host not in _schedulers:
+            _schedulers[host] = HostScheduler(host, config.OUTBOUND_MAX_CONCURRENCY, config.OUTBOUND_RPS)
+        return _schedulers[host]
+
+
+@asynccontextmanager
+async def slot(url: str):
+    """
+    url 호스트의 슬롯을 배정받을 때까지 대기 후 요청 실행 (async)
+    """
+    scheduler = get_scheduler(url)
+    priority = _priority.get()
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def notify():
+        loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+    waiter = _Waiter(_user.get(), notify)
+    scheduler.enqueue(priority, waiter)
+    try:
+        await future
+        if waiter.delay:
+            await asyncio.sleep(waiter.delay)
+    except BaseException:
+        scheduler.cancel(priority, waiter)
+        raise
+
+    scheduler.started(priority, waiter)
+    try:
+        yield
+    finally:
+        scheduler.release()
+
+
+@contextmanager
+def sync_slot(url: str):
+    """
+    slot 의 동기 버전 (requests 를 사용하는 코드, 스레드 풀에서 실행)
+    """
+    scheduler = get_scheduler(url)
+    priority = _priority.get()
+    event = threading.Event()
+    waiter = _Waiter(_user.get(), event.set)
+    scheduler.enqueue(priority, waiter)
+    event.wait()
+    if waiter.delay:
+        time.sleep(waiter.delay)
+
+    scheduler.started(priority, waiter)
+    try:
+        yield
+    finally:
+        scheduler.release()
+
+
+def stats() -> list:
+    """
+    호스트별 진행 중 / 대기 중 요청 수와 대기 시간
+    """
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return [scheduler.snapshot() for scheduler in schedulers]
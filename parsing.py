@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+import metrics
+import profiling
+
+logger = logging.getLogger(__name__)
+
+# HTML 파서 백엔드 설정: auto(lxml 설치 시 lxml, 아니면 html.parser) / lxml / html.parser
+HTML_PARSER_BACKEND = os.getenv("PIU_HTML_PARSER", "auto")
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend != "auto":
+        return backend
+    try:
+        import lxml  # noqa: F401  C 기반 파서 (설치된 경우에만 사용)
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+HTML_PARSER = _resolve_backend(HTML_PARSER_BACKEND)
+
+
+def make_soup(html_content) -> BeautifulSoup:
+    """
+    설정된 파서 백엔드로 BeautifulSoup 객체 생성
+    """
+    return BeautifulSoup(html_content, HTML_PARSER)
+
+
+def compile_selectors(selectors: dict) -> dict:
+    """
+    페이지 종류별 CSS 셀렉터를 한 번만 컴파일해 재사용
+    soup.select_one(...) / soup.select(...)에 그대로 넘길 수 있다.
+    """
+    return {name: soupsieve.compile(css) for name, css in selectors.items()}
+
+
+def has_class(name: str) -> str:
+    """
+    CSS `.name` 과 같은 XPath 조건
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def compile_xpaths(xpaths: dict) -> dict:
+    """
+    lxml 백엔드 전용: bs4 / soupsieve 를 거치지 않고 lxml 트리에서 바로 조회할 XPath 를 한 번만 컴파일
+    """
+    from lxml import etree
+    return {name: etree.XPath(expr) for name, expr in xpaths.items()}
+
+
+def make_lxml_tree(html_content):
+    """
+    lxml 문서 트리 생성 (빈 문서면 None)
+    """
+    from lxml import etree, html
+    try:
+        return html.document_fromstring(html_content)
+    except etree.ParserError:
+        return None
+
+
+# HTML 파싱 실행 위치: inline(이벤트 루프에서 바로) / process(프로세스 풀) / thread(스레드 풀)
+# process 는 여러 코어를 사용하고 파싱 중에도 이벤트 루프가 다른 요청의 I/O를 처리할 수 있음
+PARSE_MODE = os.getenv("PIU_PARSE_MODE", "inline")
+PARSE_WORKERS = int(os.getenv("PIU_PARSE_WORKERS", "0")) or os.cpu_count() or 1
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """
+    파싱용 풀 (PARSE_MODE가 inline이면 None)
+    """
+    global _parse_pool
+    if PARSE_MODE == "inline":
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            if PARSE_MODE == "process":
+                # spawn: 실행 중인 스레드(DB 스레드 풀 등)를 fork로 복제하지 않도록 새 인터프리터로 시작
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+            elif PARSE_MODE == "thread":
+                _parse_pool = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+            else:
+                raise ValueError(f"알 수 없는 파싱 모드: {PARSE_MODE}")
+            logger.info("HTML 파싱 풀 생성", extra={"mode": PARSE_MODE, "workers": PARSE_WORKERS})
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+
+async def run_parser(func, *args):
+    """
+    func(*args) 로 HTML 파싱 (PARSE_MODE에 따라 이벤트 루프 밖에서 실행)
+    process 모드에서는 func가 모듈 최상위 함수여야 하고 결과는 pickle 가능한 값(dict / 튜플 / dataclass)이어야 함
+    """
+    pool = get_parse_pool()
+    with metrics.stage("parse"):
+        if pool is None:
+            return func(*args)
+        if PARSE_MODE == "thread":
+            func = profiling.bind(func, "parse")  # 프로세스 풀에서 실행되는 파싱은 프로파일에 포함되지 않음
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
@@ -0,0 +1,204 @@
+"""
+요청 단위 프로파일링 (opt-in)
+
+- PIU_PROFILE_TOKEN 을 설정하고 요청에 `X-Profile-Token: <토큰>` 헤더를 붙이면 그 요청만 프로파일링
+- 토큰을 설정하지 않으면 미들웨어를 등록하지 않아 일반 요청에는 비용이 없음
+- sys.setprofile 훅은 이벤트 루프 스레드 전체에 걸리므로, 프로파일링 중인 요청이 있는 동안은 같은 워커의 다른 요청도
+  함수 호출마다 훅 비용을 낸다. 그래서 무작위 샘플링은 하지 않고 관리자가 헤더로 요청한 경우에만 프로파일링
+
+이벤트 루프 스레드에 sys.setprofile 훅을 걸고 contextvar 로 프로파일링 중인 요청의 태스크만 기록하므로,
+같은 시간에 처리 중인 다른 요청의 함수는 섞이지 않는다. DB / 파싱 스레드 풀에서 실행되는 함수는 bind()로 감싸 함께 기록
+(process 파싱 풀에서 실행되는 파싱은 기록되지 않음).
+결과는 PIU_PROFILE_DIR/<요청 ID>.folded 에 "함수;함수;함수 마이크로초" 형식으로 저장 (flamegraph.pl, speedscope 에서 열 수 있음)
+"""
+import contextvars
+import hmac
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+
+from starlette.responses import Response
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# 현재 요청의 기록기 (프로파일링하지 않는 요청은 None)
+_recorder = contextvars.ContextVar("profile_recorder", default=None)
+
+_active = 0  # 프로파일링 중인 요청 수 (0이 되면 이벤트 루프 스레드의 훅 해제)
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def enabled() -> bool:
+    return bool(config.PROFILE_TOKEN)
+
+
+def _label(frame, event, arg) -> str:
+    if event == "call":
+        # co_qualname 은 Python 3.11 부터 (3.10 은 함수 이름만)
+        code = frame.f_code
+        return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+    # c_call: 내장 / C 확장 함수 (lxml 파싱, re 등)
+    return f"{getattr(arg, '__module__', None) or 'builtins'}:{getattr(arg, '__qualname__', '?')}"
+
+
+class Recorder:
+    """
+    호출 스택 경로별 자기 시간(self time) 누적. 호출 스택은 스레드마다 따로 관리
+    스택 항목: [라벨, 시작 시각(ns), 하위 호출 시간(ns)]
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.lock = threading.Lock()
+        self.folded = {}  # { "a;b;c": 나노초 }
+        self.started_at = time.perf_counter()
+
+    def _pop(self, stack):
+        label, started, children = stack.pop()
+        elapsed = time.perf_counter_ns() - started
+        path = ";".join([entry[0] for entry in stack] + [label])
+        with self.lock:
+            self.folded[path] = self.folded.get(path, 0) + elapsed - children
+        if stack:
+            stack[-1][2] += elapsed
+
+    def on_event(self, stack, floor, frame, event, arg):
+        """
+        floor: 이 길이 이하로는 스택을 줄이지 않음 (훅을 걸기 전에 시작된 프레임의 return / bind()의 루트 항목)
+        """
+        if event == "call" or event == "c_call":
+            stack.append([_label(frame, event, arg), time.perf_counter_ns(), 0])
+        elif len(stack) > floor:  # return / c_return / c_exception
+            self._pop(stack)
+
+    def close(self, stack):
+        while stack:
+            self._pop(stack)
+
+    def write(self) -> str:
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(config.PROFILE_DIR, f"{self.request_id}.folded")
+        with self.lock:
+            lines = [f"{stack} {nanos // 1000}" for stack, nanos in sorted(self.folded.items()) if nanos >= 1000]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+
+# 이벤트 루프 스레드의 호출 스택 (기록기 별로 하나, _start 에서 만들고 _finish 에서 제거)
+_loop_stacks = {}
+
+
+def _loop_hook(frame, event, arg):
+    # 요청이 끝난 뒤에도 그 요청에서 만든 태스크가 남아 있을 수 있으므로 _finish 이후의 이벤트는 무시
+    stack = _loop_stacks.get(_recorder.get())
+    if stack is not None:
+        _recorder.get().on_event(stack, 0, frame, event, arg)
+
+
+def bind(func, root: str):
+    """
+    스레드 풀에서 실행할 함수를 현재 요청의 프로파일에 포함되도록 감쌈 (프로파일링 중이 아니면 그대로 반환)
+    root: 플레임그래프에서 스레드 풀 호출을 구분하는 루트 이름 (예: "db" -> "[db];...")
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return func
+
+    def run(*args, **kwargs):
+        stack = [[f"[{root}]", time.perf_counter_ns(), 0]]
+        sys.setprofile(lambda frame, event, arg: recorder.on_event(stack, 1, frame, event, arg))
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(None)
+            del stack[1:]  # sys.setprofile(None) 호출 항목 제외
+            recorder.close(stack)
+
+    return run
+
+
+def _should_profile(request) -> bool:
+    token = request.headers.get("x-profile-token")
+    return bool(config.PROFILE_TOKEN and token and hmac.compare_digest(token, config.PROFILE_TOKEN))
+
+
+def _start(request_id: str) -> Recorder:
+    global _active
+    recorder = Recorder(request_id)
+    _loop_stacks[recorder] = []
+    _active += 1
+    if _active == 1:
+        sys.setprofile(_loop_hook)
+    return recorder
+
+
+def _finish(recorder: Recorder, status: int):
+    global _active
+    _active -= 1
+    if _active == 0:
+        sys.setprofile(None)
+    _loop_stacks.pop(recorder, None)
+    try:
+        path = recorder.write()
+    except OSError as e:
+        logger.warning("프로파일 저장 실패", extra={"request_id": recorder.request_id, "error": str(e)})
+        return
+    logger.info("프로파일 저장", extra={
+        "request_id": recorder.request_id,
+        "status": status,
+        "duration_ms": round((time.perf_counter() - recorder.started_at) * 1000, 1),
+        "path": path,
+    })
+
+
+async def profiling_middleware(request, call_next):
+    """
+    프로파일링 대상 요청이면 응답 본문을 모두 보낼 때까지 기록 후 파일로 저장 (X-Request-ID 헤더로 요청 ID 반환)
+    """
+    if not _should_profile(request):
+        return await call_next(request)
+
+    request_id = request.headers.get("x-request-id", "")
+    if not _REQUEST_ID.match(request_id):
+        request_id = secrets.token_hex(8)
+
+    recorder = _start(request_id)
+    token = _recorder.set(recorder)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        _recorder.reset(token)
+        _finish(recorder, 500)
+        raise
+    _recorder.reset(token)
+
+    response.headers["X-Request-ID"] = request_id
+    return _ProfiledResponse(response, recorder)
+
+
+class _ProfiledResponse(Response):
+    """
+    call_next 응답을 그대로 보내고, 전송이 끝나거나 중단되면 (클라이언트 연결 종료 / 취소) 프로파일 저장
+    (body_iterator 를 감싸면 전송이 중단되거나 본문을 읽기 전에 끝난 경우 저장되지 않음)
+    """
+
+    def __init__(self, response, recorder: Recorder):
+        self.response = response
+        self.recorder = recorder
+        self.status_code = response.status_code
+        self.raw_headers = response.raw_headers
+        self.background = None
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            _finish(self.recorder, self.status_code)
@@ -0,0 +1,164 @@
+"""
+JSON 응답 직렬화 / 압축 / ETag
+
+- orjson 이 설치되어 있으면 orjson, 아니면 json 으로 직렬화
+- Accept-Encoding 에 따라 br(brotli 설치 시) 또는 gzip 으로 압축
+- GET / HEAD 응답에는 본문 해시로 ETag 를 붙이고, If-None-Match 가 같으면 본문 없이 304 응답
+- POST 로 조회하는 엔드포인트(/dashboard, /fetch-song-details 등)는 라우트가 json_response(etag_scope=캐시 키)로
+  계정별 ETag 를 붙인 경우에만 같은 방식으로 304 응답 (라우트는 응답 캐시에서 값을 꺼낸 뒤이므로 본문 전송만 생략)
+"""
+import dataclasses
+import gzip
+import hashlib
+import json
+
+from starlette.responses import JSONResponse, Response
+
+import metrics
+
+try:
+    import orjson  # 설치된 경우에만 사용 (json 보다 빠름)
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # 설치된 경우에만 br 압축 지원
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024  # 이보다 작은 응답은 압축하지 않음
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 압축률보다 속도 우선
+
+
+def _default(value):
+    # json 모듈은 dataclass(models.py)를 직렬화하지 못하므로 dict로 변환 (orjson은 직접 직렬화)
+    # orjson 과 같이 밑줄로 시작하는 필드는 제외 (하위 dataclass 는 다시 _default 로 변환됨)
+    if dataclasses.is_dataclass(value):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value) if not f.name.startswith("_")}
+    return str(value)
+
+
+def dumps_json(content) -> bytes:
+    """
+    UTF-8 JSON 직렬화 (한글 그대로 출력)
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(content, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+# JSON 응답 클래스 (orjson 설치 시 orjson 사용, 한글 그대로 출력)
+# 라우트에서 이 응답을 직접 반환하면 FastAPI 의 jsonable_encoder 변환을 거치지 않음
+# (dataclass 가 dataclasses.asdict 로 펼쳐지지 않고 dumps_json 으로 바로 직렬화됨)
+class CustomJSONResponse(JSONResponse):
+    def render(self, content: any) -> bytes:
+        with metrics.stage("serialize"):
+            return dumps_json(content)
+
+
+def make_etag(body: bytes, scope: str = "") -> str:
+    """
+    압축 여부와 관계없이 같은 데이터면 같은 값이 되도록 weak ETag 사용
+    scope: 본문과 함께 해시하는 키 (계정별 캐시 키 등, 같은 본문이라도 계정마다 다른 ETag)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if scope:
+        digest.update(scope.encode("utf-8") + b"\0")
+    digest.update(body)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def json_response(content, etag_scope: str = None) -> CustomJSONResponse:
+    """
+    라우트에서 바로 반환하는 JSON 응답 (jsonable_encoder 를 거치지 않고 dumps_json 으로 한 번만 직렬화)
+    etag_scope: POST 엔드포인트에 ETag 를 붙일 때 사용하는 키 (credential_key 와 캐시 이름 등)
+    """
+    response = CustomJSONResponse(content)
+    if etag_scope is not None:
+        response.headers["ETag"] = make_etag(response.body, etag_scope)
+    return response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+ETAG_METHODS = ("GET", "HEAD")
+
+
+def _accepted_encodings(accept_encoding: str) -> dict:
+    """
+    Accept-Encoding 을 { 인코딩: q 값 } 으로 변환 (q 가 없으면 1, 잘못된 q 는 0)
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str):
+    """
+    지원하는 인코딩 중 q 값이 가장 높은 것 (같으면 br 우선, q=0 은 거부)
+    """
+    accepted = _accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in (("br",) if brotli is not None else ()) + ("gzip",):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+async def etag_compression_middleware(request, call_next):
+    """
+    성공한 JSON 응답 압축 + ETag 추가 / 304 처리 (스트리밍 응답은 그대로 전달)
+    GET / HEAD 는 본문 해시로 ETag 를 만들고, 그 외 메서드는 라우트가 붙인 ETag 가 있을 때만 사용
+    """
+    response = await call_next(request)
+    if response.status_code != 200 or not response.headers.get("content-type", "").startswith("application/json"):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = {
+        key: value for key, value in response.headers.items()
+        if key.lower() not in ("content-length", "content-encoding", "etag")
+    }
+    headers["Vary"] = "Accept-Encoding"
+
+    etag = make_etag(body) if request.method in ETAG_METHODS else response.headers.get("etag")
+    if etag:
+        headers["ETag"] = etag
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            headers.pop("content-type", None)
+            return Response(status_code=304, headers=headers)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding and len(body) >= COMPRESS_MIN_BYTES:
+        with metrics.stage("compress"):
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=200, headers=headers)
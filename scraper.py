@@ -1,11 +1,24 @@
 import asyncio
+import contextvars
+import logging
 import re
 import math
+from urllib.parse import urlparse
+
 import aiohttp
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
 
-from login import login_to_piugame
+import metrics
+import outbound
+from config import PIUGAME_BASE_URL
+from models import (
+    PLATE_TYPES, Judgement, LevelSummary, Pumbility, PumbilityEntry, RecentPlay, UserRecords, parse_int,
+)
+from login import ensure_logged_in, SessionExpiredError
+from parsing import HTML_PARSER, compile_selectors, compile_xpaths, has_class, make_lxml_tree, make_soup, run_parser
+from api.services.session_store import run_with_session
+
+logger = logging.getLogger(__name__)
 
 
 def fetch_page_content(url, cookies=None):
@@ -13,33 +26,45 @@ def fetch_page_content(url, cookies=None):
     페이지의 HTML 콘텐츠를 가져오는 함수
     """
     import requests
-    response = requests.get(url, cookies=cookies, verify=False, timeout=30)
+    with outbound.sync_slot(url):  # 동시 요청 / 초당 요청 수 제한
+        response = requests.get(url, cookies=cookies, verify=False, timeout=30)
     response.raise_for_status()
     response.encoding = 'utf-8'
+    ensure_logged_in(response.text, response.url)
     return response.text
 
 
+# 페이지 종류별 셀렉터 (모듈 로드 시 한 번만 컴파일)
+USER_SELECTORS = compile_selectors({
+    "profile_img": ".profile_img .bgfix",
+    "play_count": ".board_search .total .t2",
+    "level": ".subProfile_wrap .t1.en",
+    "nickname": ".subProfile_wrap .t2.en",
+})
+
+
 def parse_user_data(html_content):
     """
     사용자 데이터와 플레이 데이터를 HTML에서 파싱하여 반환
     """
-    soup = BeautifulSoup(html_content, 'html.parser', from_encoding='utf-8')
+    soup = make_soup(html_content)
 
     # user_data 추출
-    profile_img_style = soup.select_one('.profile_img .bgfix')["style"]
+    profile_img_style = soup.select_one(USER_SELECTORS["profile_img"])["style"]
     profile_img = (
         profile_img_style.split("url('")[1].split("')")[0]
         if "url('" in profile_img_style else "Unknown"
     )
 
-    play_count_element = soup.select_one('.board_search .total .t2')
+    play_count_element = soup.select_one(USER_SELECTORS["play_count"])
     play_count = play_count_element.text.strip() if play_count_element else "0"
 
+    level_element = soup.select_one(USER_SELECTORS["level"])
+    nickname_element = soup.select_one(USER_SELECTORS["nickname"])
+
     user_data = {
-        "level": soup.select_one(".subProfile_wrap .t1.en").text.strip()
-        if soup.select_one(".subProfile_wrap .t1.en") else "Unknown",
-        "nickname": soup.select_one(".subProfile_wrap .t2.en").text.strip()
-        if soup.select_one(".subProfile_wrap .t2.en") else "Unknown",
+        "level": level_element.text.strip() if level_element else "Unknown",
+        "nickname": nickname_element.text.strip() if nickname_element else "Unknown",
         "profile_img": profile_img,
         "play_count": play_count
     }
@@ -47,145 +72,208 @@ def parse_user_data(html_content):
     return user_data
 
 
+# play_data.php 레벨 목록 및 플레이트 종류
+LEVELS = list(range(10, 27)) + ["27over"]
+
+# 레벨 페이지 동시 요청 한도
+LEVEL_FETCH_CONCURRENCY = 5
+
+
+def level_data_url(base_url, level):
+    """
+    레벨별 play_data URL ('ALL'은 기본 URL)
+    """
+    return f"{base_url}" if level == "ALL" else f"{base_url}?lv={level}"
+
+
+def empty_level_data(level):
+    """
+    레벨 데이터 수집 실패 시 사용하는 0 값 데이터
+    """
+    return LevelSummary.empty(level).to_dict()
+
+
+LEVEL_SELECTORS = compile_selectors({
+    "rating": ".play_data_wrap .num.fontSt",
+    "clear_data": ".clear_w .t1",
+    "progress": ".clear_w .graph .num",
+    "plates": ".plate_w .list_in",
+    "plate_type": ".play_log_btn[data-type]",
+    "plate_value": ".t_num",
+})
+
+
+def parse_level_summary(html_content, level) -> LevelSummary:
+    """
+    play_data.php 페이지에서 레이팅 / 클리어 / 플레이트 데이터를 파싱
+    """
+    soup = make_soup(html_content)
+
+    # 플레이 데이터 추출
+    rating = soup.select_one(LEVEL_SELECTORS["rating"])
+    clear_data = soup.select_one(LEVEL_SELECTORS["clear_data"])
+    progress = soup.select_one(LEVEL_SELECTORS["progress"])
+
+    # 기존 응답 형식(to_dict)에 그대로 쓰는 원래 문자열
+    rating_text = rating.text.strip() if rating else "0"
+    clear_text = clear_data.text.strip() if clear_data else "0"
+    progress_text = progress.text.strip() if progress else "0%"
+
+    cleared, _, total = clear_text.partition("/")
+    try:
+        progress_percentage = float(progress_text.strip('%'))
+    except ValueError:
+        progress_percentage = 0.0
+
+    # 플레이트 데이터 추출
+    plate_data = dict.fromkeys(PLATE_TYPES, "0")
+    plates = soup.select(LEVEL_SELECTORS["plates"])
+    for plate in plates:
+        plate_type = plate.select_one(LEVEL_SELECTORS["plate_type"])
+        if plate_type:
+            plate_key = plate_type.get("data-type")
+            if plate_key in plate_data:
+                plate_data[plate_key] = plate.select_one(LEVEL_SELECTORS["plate_value"]).text.strip()
+
+    return LevelSummary(
+        level=str(level),
+        rating=parse_int(rating_text),
+        cleared=parse_int(cleared),
+        total=parse_int(total),
+        progress=progress_percentage,
+        plates=tuple(parse_int(count) for count in plate_data.values()),
+        _text=(rating_text, clear_text, progress_text, tuple(plate_data.values())),
+    )
+
+
+def parse_level_data(html_content, level):
+    """
+    parse_level_summary 결과를 기존 응답 형식(dict)으로 반환
+    """
+    return parse_level_summary(html_content, level).to_dict()
+
+
 def fetch_all_levels_data(session, base_url):
     """
     모든 레벨 데이터를 수집하여 반환. 'ALL' 데이터를 상단에 추가.
     """
-    levels = list(range(10, 27)) + ["27over"]
     result_data = []  # 리스트로 데이터 저장
-    plate_types = ["pg", "ug", "eg", "sg", "mg", "tg", "fg", "rg"]  # 8개 플레이트 정의
-
-    # Step 1: Fetch "ALL" data from /fetch-user-data
-    all_url = f"{base_url}"  # 중복 제거
-    try:
-        all_response = session.get(all_url, verify=False, timeout=30)
-        all_response.raise_for_status()
-        all_soup = BeautifulSoup(all_response.text, 'html.parser')
-
-        # 플레이 데이터 추출
-        rating = all_soup.select_one(".play_data_wrap .num.fontSt")
-        clear_data = all_soup.select_one(".clear_w .t1")
-        progress = all_soup.select_one(".clear_w .graph .num")
-
-        progress_text = progress.text.strip() if progress else "0%"
-        progress_percentage = progress_text.strip('%')
-        progress_value = round(float(progress_percentage) / 100, 2) if progress_percentage.isdigit() else 0.0
-
-        play_data = {
-            "rating": rating.text.strip() if rating else "0",
-            "clear_data": clear_data.text.strip() if clear_data else "0",
-            "progress": progress_text,
-            "progress_value": progress_value
-        }
 
-        # 플레이트 데이터 추출
-        plate_data = {ptype: "0" for ptype in plate_types}
-        plates = all_soup.select('.plate_w .list_in')
-        for plate in plates:
-            plate_type = plate.select_one('.play_log_btn[data-type]')
-            if plate_type:
-                plate_key = plate_type.get("data-type")
-                if plate_key in plate_types:
-                    plate_value = plate.select_one('.t_num').text.strip()
-                    plate_data[plate_key] = plate_value
-
-        result_data.append({
-            "level": "ALL",
-            "play_data": play_data,
-            "plate_data": plate_data
-        })
-    except Exception as e:
-        print(f"Error fetching ALL data: {e}")
-        result_data.append({
-            "level": "ALL",
-            "play_data": {"rating": "0", "clear_data": "0/0", "progress": "0%", "progress_value": 0.0},
-            "plate_data": {ptype: "0" for ptype in plate_types}
-        })
-
-    # Step 2: Fetch individual level data
-    for level in levels:
+    for level in ["ALL"] + LEVELS:
         try:
-            url = f"{base_url}?lv={level}" if level != "27over" else f"{base_url}?lv=27over"
-            response = session.get(url, verify=False, timeout=30)
+            url = level_data_url(base_url, level)
+            with outbound.sync_slot(url):
+                response = session.get(url, verify=False, timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 플레이 데이터
-            rating = soup.select_one(".play_data_wrap .num.fontSt")
-            clear_data = soup.select_one(".clear_w .t1")
-            progress = soup.select_one(".clear_w .graph .num")
-
-            progress_text = progress.text.strip() if progress else "0%"
-            progress_percentage = progress_text.strip('%')
-            progress_value = round(float(progress_percentage) / 100, 2) if progress_percentage.isdigit() else 0.0
-
-            play_data = {
-                "rating": rating.text.strip() if rating else "0",
-                "clear_data": clear_data.text.strip() if clear_data else "0",
-                "progress": progress_text,
-                "progress_value": progress_value
-            }
-
-            # 플레이트 데이터
-            plate_data = {ptype: "0" for ptype in plate_types}
-            plates = soup.select('.plate_w .list_in')
-            for plate in plates:
-                plate_type = plate.select_one('.play_log_btn[data-type]')
-                if plate_type:
-                    plate_key = plate_type.get("data-type")
-                    if plate_key in plate_types:
-                        plate_value = plate.select_one('.t_num').text.strip()
-                        plate_data[plate_key] = plate_value
-
-            result_data.append({
-                "level": str(level),
-                "play_data": play_data,
-                "plate_data": plate_data
-            })
+            ensure_logged_in(response.text, response.url)
+            result_data.append(parse_level_data(response.text, level))
+        except SessionExpiredError:
+            raise
         except Exception as e:
-            print(f"Error processing level {level}: {e}")
-            result_data.append({
-                "level": str(level),
-                "play_data": {"rating": "0", "clear_data": "0/0", "progress": "0%", "progress_value": 0.0},
-                "plate_data": {ptype: "0" for ptype in plate_types}
-            })
+            logger.warning("레벨 데이터 처리 실패", extra={"level": str(level), "error": str(e)})
+            result_data.append(empty_level_data(level))
 
     return result_data
 
 
-# 동시 요청 제한을 위한 Semaphore 설정
-SEMAPHORE = asyncio.Semaphore(5)  # 최대 3개의 요청만 동시 처리
+# 스크래핑 진행 상황 (백그라운드 작업에서 dict를 설정하면 받은 페이지 / 완료한 레벨 수를 기록)
+SCRAPE_PROGRESS = contextvars.ContextVar("scrape_progress", default=None)
+
+
+def report_progress(field: str):
+    progress = SCRAPE_PROGRESS.get()
+    if progress is not None:
+        progress[field] = progress.get(field, 0) + 1
+
 
-# 데이터베이스 설정
-DB_CONFIG = {
-    "dbname": "piu_checker",
-    "user": "postgres",
-    "password": "1234",
-    "host": "localhost",
-    "port": 5432
-}
 async def fetch_page_with_retry(session, url, retries=3):
     """
     재시도 기능이 포함된 페이지 데이터 요청 함수.
     """
+    page = urlparse(url).path  # 메트릭 라벨 (쿼리 문자열 제외)
     for attempt in range(retries):
+        status = None
         try:
-            async with SEMAPHORE:  # 동시 요청 제한 적용
-                async with session.get(url, timeout=60) as response:
-                    response.raise_for_status()
-                    return await response.text()
+            async with outbound.slot(url):  # 호스트별 동시 요청 / 초당 요청 수 제한, 사용자별 공정 배정
+                with metrics.stage("fetch"):
+                    async with session.get(url, timeout=60) as response:
+                        status = response.status
+                        metrics.UPSTREAM_REQUESTS.inc(page=page, status=status)
+                        response.raise_for_status()
+                        html = await response.text()
+            ensure_logged_in(html, str(response.url))
+            report_progress("pages_completed")
+            return html
+        except SessionExpiredError:
+            raise  # 세션 만료는 재시도하지 않고 호출 측에서 재로그인
         except Exception as e:
-            print(f"[ERROR] 요청 실패 (재시도 {attempt + 1}/{retries}): {str(e)}")
+            if status is None:  # 응답을 받지 못한 경우 (연결 오류 / 타임아웃)
+                metrics.UPSTREAM_REQUESTS.inc(page=page, status=e.__class__.__name__)
+            logger.warning(
+                "요청 실패", extra={"url": url, "attempt": attempt + 1, "retries": retries, "error": describe_error(e)},
+            )
             if attempt == retries - 1:  # 마지막 재시도 실패 시 예외 처리
                 raise HTTPException(status_code=500, detail=f"최종 요청 실패: {str(e)}")
+            metrics.UPSTREAM_RETRIES.inc(page=page)
             await asyncio.sleep(2)  # 재시도 대기 시간 (2초)
 
 
+async def fetch_all_levels_data_async(session, base_url, concurrency=LEVEL_FETCH_CONCURRENCY, levels=None):
+    """
+    fetch_all_levels_data의 비동기 버전. 'ALL' + 레벨별 페이지를 동시에 요청한다.
+    반환값: (LevelSummary 리스트, 오류 리스트)
+      - 레벨 데이터 순서는 fetch_all_levels_data와 동일 ('ALL', 10 ~ 26, 27over)
+      - 실패한 레벨은 0 값 데이터로 채우고, 오류는 {"level", "url", "error"} 형태로 기록
+      - levels를 지정하면 해당 레벨만 요청 (이미 받은 'ALL' 페이지를 제외할 때 사용)
+    """
+    if levels is None:
+        levels = ["ALL"] + LEVELS
+    limit = asyncio.Semaphore(concurrency)
+    errors = []
+
+    async def fetch_level(level):
+        url = level_data_url(base_url, level)
+        try:
+            async with limit:
+                html = await fetch_page_with_retry(session, url)
+            return await run_parser(parse_level_summary, html, level)
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            errors.append({"level": str(level), "url": url, "error": describe_error(e)})
+            return LevelSummary.empty(level)
+
+    result_data = await asyncio.gather(*(fetch_level(level) for level in levels))
+
+    # 오류는 레벨 순서대로 정렬해 반환
+    order = {str(level): index for index, level in enumerate(levels)}
+    errors.sort(key=lambda error: order[error["level"]])
+    return list(result_data), errors
+
+
+def describe_error(error):
+    """
+    예외를 응답/로그에 담을 수 있는 문자열로 변환
+    """
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error) or error.__class__.__name__
+
+
+BEST_SCORE_SELECTORS = compile_selectors({
+    "last_page": ".board_paging .icon i.xi.last",
+    "songs": ".my_best_scoreList li",
+    "name": ".song_name p",
+    "score": ".txt_v .num",
+    "type": ".stepBall_img_wrap .tw img",
+})
+
+
 def extract_max_page(soup):
     """
     페이지네이션에서 마지막 페이지 번호를 추출하는 함수
     """
-    last_page_btn = soup.select_one(".board_paging .icon i.xi.last")
+    last_page_btn = soup.select_one(BEST_SCORE_SELECTORS["last_page"])
 
     if last_page_btn:
         parent_button = last_page_btn.find_parent("button")
@@ -198,62 +286,150 @@ def extract_max_page(soup):
     return 1
 
 
+def _best_score_entry(song_name, score_text, type_src):
+    """
+    곡 이름 / 점수 텍스트 / 싱글·더블 이미지 경로로 (싱글/더블, 곡 데이터) 생성
+    """
+    score = int(score_text.replace(",", "")) if score_text is not None else 0
+
+    # NN.N 형식으로 변환
+    formatted_score = math.floor((score / 10000) * 10) / 10
+
+    # 싱글/더블 구분
+    song_type = "double" if "d_text" in type_src else "single"
+
+    return song_type, {
+        "name": song_name,
+        "score": formatted_score
+    }
+
+
+def parse_best_score_page(soup):
+    """
+    my_best_score.php 한 페이지의 곡 데이터를 [(싱글/더블, 곡 데이터), ...] 형태로 반환
+    """
+    songs = []
+
+    # 곡 데이터 추출
+    song_items = soup.select(BEST_SCORE_SELECTORS["songs"])
+    for song in song_items:
+        # 곡 이름
+        name_element = song.select_one(BEST_SCORE_SELECTORS["name"])
+        if not name_element:
+            continue
+
+        score_element = song.select_one(BEST_SCORE_SELECTORS["score"])
+        type_element = song.select_one(BEST_SCORE_SELECTORS["type"])
+        songs.append(_best_score_entry(
+            name_element.text.strip(),
+            score_element.text if score_element else None,
+            type_element.get("src", ""),
+        ))
+
+    return songs
+
+
+# lxml 백엔드에서는 my_best_score.php 를 bs4 없이 XPath 로 바로 파싱 (곡 데이터 수집에서 가장 많이 파싱하는 페이지)
+# BEST_SCORE_SELECTORS 와 같은 요소를 선택해야 함
+BEST_SCORE_XPATHS = compile_xpaths({
+    "last_page": f"//*[{has_class('board_paging')}]//*[{has_class('icon')}]//i[{has_class('xi')} and {has_class('last')}]",
+    "songs": f"//*[{has_class('my_best_scoreList')}]//li",
+    "name": f".//*[{has_class('song_name')}]//p",
+    "score": f".//*[{has_class('txt_v')}]//*[{has_class('num')}]",
+    "type": f".//*[{has_class('stepBall_img_wrap')}]//*[{has_class('tw')}]//img",
+}) if HTML_PARSER == "lxml" else None
+
+
+def _parse_best_score_lxml(html_content):
+    root = make_lxml_tree(html_content)
+    if root is None:
+        return 1, []
+
+    max_page = 1
+    last_page_icons = BEST_SCORE_XPATHS["last_page"](root)
+    if last_page_icons:
+        parent_button = next(last_page_icons[0].iterancestors("button"), None)
+        if parent_button is not None and parent_button.get("onclick") is not None:
+            match = re.search(r"page=(\d+)", parent_button.get("onclick"))
+            if match:
+                max_page = int(match.group(1))
+
+    songs = []
+    for song in BEST_SCORE_XPATHS["songs"](root):
+        name_elements = BEST_SCORE_XPATHS["name"](song)
+        if not name_elements:
+            continue
+
+        score_elements = BEST_SCORE_XPATHS["score"](song)
+        type_element = BEST_SCORE_XPATHS["type"](song)[0]
+        songs.append(_best_score_entry(
+            name_elements[0].text_content().strip(),
+            score_elements[0].text_content() if score_elements else None,
+            type_element.get("src", ""),
+        ))
+
+    return max_page, songs
+
+
+def parse_best_score_html(html_content):
+    """
+    my_best_score.php HTML에서 (마지막 페이지 번호, 곡 데이터)를 추출 (파싱 풀에서 실행할 수 있는 형태)
+    """
+    if BEST_SCORE_XPATHS is not None:
+        return _parse_best_score_lxml(html_content)
+    soup = make_soup(html_content)
+    return extract_max_page(soup), parse_best_score_page(soup)
+
+
 async def fetch_song_details_for_level(session, level, progress_tracker):
     """
     특정 레벨의 곡 데이터를 수집합니다.
+    1페이지에서 max_page를 확인한 뒤 나머지 페이지는 동시에 요청합니다. (outbound 스케줄러 한도 내)
+    실패한 페이지는 progress_tracker["errors"]에 기록하고, 성공한 페이지 데이터는 그대로 사용합니다.
     """
+    base_url = f"{PIUGAME_BASE_URL}/my_page/my_best_score.php"
+    song_data = {"single": [], "double": []}
+    errors = []
+
+    async def fetch_page(page):
+        url = f"{base_url}?lv={level}&page={page}"
+        html = await fetch_page_with_retry(session, url)  # 동시 요청 제한 / 재시도 기능 적용
+        return await run_parser(parse_best_score_html, html)  # (max_page, 곡 데이터)
 
+    # 1페이지: 곡 데이터 + 마지막 페이지 번호
+    page_results = []
     max_page = 1
-    base_url = "https://www.piugame.com/my_page/my_best_score.php"
-    song_data = {"single": [], "double": []}
-    page = 1
+    try:
+        max_page, songs = await fetch_page(1)
+        page_results.append(songs)
+    except SessionExpiredError:
+        raise
+    except Exception as e:
+        logger.warning("페이지 처리 실패", extra={"level": level, "page": 1, "error": describe_error(e)})
+        errors.append({"level": level, "page": 1, "error": describe_error(e)})
 
-    while True:
-        try:
-            url = f"{base_url}?lv={level}&page={page}"
-            html = await fetch_page_with_retry(session, url)  # 동시 요청 제한 / 재시도 기능 적용
-            soup = BeautifulSoup(html, "html.parser")
-
-            if page == 1:
-                max_page = extract_max_page(soup)
-
-            # 곡 데이터 추출
-            song_items = soup.select(".my_best_scoreList li")
-            if not song_items:
-                break
-
-            for song in song_items:
-                # 곡 이름
-                name_element = song.select_one(".song_name p")
-                if not name_element:
-                    continue
-                song_name = name_element.text.strip()
-
-                # 점수
-                score_element = song.select_one(".txt_v .num")
-                score = int(score_element.text.replace(",", "")) if score_element else 0
-
-                # NN.N 형식으로 변환
-                formatted_score = math.floor((score / 10000) * 10) / 10
-
-                # 싱글/더블 구분
-                type_element = song.select_one(".stepBall_img_wrap .tw img")
-                song_type = "double" if "d_text" in type_element.get("src", "") else "single"
-
-                # 데이터 추가
-                song_data[song_type].append({
-                    "name": song_name,
-                    "score": formatted_score
-                })
-
-            if page >= max_page:
-                print(f"✅ [레벨 {level}] {max_page} 페이지 수집 완료!")
-                break
-            page += 1
+    # 2 ~ max_page 페이지 동시 요청
+    async def fetch_and_parse(page):
+        _, songs = await fetch_page(page)
+        return songs
 
-        except Exception as e:
-            print(f"레벨 {level}, 페이지 {page} 처리 중 오류 발생: {e}")
-            break
+    remaining_pages = list(range(2, max_page + 1))
+    results = await asyncio.gather(
+        *(fetch_and_parse(page) for page in remaining_pages), return_exceptions=True
+    )
+    for page, result in zip(remaining_pages, results):
+        if isinstance(result, SessionExpiredError):
+            raise result
+        if isinstance(result, Exception):
+            logger.warning("페이지 처리 실패", extra={"level": level, "page": page, "error": describe_error(result)})
+            errors.append({"level": level, "page": page, "error": describe_error(result)})
+            continue
+        page_results.append(result)
+
+    # 페이지 순서대로 병합
+    for songs in page_results:
+        for song_type, song in songs:
+            song_data[song_type].append(song)
 
     # 점수 기준 내림차순 정렬
     song_data["single"].sort(key=lambda x: float(x["score"]), reverse=True)
@@ -261,7 +437,15 @@ async def fetch_song_details_for_level(session, level, progress_tracker):
 
     # 진행 상황 메시지 추가
     progress_tracker["completed"] += 1
-    print(f"[INFO] Level {level} 완료. 진행률: {progress_tracker['completed']}/{progress_tracker['total']}")
+    if errors:
+        progress_tracker.setdefault("errors", []).extend(errors)
+    logger.info("레벨 수집 완료", extra={
+        "level": level,
+        "pages": max_page,
+        "failed_pages": len(errors),
+        "completed": progress_tracker["completed"],
+        "total": progress_tracker["total"],
+    })
     return song_data
 
 
@@ -269,34 +453,48 @@ async def fetch_song_details_for_all_levels(username, password):
     """
     모든 레벨의 곡 데이터를 병렬 처리 및 동시 요청 제한을 적용하여 수집합니다.
     """
-    # 로그인 세션 생성
-    session = login_to_piugame(username, password)
-    if not session:
-        raise HTTPException(status_code=401, detail="로그인 실패")
-
     # 요청할 레벨 목록
     levels = list(range(10, 28))  # 10~27레벨
 
-    # 진행 상황 추적기 설정
-    progress_tracker = {"total": len(levels), "completed": 0}
+    async def scrape(cookie_jar):
+        # 진행 상황 추적기 설정
+        progress_tracker = {"total": len(levels), "completed": 0}
+
+        # 병렬 요청 수행
+        async with aiohttp.ClientSession(cookie_jar=cookie_jar) as async_session:
+            tasks = [fetch_song_details_for_level(async_session, level, progress_tracker) for level in levels]
+            return await asyncio.gather(*tasks)
 
-    # 병렬 요청 수행
-    async with aiohttp.ClientSession(cookies=session.cookies) as async_session:
-        tasks = [fetch_song_details_for_level(async_session, level, progress_tracker) for level in levels]
-        results = await asyncio.gather(*tasks)
+    # 캐시된 로그인 세션 사용 (만료 시 재로그인)
+    results = await run_with_session(username, password, scrape)
 
     # 레벨별 결과 매핑
     return {f"level_{level}": data for level, data in zip(levels, results)}
 
 
-def extract_pumbility_score_and_songs(html_content):
+PUMBILITY_SELECTORS = compile_selectors({
+    "total_score": ".pumbility_total_wrap .t2.en",
+    "songs": ".rating_rangking_list_w ul.list > li",
+    "name": ".name .t1",
+    "artist": ".name .t2",
+    "score": ".score .tt.en",
+    "date": ".date .tt",
+    "plate_img": ".grade_wrap .img img",
+    "stepball": ".stepBall_img_wrap .stepBall_in",
+    "stepball_tw": ".stepBall_img_wrap .stepBall_in .tw img",
+    "stepball_inner": ".stepBall_img_wrap .stepBall_in .imG img",
+    "bg": ".profile_img .resize .re.bgfix",
+})
+
+
+def parse_pumbility(html_content) -> Pumbility:
     """
     Pumbility 점수와 곡 리스트에서 Plate 정보를 포함해 데이터를 반환.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = make_soup(html_content)
 
     # Pumbility 점수 추출
-    score_tag = soup.select_one('.pumbility_total_wrap .t2.en')
+    score_tag = soup.select_one(PUMBILITY_SELECTORS["total_score"])
     pumbility_score_element = score_tag.text.strip() if score_tag else "Unknown"
 
     # "," 제거 및 정수 변환
@@ -304,165 +502,277 @@ def extract_pumbility_score_and_songs(html_content):
 
     # 곡 리스트 추출
     song_list = []
-    song_items = soup.select('.rating_rangking_list_w ul.list > li')
+    song_items = soup.select(PUMBILITY_SELECTORS["songs"])
 
     for item in song_items:
         # 곡 이름
-        name_tag = item.select_one('.name .t1')
+        name_tag = item.select_one(PUMBILITY_SELECTORS["name"])
 
         # 아티스트
-        artist_tag = item.select_one('.name .t2')
+        artist_tag = item.select_one(PUMBILITY_SELECTORS["artist"])
 
         # 펌빌리티 점수
-        score_tag = item.select_one('.score .tt.en')
+        score_tag = item.select_one(PUMBILITY_SELECTORS["score"])
 
         # 날짜
-        date_tag = item.select_one('.date .tt')
+        date_tag = item.select_one(PUMBILITY_SELECTORS["date"])
 
         # 플레이트 이미지 URL
-        plate_img_element = item.select_one(".grade_wrap .img img")
+        plate_img_element = item.select_one(PUMBILITY_SELECTORS["plate_img"])
         plate_img = plate_img_element["src"] if plate_img_element else "Unknown"
 
         # 스텝볼 이미지 URL
-        stepball_img_element = item.select_one(".stepBall_img_wrap .stepBall_in")
+        stepball_img_element = item.select_one(PUMBILITY_SELECTORS["stepball"])
         stepball_img = stepball_img_element["style"].split("url(")[-1].strip(")") if stepball_img_element else "Unknown"
 
         # 스텝볼 타입 결정 (d 또는 s)
         step_type = "d" if "d_bg" in stepball_img else "s"
 
         # 스텝볼 내부 `tw` div 클래스의 이미지 URL
-        stepball_tw_element = item.select_one(".stepBall_img_wrap .stepBall_in .tw img")
+        stepball_tw_element = item.select_one(PUMBILITY_SELECTORS["stepball_tw"])
         stepball_tw_img = stepball_tw_element["src"] if stepball_tw_element else "Unknown"
 
         # 스텝볼 내부 하위 이미지 URL
-        stepball_inner_elements = item.select(".stepBall_img_wrap .stepBall_in .imG img")
-        stepball_inner_images = [
+        stepball_inner_elements = item.select(PUMBILITY_SELECTORS["stepball_inner"])
+        stepball_inner_images = tuple(
             img["src"] for img in stepball_inner_elements if "src" in img.attrs
-        ]
+        )
 
         # 배경 이미지 URL
-        bg_style = item.select_one('.profile_img .resize .re.bgfix')['style']
+        bg_style = item.select_one(PUMBILITY_SELECTORS["bg"])['style']
         bg_url = bg_style.split("url('")[1].split("')")[0] if bg_style else None
 
-        song_data = {
-            "name": name_tag.text.strip() if name_tag else "Unknown",
-            "artist": artist_tag.text.strip() if artist_tag else "Unknown",
-            "score": score_tag.text.strip() if score_tag else "Unknown",
-            "date": date_tag.text.strip() if date_tag else "Unknown",
+        song_list.append(PumbilityEntry(
+            name=name_tag.text.strip() if name_tag else "Unknown",
+            artist=artist_tag.text.strip() if artist_tag else "Unknown",
+            score=parse_int(score_tag.text if score_tag else None, default=None),
+            _score_text=score_tag.text.strip() if score_tag else "Unknown",
+            date=date_tag.text.strip() if date_tag else "Unknown",
+            plate_img=plate_img,
+            step_type=step_type,
+            stepball_tw_img=stepball_tw_img,
+            stepball_inner_img=stepball_inner_images,
+            bg_img=bg_url,
+        ))
+
+    return Pumbility(pumbility_score=pumbility_score, song_list=song_list)
+
+
+def extract_pumbility_score_and_songs(html_content):
+    """
+    parse_pumbility 결과를 기존 응답 형식(dict)으로 반환
+    """
+    return parse_pumbility(html_content).to_dict()
+
+
+DASHBOARD_SELECTORS = compile_selectors({
+    "rank_box": "ul.list.pumbilitySt2 li",
+    "id1": ".profile_name.en.pl0",
+    "id2": ".profile_name.st1.en",
+    "ranking": ".num .tt",
+    "score": ".score .tt.en",
+    "rank_bg": ".re.bgfix",
+})
+
+
+def extract_dashboard_data(rank_html, pumbility_html):
+    """
+    랭킹 페이지 / 펌빌리티 페이지에서 대시보드 데이터(정보 + TOP10 + 나머지 40곡)를 추출
+    """
+    # 랭킹 페이지 데이터 추출
+    rank_soup = make_soup(rank_html)
+
+    rank_box = rank_soup.select_one(DASHBOARD_SELECTORS["rank_box"])
+    id1 = rank_box.select_one(DASHBOARD_SELECTORS["id1"]).text.strip()
+    id2 = rank_box.select_one(DASHBOARD_SELECTORS["id2"]).text.strip()
+    user_id = f"{id1} {id2}"
+
+    ranking_raw = rank_box.select_one(DASHBOARD_SELECTORS["ranking"]).text.strip()
+    ranking = "1000+" if ranking_raw == "-" else ranking_raw
+
+    score_str = rank_box.select_one(DASHBOARD_SELECTORS["score"]).text.strip().replace(",", "")
+    pumbility_score = int(score_str)
+    bg_style = rank_box.select_one(DASHBOARD_SELECTORS["rank_bg"])["style"]
+    img_url = bg_style.split("url('")[1].split("')")[0]
+
+    info = {
+        "id": user_id,
+        "ranking": ranking,
+        "img": img_url,
+        "pumbility_score": pumbility_score
+    }
+
+    # 펌빌리티 페이지에서 곡 리스트 추출
+    soup = make_soup(pumbility_html)
+    full_song_list = []
+
+    items = soup.select(PUMBILITY_SELECTORS["songs"])
+    for item in items:
+        name = item.select_one(PUMBILITY_SELECTORS["name"]).text.strip()
+        score = item.select_one(PUMBILITY_SELECTORS["score"]).text.strip()
+        plate_img = item.select_one(PUMBILITY_SELECTORS["plate_img"])["src"]
+
+        stepball_img_element = item.select_one(PUMBILITY_SELECTORS["stepball"])
+        step_type = "d" if "d_bg" in stepball_img_element["style"] else "s"
+
+        stepball_inner_elements = item.select(PUMBILITY_SELECTORS["stepball_inner"])
+        difficult = ''.join([
+            img[-5] for img in [e["src"] for e in stepball_inner_elements if "src" in e.attrs]
+            if img[-5].isdigit()
+        ])
+
+        bg_style = item.select_one(PUMBILITY_SELECTORS["bg"])["style"]
+        bg_url = bg_style.split("url('")[1].split("')")[0] if bg_style else None
+
+        song = {
+            "name": name,
+            "score": score,
             "plate_img": plate_img,
-            "step_type": step_type,
-            "stepball_tw_img": stepball_tw_img,
-            "stepball_inner_img": stepball_inner_images,
             "bg_img": bg_url,
+            "type": step_type,
+            "difficult": difficult
         }
-        song_list.append(song_data)
+        full_song_list.append(song)
 
     return {
-        "pumbility_score": pumbility_score,
-        "song_list": song_list
+        "info": info,
+        "TOP10": full_song_list[:10],
+        "Other40": full_song_list[10:]
     }
 
 
-def fetch_recently_played_data(html_content):
+RECENTLY_PLAYED_SELECTORS = compile_selectors({
+    "songs": ".recently_playeList > li",
+    "name": ".song_name p",
+    "score": ".li_in.ac .tx",
+    "stepball": ".stepBall_in",
+    "stepball_text": ".tw img",
+    "stepball_nums": ".numw .imG img",
+    "judgement": ".board_st.ac.recently_play tbody tr td .tx",
+    "plate": ".li_in.ac img",
+    "background": ".wrap_in .in.bgfix",
+})
+
+
+def parse_recent_plays(html_content) -> list:
     """
-    최근 플레이한 기록 데이터를 HTML에서 스크래핑하여 반환
+    최근 플레이한 기록 데이터를 HTML에서 스크래핑하여 RecentPlay 리스트로 반환
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = make_soup(html_content)
     songs = []
 
-    song_items = soup.select(".recently_playeList > li")
+    song_items = soup.select(RECENTLY_PLAYED_SELECTORS["songs"])
     for item in song_items:
         try:
             # 곡 제목
-            song_name = item.select_one(".song_name p").text.strip()
+            song_name = item.select_one(RECENTLY_PLAYED_SELECTORS["name"]).text.strip()
 
             # 플레이 스코어
-            score_element = item.select_one(".li_in.ac .tx")
-            score = score_element.text.strip() if score_element else "0"
+            score_element = item.select_one(RECENTLY_PLAYED_SELECTORS["score"])
+            score_text = score_element.text.strip() if score_element else "0"
 
             # stepball 관련 이미지 소스 가져오기
-            stepball_div = item.select_one(".stepBall_in")
+            stepball_div = item.select_one(RECENTLY_PLAYED_SELECTORS["stepball"])
             stepball_url = stepball_div["style"].split("url('")[1].split("')")[0]
-            stepball_text = stepball_div.select_one(".tw img")["src"]
-            stepball_num_imgs = stepball_div.select(".numw .imG img")
+            stepball_text = stepball_div.select_one(RECENTLY_PLAYED_SELECTORS["stepball_text"])["src"]
+            stepball_num_imgs = stepball_div.select(RECENTLY_PLAYED_SELECTORS["stepball_nums"])
             stepball_num1 = stepball_num_imgs[0]["src"] if len(stepball_num_imgs) > 0 else None
             stepball_num2 = stepball_num_imgs[1]["src"] if len(stepball_num_imgs) > 1 else None
 
             # 판정 정보
-            judgement_table = item.select(".board_st.ac.recently_play tbody tr td .tx")
-            judgement_info = {
-                "perfect": judgement_table[0].text.strip() if len(judgement_table) > 0 else "0",
-                "great": judgement_table[1].text.strip() if len(judgement_table) > 1 else "0",
-                "good": judgement_table[2].text.strip() if len(judgement_table) > 2 else "0",
-                "bad": judgement_table[3].text.strip() if len(judgement_table) > 3 else "0",
-                "miss": judgement_table[4].text.strip() if len(judgement_table) > 4 else "0",
-            }
+            judgement_table = item.select(RECENTLY_PLAYED_SELECTORS["judgement"])
+            texts = [cell.text.strip() for cell in judgement_table[:5]]
+            texts += ["0"] * (5 - len(texts))
+            judgement_info = Judgement(*(parse_int(text) for text in texts), _text=tuple(texts))
 
             # .li_in.ac 이미지 URL 추출
-            plate_tag = item.select_one('.li_in.ac img')
+            plate_tag = item.select_one(RECENTLY_PLAYED_SELECTORS["plate"])
             plate_url = plate_tag["src"] if plate_tag and plate_tag.get("src") else "0"
 
             # 곡 배경 URL
-            background_style = item.select_one(".wrap_in .in.bgfix")["style"]
+            background_style = item.select_one(RECENTLY_PLAYED_SELECTORS["background"])["style"]
             background_url = background_style.split("url('")[1].split("')")[0]
 
             # 데이터 추가
-            songs.append({
-                "song_name": song_name,
-                "score": score,
-                "stepball_url": stepball_url,
-                "stepball_text": stepball_text,
-                "stepball_num1": stepball_num1,
-                "stepball_num2": stepball_num2,
-                "judgement": judgement_info,
-                "plate_url": plate_url,
-                "background_url": background_url,
-            })
+            songs.append(RecentPlay(
+                song_name=song_name,
+                score=parse_int(score_text),
+                stepball_url=stepball_url,
+                stepball_text=stepball_text,
+                stepball_num1=stepball_num1,
+                stepball_num2=stepball_num2,
+                judgement=judgement_info,
+                plate_url=plate_url,
+                background_url=background_url,
+                _score_text=score_text,
+            ))
         except Exception as e:
-            print(f"Error parsing song item: {e}")
+            logger.warning("최근 플레이 항목 파싱 실패", extra={"error": str(e)})
 
     return songs
 
 
-def fetch_all_user_data(username: str, password: str):
+def fetch_recently_played_data(html_content):
     """
-    사용자 계정을 통해 모든 데이터를 한 번에 가져오는 함수
+    parse_recent_plays 결과를 기존 응답 형식(dict 리스트)으로 반환
     """
-    try:
-        session = login_to_piugame(username, password)
+    return [play.to_dict() for play in parse_recent_plays(html_content)]
 
-        if not session:
-            raise HTTPException(status_code=401, detail="로그인 실패")
 
-        # 사용자 기본 데이터
-        target_url = "https://www.piugame.com/my_page/play_data.php"
-        response = session.get(target_url, verify=False, timeout=30)
-        response.encoding = 'utf-8'
-        user_data = parse_user_data(response.text)
-
-        # 모든 레벨 데이터
-        base_url = "https://www.piugame.com/my_page/play_data.php"
-        all_levels_data = fetch_all_levels_data(session, base_url)
-
-        # Pumbility 데이터
-        pumbility_url = "https://www.piugame.com/my_page/pumbility.php"
-        response = session.get(pumbility_url, verify=False, timeout=30)
-        pumbility_data = extract_pumbility_score_and_songs(response.text)
+async def fetch_all_user_data(username: str, password: str) -> UserRecords:
+    """
+    사용자 계정을 통해 모든 데이터를 한 번에 가져오는 함수.
+    서로 독립적인 페이지(play_data / 레벨별 play_data / pumbility / recently_played)를 동시에 요청하고,
+    play_data.php는 한 번만 받아 사용자 데이터와 'ALL' 레벨 데이터 파싱에 함께 사용한다.
+    기존 응답 형식(dict)은 결과의 to_dict()로 만든다.
+    """
+    play_data_url = f"{PIUGAME_BASE_URL}/my_page/play_data.php"
+    pumbility_url = f"{PIUGAME_BASE_URL}/my_page/pumbility.php"
+    recently_played_url = f"{PIUGAME_BASE_URL}/my_page/recently_played.php"
+
+    async def scrape(cookie_jar):
+        async with aiohttp.ClientSession(cookie_jar=cookie_jar) as async_session:
+            return await asyncio.gather(
+                fetch_page_with_retry(async_session, play_data_url),
+                fetch_all_levels_data_async(async_session, play_data_url, levels=LEVELS),
+                fetch_page_with_retry(async_session, pumbility_url),
+                fetch_page_with_retry(async_session, recently_played_url),
+            )
 
-        # 최근 플레이 기록 데이터
-        recently_played_url = "https://www.piugame.com/my_page/recently_played.php"
-        response = session.get(recently_played_url, verify=False, timeout=30)
-        recently_played_data = fetch_recently_played_data(response.text)
+    try:
+        # 캐시된 로그인 세션 사용 (만료 시 재로그인)
+        play_data_html, (levels_data, level_errors), pumbility_html, recently_played_html = (
+            await run_with_session(username, password, scrape)
+        )
+
+        # 사용자 기본 데이터 + 'ALL' 레벨 데이터 (같은 play_data.php 페이지 사용) + pumbility / 최근 플레이 (동시에 파싱)
+        user_data, all_data, pumbility_data, recently_played_data = await asyncio.gather(
+            run_parser(parse_user_data, play_data_html),
+            run_parser(parse_level_summary, play_data_html, "ALL"),
+            run_parser(parse_pumbility, pumbility_html),
+            run_parser(parse_recent_plays, recently_played_html),
+            return_exceptions=True,
+        )
+        for parsed in (user_data, pumbility_data, recently_played_data):
+            if isinstance(parsed, BaseException):
+                raise parsed
+        if isinstance(all_data, BaseException):
+            level_errors.insert(0, {"level": "ALL", "url": play_data_url, "error": describe_error(all_data)})
+            all_data = LevelSummary.empty("ALL")
+
+        for error in level_errors:
+            logger.warning("레벨 데이터 처리 실패", extra=error)
 
         # 결과 병합
-        result = {
-            "user_data": user_data,
-            "all_levels_data": all_levels_data,
-            "pumbility_data": pumbility_data,
-            "recently_played_data": recently_played_data,
-        }
-
-        return result
-
+        return UserRecords(
+            user_data=user_data,
+            all_levels_data=[all_data] + levels_data,
+            pumbility_data=pumbility_data,
+            recently_played_data=recently_played_data,
+            errors=level_errors,
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
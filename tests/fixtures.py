@@ -0,0 +1,25 @@
+"""
+테스트용 익명 HTML (bench/fixtures) 과 그 HTML로 만든 UserRecords
+"""
+import os
+
+from models import UserRecords
+from scraper import parse_level_summary, parse_pumbility, parse_recent_plays, parse_user_data
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "fixtures")
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def make_user_records(errors=None) -> UserRecords:
+    play_data_html = read_fixture("play_data_all.html")
+    return UserRecords(
+        user_data=parse_user_data(play_data_html),
+        all_levels_data=[parse_level_summary(play_data_html, "ALL")],
+        pumbility_data=parse_pumbility(read_fixture("pumbility.html")),
+        recently_played_data=parse_recent_plays(read_fixture("recently_played.html")),
+        errors=errors or [],
+    )
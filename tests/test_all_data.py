@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+import response_encoding
+from api.routes import all_data
+from tests.fixtures import make_user_records
+
+
+def _keys(value):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from _keys(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _keys(item)
+
+
+def _fetch(monkeypatch, records, fmt):
+    async def fake_get_or_fetch(*args, **kwargs):
+        return records
+
+    monkeypatch.setattr(all_data, "get_or_fetch", fake_get_or_fetch)
+    credentials = all_data.UserCredentials(username="user", password="pw", format=fmt)
+    response = asyncio.run(all_data.fetch_all_user_data_endpoint(None, credentials))
+    return json.loads(response.body)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_compact_body_has_no_private_fields(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(response_encoding, "orjson", None)
+    records = make_user_records()
+    assert records.all_levels_data[0]._text is not None  # 원래 문자열을 보관하는 경우에도
+
+    body = _fetch(monkeypatch, records, "compact")
+
+    assert not [key for key in _keys(body) if key.startswith("_")]
+    assert body["data"]["all_levels_data"][0]["rating"] == records.all_levels_data[0].rating
+
+
+def test_legacy_body_uses_page_strings(monkeypatch):
+    records = make_user_records()
+    body = _fetch(monkeypatch, records, "legacy")
+    assert body["data"] == json.loads(json.dumps(records.to_dict()))
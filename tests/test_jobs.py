@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from api.routes import jobs as jobs_route
+from api.services import jobs, response_cache
+from api.services.response_cache import get_or_fetch
+from api.services.session_store import credential_key
+
+RESULT = {"data": {"level_20": {"single": [], "double": []}}, "errors": []}
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/jobs", "headers": [], "client": ("10.0.0.1", 1234)})
+
+
+def _refuse(request):
+    raise HTTPException(status_code=429, detail="요청 제한 초과", headers={"Retry-After": "30"})
+
+
+async def _run_job(username: str, prefill: bool) -> dict:
+    if prefill:
+        async def fetcher():
+            return RESULT
+        await get_or_fetch(credential_key(username, "pw"), "song_details", fetcher, policy="level_checklist")
+
+    credentials = jobs_route.JobRequest(username=username, password="pw", kind="song_details")
+    job_id = (await jobs_route.submit_job(_request(), credentials))["data"]["job_id"]
+    while jobs.get_status(job_id)["status"] in ("queued", "running"):
+        await asyncio.sleep(0)
+    return job_id
+
+
+@pytest.fixture
+def refusing_limiter(monkeypatch):
+    # 한도를 이미 다 쓴 클라이언트: 실제로 스크래핑하려 하면 429
+    monkeypatch.setattr(jobs_route, "check_rate_limit", _refuse)
+    monkeypatch.setattr(jobs, "_slots", None)
+    yield
+    for username in ("cached-job", "uncached-job"):
+        response_cache.invalidate_user(credential_key(username, "pw"))
+
+
+def test_cache_hit_job_is_not_rate_limited(refusing_limiter):
+    job_id = asyncio.run(_run_job("cached-job", prefill=True))
+    job, result = jobs.get_result(job_id)
+    assert job["status"] == "succeeded"
+    assert result == RESULT
+
+
+def test_cache_miss_job_fails_with_rate_limit(refusing_limiter):
+    job_id = asyncio.run(_run_job("uncached-job", prefill=False))
+    with pytest.raises(HTTPException) as exc_info:
+        jobs.get_result(job_id)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "30"}
@@ -0,0 +1,24 @@
+from starlette.requests import Request
+
+import config
+import profiling
+
+
+def _request(headers=None) -> Request:
+    raw = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": raw, "query_string": b""})
+
+
+def test_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_TOKEN", "")
+    assert not profiling.enabled()
+    assert not profiling._should_profile(_request({"X-Profile-Token": ""}))
+
+
+def test_only_requests_with_token_are_profiled(monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_TOKEN", "secret")
+    assert profiling.enabled()
+    assert profiling._should_profile(_request({"X-Profile-Token": "secret"}))
+    assert not profiling._should_profile(_request({"X-Profile-Token": "wrong"}))
+    # 토큰 없이 들어온 요청은 항상 프로파일링하지 않음 (무작위 샘플링 없음)
+    assert not any(profiling._should_profile(_request()) for _ in range(1000))
@@ -0,0 +1,46 @@
+import asyncio
+
+from api.services import response_cache
+from api.services.response_cache import get_or_fetch, lookup, without_errors
+from tests.fixtures import make_user_records
+
+LEVEL_ERROR = {"level": "20", "error": "timeout"}
+
+
+def test_without_errors_checks_dicts_and_objects():
+    assert without_errors({"data": {}, "errors": []})
+    assert not without_errors({"data": {}, "errors": [LEVEL_ERROR]})
+    assert without_errors(make_user_records())
+    assert not without_errors(make_user_records(errors=[LEVEL_ERROR]))
+
+
+def _fetch_twice(user_key, records):
+    calls = []
+
+    async def fetcher():
+        calls.append(1)
+        return records
+
+    async def run():
+        await get_or_fetch(user_key, "all_user_data", fetcher, policy="recently_played")
+        await get_or_fetch(user_key, "all_user_data", fetcher, policy="recently_played")
+
+    asyncio.run(run())
+    return len(calls)
+
+
+def test_user_records_with_errors_are_not_cached():
+    records = make_user_records(errors=[LEVEL_ERROR])
+    try:
+        assert _fetch_twice("partial-user", records) == 2
+        assert lookup(("partial-user", "all_user_data")) is None
+    finally:
+        response_cache.invalidate_user("partial-user")
+
+
+def test_complete_user_records_are_cached():
+    try:
+        assert _fetch_twice("complete-user", make_user_records()) == 1
+        assert lookup(("complete-user", "all_user_data")) is not None
+    finally:
+        response_cache.invalidate_user("complete-user")
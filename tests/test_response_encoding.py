@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+import response_encoding
+from response_encoding import choose_encoding, etag_compression_middleware, json_response
+
+
+def _request(method: str, headers=None) -> Request:
+    raw = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "path": "/", "headers": raw, "query_string": b""})
+
+
+def _call(method: str, route_response, headers=None):
+    async def call_next(request):
+        # BaseHTTPMiddleware 의 call_next 처럼 본문을 스트림으로 전달
+        return StreamingResponse(
+            iter([route_response.body]), status_code=route_response.status_code,
+            headers={key: value for key, value in route_response.headers.items() if key != "content-length"},
+        )
+
+    return asyncio.run(etag_compression_middleware(_request(method, headers), call_next))
+
+
+def test_post_route_etag_returns_304_when_unchanged():
+    first = _call("POST", json_response({"a": 1}, etag_scope="key:dashboard"))
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+
+    second = _call("POST", json_response({"a": 1}, etag_scope="key:dashboard"), {"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.body == b""
+
+    changed = _call("POST", json_response({"a": 2}, etag_scope="key:dashboard"), {"If-None-Match": etag})
+    assert changed.status_code == 200
+
+
+def test_post_etag_depends_on_scope():
+    mine = json_response({"a": 1}, etag_scope="user-1:dashboard").headers["etag"]
+    other = json_response({"a": 1}, etag_scope="user-2:dashboard").headers["etag"]
+    assert mine != other
+
+
+def test_post_without_route_etag_has_no_etag():
+    response = _call("POST", json_response({"a": 1}), {"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_get_etag_from_body():
+    etag = _call("GET", json_response({"a": 1})).headers["etag"]
+    assert _call("GET", json_response({"a": 1}), {"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=0.0", None),
+    ("gzip; q=0.000", None),
+    ("gzip;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("*;q=0, br", None),
+    ("gzip;q=abc", None),
+    ("", None),
+])
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(response_encoding, "brotli", None)
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_higher_q(monkeypatch):
+    monkeypatch.setattr(response_encoding, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip;q=1, br;q=0.5") == "gzip"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
@@ -0,0 +1,33 @@
+from api.services.score_store import change_type, diff_songs
+
+
+def _songs(single=(), double=()):
+    return {
+        "single": [{"name": name, "score": score} for name, score in single],
+        "double": [{"name": name, "score": score} for name, score in double],
+    }
+
+
+def test_diff_songs_labels_score_direction():
+    old = _songs(single=[("Up", 95.0), ("Down", 99.1), ("Same", 90.0), ("Gone", 80.0)])
+    new = _songs(single=[("Up", 97.5), ("Down", 98.2), ("Same", 90.0), ("New", 88.8)])
+
+    changes = {change[2]: change for change in diff_songs(20, old, new)}
+
+    assert changes["Up"] == (20, "single", "Up", "improved", 97.5, 95.0)
+    assert changes["Down"] == (20, "single", "Down", "decreased", 98.2, 99.1)
+    assert changes["New"] == (20, "single", "New", "added", 88.8, None)
+    assert changes["Gone"] == (20, "single", "Gone", "removed", None, 80.0)
+    assert "Same" not in changes
+
+
+def test_diff_songs_without_previous_data():
+    changes = diff_songs(21, None, _songs(double=[("Song", 91.0)]))
+    assert changes == [(21, "double", "Song", "added", 91.0, None)]
+
+
+def test_change_type():
+    assert change_type(None, 90.0) == "added"
+    assert change_type(90.0, None) == "removed"
+    assert change_type(90.0, 95.0) == "improved"
+    assert change_type(95.0, 90.0) == "decreased"
@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api.services import session_store
+
+
+def _fake_login(username, password):
+    session = requests.Session()
+    session.cookies.set("sid", f"{username}-cookie")
+    return session
+
+
+def test_sync_session_reuses_cached_cookies(monkeypatch):
+    calls = []
+    monkeypatch.setattr(session_store, "login_to_piugame", lambda u, p: calls.append(u) or _fake_login(u, p))
+    session_store.invalidate_session("cached", "pw")
+
+    first = session_store.get_requests_session("cached", "pw")
+    second = session_store.get_requests_session("cached", "pw")
+
+    assert calls == ["cached"]
+    assert first.cookies.get("sid") == second.cookies.get("sid") == "cached-cookie"
+
+
+def test_concurrent_access_from_threads(monkeypatch):
+    monkeypatch.setattr(session_store, "login_to_piugame", _fake_login)
+
+    def worker(i):
+        username = f"user{i % 50}"
+        session = session_store.get_requests_session(username, "pw")
+        if i % 3 == 0:
+            session_store.invalidate_session(username, "pw")
+        return session.cookies.get("sid") == f"{username}-cookie"
+
+    # 스레드 풀(동기 라우트)에서 동시에 조회/저장/삭제해도 캐시가 깨지지 않아야 함
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        assert all(executor.map(worker, range(5000)))
+    assert len(session_store.session_cache) <= session_store.MAX_SESSIONS